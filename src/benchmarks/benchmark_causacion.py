@@ -0,0 +1,513 @@
+"""
+Benchmark de escalabilidad del onboarding de causación.
+
+Genera modelos de causación sintéticos con el mismo diseño que los reales: Hoja1 con el
+encabezado en la fila 5 ('CUENTA CONTABLE   (OBLIGATORIO)', 'CENTRO DE COSTO', 'NIT',
+'SUBCENTRO DE COSTO' entre columnas de relleno) y Hoja5 con el catálogo PUC por secciones
+('Código PUC' | 'Item' | 'Cálculo' | 'Fuente' desde la fila 4). Para cada tamaño mide el
+procesamiento completo (lectura del libro, fusión y escritura de client_pucs y
+cost_center_per_puc en un almacén en memoria que reemplaza a MongoDB) y reporta filas por
+segundo y pico de memoria, de modo que un comportamiento cuadrático se vea como una curva.
+La columna "Caché" es la lectura del mismo libro desde su instantánea en disco.
+
+Con --legado mide además la lectura anterior (libro completo en memoria y recorrido de la Hoja5
+con la búsqueda fila a fila anterior a IndiceHoja5 por cada cuenta) sobre los mismos archivos.
+
+Uso:
+    python src/benchmarks/benchmark_causacion.py [--filas 1000 10000 100000] [--hoja5 50 500]
+        [--proporcion-cuentas 0.05] [--relleno 20] [--reconciliar] [--legado]
+"""
+
+import argparse
+import logging
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import openpyxl
+from pymongo import InsertOne, UpdateOne
+
+# Rutas del proyecto (los módulos usan imports relativos a src/ y a la raíz)
+project_root = str(Path(__file__).parent.parent.parent)
+src_root = str(Path(__file__).parent.parent)
+for ruta in (project_root, src_root):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+import causaciones.onboarding_causacion as onboarding_causacion
+from causaciones.modelo_causacion import COLUMNAS_MODELO, analizar_modelo_causacion, fusionar_modelos_causacion
+from utils.libro_excel import DIRECTORIO_CACHE_LIBROS, limpiar_libros_en_proceso
+
+logger = logging.getLogger(__name__)
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+UID_BENCHMARK = "000000000000000000000001"
+AMBIENTE_BENCHMARK = "BENCHMARK"
+
+# Posiciones de las columnas usadas en la plantilla de Siigo (cuenta, centro, NIT, subcentro)
+POSICIONES_MODELO = {
+    "CUENTA CONTABLE   (OBLIGATORIO)": 4,
+    "CENTRO DE COSTO": 14,
+    "SUBCENTRO DE COSTO": 15,
+    "NIT": 16,
+}
+ANCHO_HOJA1 = 90
+CODIGOS_POR_SECCION_HOJA5 = 20
+
+# =============================
+# GENERACIÓN DE MODELOS
+# =============================
+def generar_catalogo_hoja5(tamano: int, rng: random.Random) -> List[int]:
+    """
+    Genera `tamano` códigos PUC distintos de 10 dígitos (clases 1, 2, 5 y 6).
+    """
+    codigos = set()
+    while len(codigos) < tamano:
+        codigos.add(rng.choice([1, 2, 5, 6]) * 10 ** 9 + rng.randint(0, 10 ** 9 - 1))
+    return sorted(codigos)
+
+
+def generar_cuentas(catalogo: List[int], cantidad: int, rng: random.Random) -> List[int]:
+    """
+    Elige las cuentas distintas de la Hoja1: 80 % están en la Hoja5 (coincidencia exacta), 10 %
+    comparten los 6 primeros dígitos con una de ellas (respaldo por prefijo) y 10 % no aparecen.
+    """
+    cuentas = set()
+    while len(cuentas) < cantidad:
+        base = rng.choice(catalogo)
+        opcion = rng.random()
+        if opcion < 0.8:
+            cuentas.add(base)
+        elif opcion < 0.9:
+            cuentas.add(base // 10 ** 4 * 10 ** 4 + rng.randint(0, 9999))
+        else:
+            cuentas.add(rng.choice([3, 4, 7]) * 10 ** 9 + rng.randint(0, 10 ** 9 - 1))
+        if len(cuentas) >= len(catalogo) * 10 ** 4:
+            break
+    return sorted(cuentas)
+
+
+def generar_modelo_causacion(ruta: str, filas: int, tamano_hoja5: int, proporcion_cuentas: float,
+                             relleno: int, semilla: int = 42) -> Dict:
+    """
+    Escribe un modelo de causación sintético.
+
+    Args:
+        ruta (str): Archivo .xlsx a crear
+        filas (int): Filas de la Hoja1
+        tamano_hoja5 (int): Códigos PUC del catálogo de la Hoja5
+        proporcion_cuentas (float): Cuentas distintas en la Hoja1 como fracción de las filas
+        relleno (int): Columnas adicionales con valor en cada fila (la plantilla tiene ~90)
+        semilla (int): Semilla del generador
+
+    Returns:
+        Dict: Tamaños generados (filas, hoja5, cuentas)
+    """
+    rng = random.Random(semilla)
+    catalogo = generar_catalogo_hoja5(tamano_hoja5, rng)
+    cuentas = generar_cuentas(catalogo, max(1, int(filas * proporcion_cuentas)), rng)
+    nits = [rng.randint(800_000_000, 999_999_999) for _ in range(max(1, len(cuentas) // 3))]
+    usadas = set(POSICIONES_MODELO.values())
+    columnas_relleno = [i for i in range(ANCHO_HOJA1) if i not in usadas][:relleno]
+
+    libro = openpyxl.Workbook(write_only=True)
+    hoja1 = libro.create_sheet("Hoja1")
+    hoja1.append([None, "EMPRESA SINTETICA SAS"])
+    hoja1.append([None, "MODELO PARA LA IMPORTACION DE MOVIMIENTO CONTABLE - MODELO GENERAL"])
+    hoja1.append([])
+    hoja1.append([None, "Documento interno"])
+    encabezado = [f"COLUMNA {i + 1}" for i in range(ANCHO_HOJA1)]
+    for nombre, posicion in POSICIONES_MODELO.items():
+        encabezado[posicion] = nombre
+    hoja1.append(encabezado)
+    for _ in range(filas):
+        fila = [None] * ANCHO_HOJA1
+        for posicion in columnas_relleno:
+            fila[posicion] = rng.randint(0, 1000)
+        fila[POSICIONES_MODELO["CUENTA CONTABLE   (OBLIGATORIO)"]] = rng.choice(cuentas)
+        fila[POSICIONES_MODELO["CENTRO DE COSTO"]] = rng.randint(0, 3)
+        fila[POSICIONES_MODELO["SUBCENTRO DE COSTO"]] = rng.choice([0, 0, 0, 1])
+        fila[POSICIONES_MODELO["NIT"]] = rng.choice(nits)
+        hoja1.append(fila)
+
+    hoja5 = libro.create_sheet("Hoja5")
+    hoja5.append([])
+    hoja5.append([])
+    for inicio in range(0, len(catalogo), CODIGOS_POR_SECCION_HOJA5):
+        hoja5.append([None, f"Sección {inicio // CODIGOS_POR_SECCION_HOJA5 + 1}"])
+        hoja5.append([None, "Código PUC", "Item", "Cálculo", "Fuente"])
+        for codigo in catalogo[inicio:inicio + CODIGOS_POR_SECCION_HOJA5]:
+            fuente = rng.choice(["iva_factura", "retefuente_factura", "precio_unitario_de_venta_factura\ntotal_factura", None])
+            hoja5.append([None, codigo, f"Item {codigo}", None, fuente])
+    libro.save(ruta)
+    return {"filas": filas, "hoja5": len(catalogo), "cuentas": len(cuentas), "catalogo": catalogo}
+
+# =============================
+# ALMACÉN EN MEMORIA
+# =============================
+class ResultadoEnMemoria:
+    def __init__(self, **valores):
+        self.__dict__.update(valores)
+
+
+class ColeccionEnMemoria:
+    """
+    Colección con las operaciones que usa onboarding_causacion (igualdad y $in en los filtros).
+    Las búsquedas por igualdad usan un índice hash por conjunto de campos, para que el almacén
+    no agregue su propio costo cuadrático a la medición.
+    """
+
+    def __init__(self):
+        self.documentos = []
+        self.indices = {}
+
+    @staticmethod
+    def _valor_clave(valor):
+        return repr(valor) if isinstance(valor, (dict, list)) else valor
+
+    def _indice(self, campos: Tuple[str, ...]) -> Dict:
+        if campos not in self.indices:
+            indice = {}
+            for documento in self.documentos:
+                indice.setdefault(tuple(self._valor_clave(documento.get(c)) for c in campos), []).append(documento)
+            self.indices[campos] = indice
+        return self.indices[campos]
+
+    def _buscar(self, filtro: Dict) -> List[Dict]:
+        iguales = {c: v for c, v in filtro.items() if not (isinstance(v, dict) and "$in" in v)}
+        en = {c: set(v["$in"]) for c, v in filtro.items() if isinstance(v, dict) and "$in" in v}
+        campos = tuple(sorted(iguales))
+        candidatos = self._indice(campos).get(tuple(self._valor_clave(iguales[c]) for c in campos), []) if campos else self.documentos
+        return [d for d in candidatos if all(d.get(c) in valores for c, valores in en.items())]
+
+    def _agregar(self, documento: Dict):
+        documento = dict(documento)
+        self.documentos.append(documento)
+        for campos, indice in self.indices.items():
+            indice.setdefault(tuple(self._valor_clave(documento.get(c)) for c in campos), []).append(documento)
+
+    def create_index(self, *args, **kwargs):
+        pass
+
+    def find(self, filtro: Dict, proyeccion: Dict = None):
+        for documento in self._buscar(filtro):
+            yield {c: v for c, v in documento.items() if proyeccion is None or proyeccion.get(c)}
+
+    def find_one(self, filtro: Dict):
+        encontrados = self._buscar(filtro)
+        return encontrados[0] if encontrados else None
+
+    def distinct(self, campo: str):
+        return list({documento[campo] for documento in self.documentos if campo in documento})
+
+    def insert_one(self, documento: Dict):
+        self._agregar(documento)
+        return ResultadoEnMemoria(inserted_id=len(self.documentos))
+
+    def insert_many(self, documentos, ordered=True):
+        for documento in documentos:
+            self._agregar(documento)
+
+    def delete_many(self, filtro: Dict):
+        eliminar = {id(d) for d in self._buscar(filtro)}
+        self.documentos = [d for d in self.documentos if id(d) not in eliminar]
+        self.indices = {}
+        return ResultadoEnMemoria(deleted_count=len(eliminar))
+
+    def bulk_write(self, operaciones, ordered=True):
+        insertados = modificados = creados = 0
+        for operacion in operaciones:
+            if isinstance(operacion, InsertOne):
+                self._agregar(operacion._doc)
+                insertados += 1
+                continue
+            if not isinstance(operacion, UpdateOne):
+                raise TypeError(f"Operación no soportada: {operacion!r}")
+            existente = self.find_one(operacion._filter)
+            if existente is None:
+                if operacion._upsert:
+                    self._agregar({**operacion._filter, **operacion._doc.get("$setOnInsert", {}), **operacion._doc.get("$set", {})})
+                    creados += 1
+                continue
+            antes = dict(existente)
+            existente.update(operacion._doc.get("$set", {}))
+            for campo in operacion._doc.get("$unset", {}):
+                existente.pop(campo, None)
+            modificados += existente != antes
+        return ResultadoEnMemoria(bulk_api_result={"nInserted": insertados, "nModified": modificados, "nUpserted": creados})
+
+
+class AlmacenEnMemoria:
+    """
+    Reemplaza a MongoDBConfig y MongoDBManager dentro de onboarding_causacion.
+    """
+
+    def __init__(self):
+        self.colecciones = {}
+        almacen = self
+
+        class ConfiguracionEnMemoria:
+            def __init__(self, env_prefix=None):
+                self.db_name = "benchmark"
+                self.target_uri = "memoria://benchmark"
+                self.collection_name = None
+
+            def set_collection_name(self, nombre):
+                self.collection_name = nombre
+
+            def get_collection_name(self):
+                return self.collection_name
+
+        class GestorEnMemoria:
+            def __init__(self, config):
+                self.collection = almacen.coleccion(config.get_collection_name())
+
+            def close(self):
+                pass
+
+        self.configuracion = ConfiguracionEnMemoria
+        self.gestor = GestorEnMemoria
+
+    def coleccion(self, nombre: str) -> ColeccionEnMemoria:
+        return self.colecciones.setdefault(nombre, ColeccionEnMemoria())
+
+    def instalar(self):
+        onboarding_causacion.MongoDBConfig = self.configuracion
+        onboarding_causacion.MongoDBManager = self.gestor
+
+# =============================
+# IMPLEMENTACIÓN ANTERIOR (referencia)
+# =============================
+# Búsqueda fila a fila en la Hoja5 que reemplazó IndiceHoja5; solo la usa --legado
+def obtener_code_field_anterior(libro, cuenta_contable):
+    try:
+        if "Hoja5" not in libro.sheetnames:
+            logger.warning("Hoja5 no encontrada en el archivo Excel")
+            return ["default_code_field"]  # Devolver como array
+        
+        hoja = libro["Hoja5"]
+        cuenta_contable = str(cuenta_contable).strip()  # Normalizar a cadena
+        logger.info(f"Buscando code_field para cuenta_contable: {cuenta_contable}")
+
+        # Verificar las filas leídas de Hoja5
+        logger.debug("Iniciando iteración sobre filas de Hoja5...")
+        puc_values = []
+        for idx, fila in enumerate(hoja.iter_rows(min_row=5, values_only=True), start=5):
+            logger.debug(f"Fila {idx}: {fila}")  # Registrar todos los valores de la fila
+            if fila[1] is not None:  # Usar columna B (índice 1) para los códigos PUC
+                codigo_puc = str(fila[1]).strip()
+                puc_values.append(codigo_puc)
+                logger.debug(f"Leyendo PUC desde columna B (fila {idx}, col 1): {codigo_puc} (tipo: {type(fila[1])})")
+        
+        logger.debug(f"Valores de PUC encontrados en Hoja5: {puc_values}")
+
+        # Buscar coincidencia exacta
+        for fila in hoja.iter_rows(min_row=5, values_only=True):
+            if fila[1] is not None:  # Usar columna B (índice 1) para los códigos PUC
+                codigo_puc = str(fila[1]).strip()
+                logger.debug(f"Comparando PUC '{codigo_puc}' (tipo: {type(codigo_puc)}) con cuenta_contable '{cuenta_contable}' (tipo: {type(cuenta_contable)})")
+                if codigo_puc == cuenta_contable:
+                    code_field_raw = fila[4] if fila[4] is not None else None  # Columna E (índice 4)
+                    
+                    # Procesar el code_field como array
+                    if code_field_raw is not None:
+                        code_field_str = str(code_field_raw).strip()
+                        # Verificar si hay saltos de línea y dividir
+                        if '\n' in code_field_str:
+                            code_field_array = [item.strip() for item in code_field_str.split('\n') if item.strip()]
+                        else:
+                            code_field_array = [code_field_str] if code_field_str else ["default_code_field"]
+                    else:
+                        code_field_array = ["default_code_field"]
+                    
+                    logger.info(f"Coincidencia exacta encontrada. Raw code_field (col E): {code_field_raw}, Procesado como array: {code_field_array}")
+                    return code_field_array
+        
+        # Fallback: buscar por los primeros 6 dígitos
+        puc_6_digitos = cuenta_contable[:6]
+        logger.info(f"Fallback: Buscando con los primeros 6 dígitos: {puc_6_digitos}")
+        for fila in hoja.iter_rows(min_row=5, values_only=True):
+            if fila[1] is not None:
+                codigo_puc = str(fila[1]).strip()
+                logger.debug(f"Fallback: Comparando PUC '{codigo_puc}' con '{puc_6_digitos}'")
+                if codigo_puc.startswith(puc_6_digitos):
+                    code_field_raw = fila[4] if fila[4] is not None else None  # Columna E (índice 4)
+                    
+                    # Procesar el code_field como array
+                    if code_field_raw is not None:
+                        code_field_str = str(code_field_raw).strip()
+                        # Verificar si hay saltos de línea y dividir
+                        if '\n' in code_field_str:
+                            code_field_array = [item.strip() for item in code_field_str.split('\n') if item.strip()]
+                        else:
+                            code_field_array = [code_field_str] if code_field_str else ["default_code_field"]
+                    else:
+                        code_field_array = ["default_code_field"]
+                    
+                    logger.info(f"Coincidencia por fallback encontrada. Raw code_field (col E): {code_field_raw}, Procesado como array: {code_field_array}")
+                    return code_field_array
+        
+        logger.warning(f"No se encontró code_field para cuenta_contable '{cuenta_contable}', asignando valor por defecto")
+        return [""]  # Devolver como array vacío
+        
+    except Exception as e:
+        logger.error(f"Error obteniendo code_field para cuenta {cuenta_contable}: {str(e)}")
+        return [""]  # Devolver como array vacío en caso de error
+
+def obtener_item_anterior(libro, cuenta_contable, fila_encabezados=4):
+    """
+    Busca en la hoja 'Hoja5' la fila donde la columna de cuenta contable (columna B) coincida exactamente
+    con el valor dado y retorna el valor de la columna 'Item' (columna C) de esa fila como string.
+    Si no encuentra coincidencia, retorna una cadena vacía.
+    """
+    hoja = libro["Hoja5"]
+    # Leer encabezados desde la fila indicada
+    encabezados = [str(h).strip() if h is not None else "" for h in list(hoja.iter_rows(min_row=fila_encabezados, max_row=fila_encabezados, values_only=True))[0]]
+    # Buscar el índice de la columna 'Item' (por defecto columna C = índice 2)
+    try:
+        idx_item = next(i for i, h in enumerate(encabezados) if h.strip().lower().replace(" ", "") == "item")
+    except StopIteration:
+        idx_item = 2  # Forzar columna C si no se encuentra el encabezado
+    for fila in hoja.iter_rows(min_row=fila_encabezados+1, values_only=True):
+        if fila[1] is not None:
+            codigo_puc = str(fila[1]).strip()
+            if codigo_puc == str(cuenta_contable).strip():
+                valor_item = fila[idx_item] if idx_item < len(fila) else ""
+                logger.info(f"Valor de 'Item' para cuenta_contable '{cuenta_contable}': {valor_item}")
+                return str(valor_item) if valor_item is not None else ""
+    logger.warning(f"No se encontró 'Item' para cuenta_contable '{cuenta_contable}' en Hoja5")
+    return ""
+
+# =============================
+# MEDICIONES
+# =============================
+def procesar(ruta: str, almacen: AlmacenEnMemoria, reconciliar: bool) -> Tuple[float, float]:
+    """
+    Lee, fusiona y escribe un modelo en el almacén. Retorna (segundos de lectura, segundos de escritura).
+    """
+    inicio = time.perf_counter()
+    modelo = fusionar_modelos_causacion([analizar_modelo_causacion(ruta)])
+    lectura = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    onboarding_causacion.subir_modelo_causacion(UID_BENCHMARK, modelo, AMBIENTE_BENCHMARK, reconciliar=reconciliar)
+    return lectura, time.perf_counter() - inicio
+
+
+def procesar_legado(ruta: str) -> float:
+    """
+    Lectura anterior: libro completo (sin read_only), encabezados.index por fila y recorrido de la
+    Hoja5 con obtener_code_field_anterior/obtener_item_anterior por cada cuenta nueva. Retorna los segundos.
+    """
+    inicio = time.perf_counter()
+    libro = openpyxl.load_workbook(ruta, data_only=True)
+    encabezados = [str(h).strip() if h is not None else "" for h in next(libro["Hoja1"].iter_rows(min_row=5, max_row=5, values_only=True))]
+    vistas = set()
+    for fila in libro["Hoja1"].iter_rows(min_row=6, values_only=True):
+        valores = [fila[encabezados.index(nombre)] for nombre in COLUMNAS_MODELO]
+        cuenta_contable = str(valores[0]).strip() if valores[0] is not None else ""
+        if not cuenta_contable or cuenta_contable in vistas:
+            continue
+        vistas.add(cuenta_contable)
+        obtener_code_field_anterior(libro, cuenta_contable)
+        obtener_item_anterior(libro, cuenta_contable)
+    return time.perf_counter() - inicio
+
+
+def limpiar_cache_libros(conservar_instantaneas: bool = False):
+    """
+    Descarta los libros ya leídos en este proceso y, salvo que se pida conservarlas, las
+    instantáneas en disco, para que la siguiente lectura analice el XML.
+    """
+    limpiar_libros_en_proceso()
+    if not conservar_instantaneas:
+        shutil.rmtree(DIRECTORIO_CACHE_LIBROS, ignore_errors=True)
+
+
+def medir_tamano(ruta: str, tamanos: Dict, reconciliar: bool, legado: bool) -> Dict:
+    """
+    Mide un archivo: tiempos sin tracemalloc (lectura del XML y desde la instantánea en caché)
+    y, en una pasada aparte, el pico de memoria.
+    """
+    almacen = AlmacenEnMemoria()
+    almacen.instalar()
+    # La mitad del catálogo tiene embedding
+    almacen.coleccion("puc_embeddings").insert_many({"code": str(codigo)[:6]} for codigo in tamanos["catalogo"][::2])
+    if reconciliar:
+        procesar(ruta, almacen, reconciliar=False)
+    limpiar_cache_libros()
+    lectura, escritura = procesar(ruta, almacen, reconciliar)
+    limpiar_cache_libros(conservar_instantaneas=True)
+    lectura_instantanea, _ = procesar(ruta, almacen, reconciliar)
+
+    limpiar_cache_libros()
+    tracemalloc.start()
+    procesar(ruta, almacen, reconciliar)
+    pico = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    resultado = {
+        "filas": tamanos["filas"],
+        "hoja5": tamanos["hoja5"],
+        "cuentas": tamanos["cuentas"],
+        "lectura_s": lectura,
+        "escritura_s": escritura,
+        "instantanea_s": lectura_instantanea,
+        "filas_s": tamanos["filas"] / (lectura + escritura),
+        "pico_mb": pico / 2 ** 20,
+        "client_pucs": len(almacen.coleccion("client_pucs").documentos),
+    }
+    if legado:
+        resultado["legado_s"] = procesar_legado(ruta)
+    return resultado
+
+# =============================
+# MAIN
+# =============================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark de escalabilidad del onboarding de causación")
+    parser.add_argument("--filas", type=int, nargs="+", default=[1_000, 10_000, 50_000], help="Filas de la Hoja1 por tamaño")
+    parser.add_argument("--hoja5", type=int, nargs="+", default=[50, 500], help="Códigos PUC de la Hoja5 por tamaño")
+    parser.add_argument("--proporcion-cuentas", type=float, default=0.05, help="Cuentas distintas como fracción de las filas")
+    parser.add_argument("--relleno", type=int, default=20, help="Columnas de relleno con valor en cada fila de la Hoja1")
+    parser.add_argument("--reconciliar", action="store_true", help="Medir la reconciliación de client_pucs sobre una carga previa")
+    parser.add_argument("--legado", action="store_true", help="Medir también la lectura anterior (lenta con tamaños grandes)")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    directorio_original = os.getcwd()
+    filas_reporte = []
+    with tempfile.TemporaryDirectory() as directorio_trabajo:
+        # La caché de puc_embeddings (results/cache/...) queda dentro del directorio temporal
+        os.chdir(directorio_trabajo)
+        try:
+            for tamano_hoja5 in args.hoja5:
+                for filas in args.filas:
+                    ruta = os.path.join(directorio_trabajo, f"modelo_{filas}_{tamano_hoja5}.xlsx")
+                    tamanos = generar_modelo_causacion(ruta, filas, tamano_hoja5, args.proporcion_cuentas, args.relleno)
+                    filas_reporte.append(medir_tamano(ruta, tamanos, args.reconciliar, args.legado))
+                    os.remove(ruta)
+        finally:
+            os.chdir(directorio_original)
+
+    encabezado = f"{'Filas':>9} {'Hoja5':>7} {'Cuentas':>8} {'Lectura (s)':>12} {'Escritura (s)':>14} {'Caché (s)':>10} {'Filas/s':>10} {'Pico (MB)':>10}"
+    if args.legado:
+        encabezado += f" {'Legado (s)':>11} {'Legado filas/s':>15}"
+    print(encabezado)
+    for fila in filas_reporte:
+        linea = (f"{fila['filas']:>9} {fila['hoja5']:>7} {fila['cuentas']:>8} {fila['lectura_s']:>12.3f} "
+                 f"{fila['escritura_s']:>14.3f} {fila['instantanea_s']:>10.3f} {fila['filas_s']:>10.0f} {fila['pico_mb']:>10.1f}")
+        if args.legado:
+            linea += f" {fila['legado_s']:>11.3f} {fila['filas'] / fila['legado_s']:>15.0f}"
+        print(linea)
+
+
+if __name__ == "__main__":
+    main()
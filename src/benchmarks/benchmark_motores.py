@@ -0,0 +1,117 @@
+"""
+Benchmark comparativo de los motores pandas y polars para el Libro Auxiliar.
+
+Para cada CSV de entrada mide el tiempo de limpieza (paso 3) con ambos motores y verifica
+que los archivos *_Procesado.csv sean idénticos byte a byte. Luego mide la lectura y
+agrupación por NIT (paso 4, sin subir a MongoDB) y verifica que los proveedores coincidan.
+
+Uso:
+    python src/benchmarks/benchmark_motores.py [--entrada data/proveedores] [--repeticiones 1]
+    python src/benchmarks/benchmark_motores.py --entrada results/sinteticos/proveedores --conteos results/sinteticos/conteos_esperados.json
+"""
+
+import argparse
+import contextlib
+import filecmp
+import io
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Rutas del proyecto (los módulos usan imports relativos a src/ y a la raíz)
+project_root = str(Path(__file__).parent.parent.parent)
+src_root = str(Path(__file__).parent.parent)
+for ruta in (project_root, src_root):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from proveedores.limpiar_excels_proveedores import CONTEOS_ESPERADOS, MOTORES_DISPONIBLES, obtener_procesador_libro_auxiliar
+from proveedores.subir_proveedores_mongodb import leer_y_procesar_csvs
+
+# =============================
+# MEDICIONES
+# =============================
+def medir(funcion, *args, repeticiones=1, **kwargs):
+    """
+    Ejecuta la función `repeticiones` veces sin salida por consola y retorna (mejor tiempo, último resultado).
+    """
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            resultado = funcion(*args, **kwargs)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, resultado
+
+
+def comparar_limpieza(directorio_entrada, directorio_trabajo, conteos_esperados, repeticiones):
+    """
+    Limpia cada CSV con ambos motores y compara los archivos generados.
+    Retorna una lista de filas para el reporte.
+    """
+    filas_reporte = []
+    archivos = sorted(f for f in os.listdir(directorio_entrada) if f.endswith('.csv'))
+    for archivo in archivos:
+        entrada = os.path.join(directorio_entrada, archivo)
+        tiempos = {}
+        salidas = {}
+        for motor in MOTORES_DISPONIBLES:
+            carpeta_salida = os.path.join(directorio_trabajo, motor)
+            os.makedirs(carpeta_salida, exist_ok=True)
+            salidas[motor] = os.path.join(carpeta_salida, archivo.replace('.csv', '_Procesado.csv'))
+            procesar = obtener_procesador_libro_auxiliar(motor)
+            tiempos[motor], _ = medir(procesar, entrada, salidas[motor], conteos_esperados.get(archivo), repeticiones=repeticiones)
+        identicos = filecmp.cmp(salidas["pandas"], salidas["polars"], shallow=False)
+        filas_reporte.append((archivo, tiempos["pandas"], tiempos["polars"], identicos))
+    return filas_reporte
+
+
+def comparar_agrupacion(directorio_trabajo, repeticiones):
+    """
+    Lee y agrupa por NIT los CSV procesados con ambos motores y compara los proveedores.
+    """
+    tiempos = {}
+    proveedores = {}
+    for motor in MOTORES_DISPONIBLES:
+        carpeta = os.path.join(directorio_trabajo, motor)
+        tiempos[motor], (proveedores[motor], _, _) = medir(leer_y_procesar_csvs, motor, carpeta, repeticiones=repeticiones)
+    return tiempos, proveedores["pandas"] == proveedores["polars"], len(proveedores["pandas"])
+
+# =============================
+# MAIN
+# =============================
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pandas vs polars del Libro Auxiliar")
+    parser.add_argument("--entrada", default=os.path.join("data", "proveedores"), help="Carpeta con los CSV del Libro Auxiliar")
+    parser.add_argument("--repeticiones", type=int, default=1, help="Repeticiones por medición (se reporta la mejor)")
+    parser.add_argument("--conteos", default=None, help="JSON con los conteos esperados (p. ej. el de generar_datos_sinteticos.py)")
+    args = parser.parse_args()
+
+    conteos_esperados = CONTEOS_ESPERADOS
+    if args.conteos:
+        with open(args.conteos, encoding="utf-8") as archivo:
+            conteos_esperados = json.load(archivo)
+
+    logging.disable(logging.INFO)
+    with tempfile.TemporaryDirectory() as directorio_trabajo:
+        filas = comparar_limpieza(args.entrada, directorio_trabajo, conteos_esperados, args.repeticiones)
+        print(f"{'Archivo':<45} {'pandas (s)':>11} {'polars (s)':>11} {'x':>6}  Idéntico")
+        for archivo, t_pandas, t_polars, identicos in filas:
+            print(f"{archivo:<45} {t_pandas:>11.3f} {t_polars:>11.3f} {t_pandas / t_polars:>6.1f}  {'✓' if identicos else '✗'}")
+
+        tiempos, iguales, total = comparar_agrupacion(directorio_trabajo, args.repeticiones)
+        print(f"\n{'Agrupación por NIT':<45} {tiempos['pandas']:>11.3f} {tiempos['polars']:>11.3f} "
+              f"{tiempos['pandas'] / tiempos['polars']:>6.1f}  {'✓' if iguales else '✗'} ({total} proveedores)")
+
+    if not all(fila[3] for fila in filas) or not iguales:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
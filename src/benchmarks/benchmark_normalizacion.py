@@ -0,0 +1,173 @@
+"""
+Microbenchmark de utils/normalizacion.py.
+
+Genera valores con los formatos que aparecen en los archivos de entrada (NIT con puntos, comas,
+guiones y espacios, precios con separador de miles, descripciones de facturas) y para cada
+función compara:
+- la implementación anterior (filter(str.isdigit, ...), strip/split por fila),
+- la versión escalar del módulo (con caché de NIT),
+- la versión para pd.Series,
+verificando que las tres den el mismo resultado.
+
+Uso:
+    python src/benchmarks/benchmark_normalizacion.py [--valores 200000] [--distintos 5000] [--repeticiones 3]
+"""
+
+import argparse
+import math
+import random
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+# Rutas del proyecto (los módulos usan imports relativos a src/ y a la raíz)
+project_root = str(Path(__file__).parent.parent.parent)
+src_root = str(Path(__file__).parent.parent)
+for ruta in (project_root, src_root):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from utils.normalizacion import (
+    convertir_precio,
+    convertir_precio_serie,
+    extraer_id_factura,
+    extraer_id_factura_serie,
+    limpiar_campo,
+    limpiar_campo_serie,
+    limpiar_nit,
+    limpiar_nit_serie,
+)
+
+# =============================
+# IMPLEMENTACIONES ANTERIORES (referencia)
+# =============================
+def limpiar_nit_anterior(nit_raw):
+    return ''.join(filter(str.isdigit, nit_raw or ''))
+
+
+def limpiar_campo_anterior(valor):
+    if valor is None:
+        return ''
+    return valor.strip()
+
+
+def convertir_precio_anterior(cadena_valor):
+    limpiado = cadena_valor.replace(',', '')
+    try:
+        return float(limpiado)
+    except ValueError:
+        return 0.0
+
+
+def extraer_id_factura_anterior(descripcion_archivo):
+    descripcion_archivo = descripcion_archivo.strip()
+    if not descripcion_archivo:
+        return 0
+    partes = descripcion_archivo.split()
+    for parte in partes:
+        if any(char.isdigit() for char in parte):
+            return parte
+
+# =============================
+# DATOS
+# =============================
+def generar_valores(cantidad, distintos, semilla=42):
+    """
+    Genera las columnas de prueba. Los NIT se repiten (`distintos` valores únicos) como en un
+    Libro Auxiliar, donde cada proveedor aparece en muchas filas.
+    """
+    aleatorio = random.Random(semilla)
+
+    def nit():
+        numero = aleatorio.randint(1_000_000, 999_999_999)
+        formato = aleatorio.choice(["{:,}", "{:,}-{}", "CC {:,}", " {} ", "{}.{}", "NIT {}-{}"])
+        return formato.format(numero, aleatorio.randint(0, 9)).replace(",", aleatorio.choice([",", "."]))
+
+    def precio():
+        opcion = aleatorio.random()
+        if opcion < 0.05:
+            return aleatorio.choice(["", "N/A", "-", " "])
+        return f"{aleatorio.uniform(0, 5_000_000):,.{aleatorio.choice([0, 2, 5])}f}"
+
+    def descripcion():
+        opcion = aleatorio.random()
+        if opcion < 0.05:
+            return aleatorio.choice(["", "   ", "FACTURA ARRIENDO"])
+        return f"{aleatorio.choice(['FACTURA', 'Fact.', ''])} {aleatorio.choice(['FE', 'SETT', 'A'])}-{aleatorio.randint(1, 99999)} ARRIENDO"
+
+    nits_unicos = [nit() for _ in range(distintos)]
+    return {
+        "nit": [aleatorio.choice(nits_unicos) for _ in range(cantidad)],
+        "campo": [aleatorio.choice(["  texto ", "valor", "", "  ", "R-99-PN "]) for _ in range(cantidad)],
+        "precio": [precio() for _ in range(cantidad)],
+        "factura": [descripcion() for _ in range(cantidad)],
+    }
+
+# =============================
+# MEDICIONES
+# =============================
+def medir(funcion, argumento, repeticiones):
+    """
+    Retorna (mejor tiempo, resultado) de ejecutar funcion(argumento) `repeticiones` veces.
+    """
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion(argumento)
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, resultado
+
+
+def iguales(a, b):
+    if isinstance(a, float) and isinstance(b, float):
+        return a == b or (math.isnan(a) and math.isnan(b))
+    return type(a) is type(b) and a == b
+
+
+def comparar(nombre, valores, anterior, escalar, vectorizada, repeticiones):
+    """
+    Mide las tres variantes sobre los mismos valores y verifica que coincidan.
+    Retorna la fila del reporte.
+    """
+    t_anterior, r_anterior = medir(lambda v: [anterior(x) for x in v], valores, repeticiones)
+    t_escalar, r_escalar = medir(lambda v: [escalar(x) for x in v], valores, repeticiones)
+    t_serie, r_serie = medir(lambda v: vectorizada(pd.Series(v, dtype=object)).tolist(), valores, repeticiones)
+    diferencias = sum(
+        not (iguales(a, b) and iguales(a, c)) for a, b, c in zip(r_anterior, r_escalar, r_serie)
+    )
+    return {
+        "funcion": nombre,
+        "anterior_s": round(t_anterior, 4),
+        "escalar_s": round(t_escalar, 4),
+        "serie_s": round(t_serie, 4),
+        "diferencias": diferencias,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Microbenchmark de utils/normalizacion.py")
+    parser.add_argument("--valores", type=int, default=200_000, help="Cantidad de valores por función")
+    parser.add_argument("--distintos", type=int, default=5_000, help="NIT distintos entre los valores")
+    parser.add_argument("--repeticiones", type=int, default=3, help="Repeticiones por medición (se reporta la mejor)")
+    args = parser.parse_args()
+
+    datos = generar_valores(args.valores, args.distintos)
+    filas = [
+        comparar("limpiar_nit", datos["nit"], limpiar_nit_anterior, limpiar_nit, limpiar_nit_serie, args.repeticiones),
+        comparar("limpiar_campo", datos["campo"], limpiar_campo_anterior, limpiar_campo, limpiar_campo_serie, args.repeticiones),
+        comparar("convertir_precio", datos["precio"], convertir_precio_anterior, convertir_precio, convertir_precio_serie, args.repeticiones),
+        comparar("extraer_id_factura", datos["factura"], extraer_id_factura_anterior, extraer_id_factura, extraer_id_factura_serie, args.repeticiones),
+    ]
+    print(pd.DataFrame(filas).to_string(index=False))
+    if any(fila["diferencias"] for fila in filas):
+        print("\nHay diferencias entre las implementaciones.")
+        sys.exit(1)
+    print("\nLas tres implementaciones coinciden en todos los valores.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,703 @@
+"""
+Generador de datos sintéticos a gran escala para los benchmarks del onboarding.
+
+Produce, con la misma estructura que los archivos de muestra en data/, un conjunto completo
+de entradas sin datos de clientes:
+    - proveedores/        Libros Auxiliares de Siigo (CSV latin1 con preámbulo y filas TOTAL)
+    - productos/          Lista de productos de Siigo (CSV con preámbulo)
+    - modelos_terceros/   Modelo de terceros (CSV)
+    - modelos_causacion/  Modelo de causación (xlsx con Hoja1 a Hoja5)
+    - facturas/           Un zip por factura con su PDF y su XML (UBL)
+    - conteos_esperados.json  Conteos de validación del Libro Auxiliar (mismo formato que CONTEOS_ESPERADOS)
+
+Los encabezados se toman de las plantillas en data/; todos los valores son generados.
+El tamaño se controla con --filas (filas del Libro Auxiliar); el resto de entradas se escala
+en la misma proporción respecto a la muestra de Surtiflora, o con --escala explícita.
+
+Uso:
+    python src/benchmarks/generar_datos_sinteticos.py --filas 100000 --salida results/sinteticos
+"""
+
+import argparse
+import csv
+import datetime
+import hashlib
+import json
+import os
+import random
+import sys
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
+
+import openpyxl
+
+# Rutas del proyecto (los módulos usan imports relativos a src/ y a la raíz)
+project_root = str(Path(__file__).parent.parent.parent)
+src_root = str(Path(__file__).parent.parent)
+for ruta in (project_root, src_root):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
+
+from utils.encabezados import detectar_encabezado_archivo, leer_lineas_iniciales, PATRONES_PRODUCTOS
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+TIPOS_DISPONIBLES = ("libro_auxiliar", "productos", "terceros", "causacion", "facturas")
+
+# Tamaños de la muestra de Surtiflora por cada 10.000 filas de Libro Auxiliar
+FILAS_BASE_LIBRO = 10_000
+TAMANOS_BASE = {
+    "productos": 915,
+    "terceros": 1_850,
+    "causacion": 518,
+}
+
+PLANTILLA_PRODUCTOS = os.path.join("productos", "SurtifloraListaProductos.csv")
+PLANTILLA_TERCEROS = os.path.join("modelos_terceros", "Surtiflora-Modelo_de_terceros.csv")
+PLANTILLA_CAUSACION = os.path.join("modelos_causacion", "SurtifloraModeloCausacionAbril2025.xlsx")
+
+EMPRESA = "EMPRESA SINTETICA SAS"
+NIT_EMPRESA = "900000001"
+ENCABEZADO_LIBRO = [
+    "NIVEL", "CUENTA", "DESCRIPCION", "TERCERO", "IDENTIFICACION", "DIG.VER.", "SUCURSAL", "NOMBRE TERCERO",
+    "COMPROBANTE", "FECHA", "DETALLE", "CENTRO COSTO", "INV-CRUC-BASE", "DEBITOS", "CREDITOS", "SALDO ACUMULADO",
+]
+MESES = ["ENE", "FEB", "MAR", "ABR", "MAY", "JUN", "JUL", "AGO", "SEP", "OCT", "NOV", "DIC"]
+
+# Catálogo PUC por sección de la Hoja5: (código, item, cálculo, fuente)
+FUENTE_PRECIO = "precio_unitario_de_venta_factura\ntotal_bruto_factura"
+CATALOGO_HOJA5 = {
+    "Facturas de arrendamiento": [
+        (6155050000, "Canon de arrendamiento", None, FUENTE_PRECIO),
+        (2408150100, "IVA", None, "iva_factura"),
+        (2365300500, "Retención en la fuente arrendamientos", None, "retefuente_factura"),
+        (2468050500, "Retención de ICA", None, "reteica_factura"),
+        (2335400000, "Cuenta por pagar al proveedor", "Total factura - Retenciones", None),
+    ],
+    "Facturas de servicios": [
+        (6135050300, "Servicio adquirido como costo de venta", None, FUENTE_PRECIO),
+        (5235500000, "Servicio de mensajería, transporte o acarreo", None, FUENTE_PRECIO),
+        (5195600000, "Servicio de restaurante", None, FUENTE_PRECIO),
+        (5135550000, "Servicios públicos", None, FUENTE_PRECIO),
+        (5135350000, "Servicio de telefonía", None, "precio_unitario_de_venta_factura"),
+        (2408150100, "IVA", None, "iva_factura"),
+        (2367010100, "Reteiva", "IVA * 15%", None),
+        (2365250300, "Retención en la fuente servicios", None, "retefuente_factura"),
+        (2335500000, "Cuenta por pagar al proveedor (Servicios)", "Total factura - Retenciones", None),
+    ],
+    "Facturas de productos": [
+        (1405050100, "Materia prima", None, "precio_unitario_de_venta_factura"),
+        (1435010000, "Mercancía no fabricada por la empresa", "precio_unitario + ICL + ADV", None),
+        (5195250000, "Aseo y cafetería", None, "precio_unitario_de_venta_factura\ntotal_factura"),
+        (5195300000, "Papelería", None, "precio_unitario_de_venta_factura\ntotal_factura"),
+        (6135050400, "Varios", None, "precio_unitario_de_venta_factura\ntotal_factura"),
+        (2408100200, "IVA 19%", "sum iva 19% de cada item", None),
+        (2365400100, "Retención en la fuente compras", None, "retefuente_factura"),
+        (2468051500, "Reteica", None, "reteica_factura"),
+        (2335050000, "Cuenta por pagar al proveedor", "Total factura - Retenciones", None),
+    ],
+}
+
+# Tipos de factura de la Hoja1 con su frecuencia en la muestra y sus cuentas de gasto/costo
+TIPOS_FACTURA = [
+    ("Productos - Inventario", 0.65, "Facturas de productos", [1405050100, 1435010000]),
+    ("Servicio - Gasto", 0.15, "Facturas de servicios", [5235500000, 5195600000, 5135550000, 5135350000]),
+    ("Productos - Costo", 0.09, "Facturas de productos", [6135050400]),
+    ("Productos - Gasto", 0.08, "Facturas de productos", [5195250000, 5195300000]),
+    ("Arrendamiento", 0.02, "Facturas de arrendamiento", [6155050000]),
+    ("Servicio - Costo", 0.01, "Facturas de servicios", [6135050300]),
+]
+
+# Cuentas del Libro Auxiliar que no son de gasto/costo (el limpiador las descarta)
+CUENTAS_BALANCE = [
+    (1105050000, "CAJA GENERAL"),
+    (1110050000, "BANCOS NACIONALES"),
+    (1305050000, "CLIENTES NACIONALES"),
+    (2205010000, "PROVEEDORES NACIONALES"),
+    (2335050000, "COSTOS Y GASTOS POR PAGAR"),
+    (2408150100, "IVA DESCONTABLE"),
+    (2365400100, "RETENCION EN LA FUENTE COMPRAS"),
+]
+CUENTAS_RESULTADO = [
+    (5105060000, "SUELDOS"),
+    (5135050000, "ASEO Y VIGILANCIA"),
+    (5135350000, "TELEFONO"),
+    (5135550000, "SERVICIOS PUBLICOS"),
+    (5145200000, "MANTENIMIENTO EQUIPOS"),
+    (5155050000, "ALOJAMIENTO Y MANUTENCION"),
+    (5195250100, "ASEO Y CAFETERIA"),
+    (5195300000, "UTILES Y PAPELERIA"),
+    (5235500000, "TRANSPORTE FLETES Y ACARREOS"),
+    (6135050300, "COSTO DE VENTA SERVICIOS"),
+    (6135050400, "COSTO DE VENTA MERCANCIAS"),
+    (6155050000, "ARRENDAMIENTOS"),
+]
+# Proporción de filas de gasto/costo (5 y 6) en los Libros Auxiliares de la muestra
+PROPORCION_RESULTADO = 0.7
+
+NOMBRES = ["JUAN", "CARLOS", "ANDRES", "MARIA", "LUISA", "JORGE", "DIANA", "PAULA", "SERGIO", "CAMILA",
+           "FELIPE", "NATALIA", "OSCAR", "LAURA", "DAVID", "SANDRA", "JAVIER", "CLAUDIA", "MAURICIO", "ANA"]
+APELLIDOS = ["GOMEZ", "RODRIGUEZ", "MARTINEZ", "GARCIA", "LOPEZ", "HERNANDEZ", "DIAZ", "PEREZ", "SANCHEZ",
+             "RAMIREZ", "TORRES", "FLOREZ", "RIVERA", "GIRALDO", "MEJIA", "RESTREPO", "OSPINA", "CARDONA"]
+PALABRAS_EMPRESA = ["COMERCIALIZADORA", "DISTRIBUIDORA", "INVERSIONES", "SERVICIOS", "TRANSPORTES",
+                    "FLORES", "AGROINDUSTRIAL", "SUMINISTROS", "LOGISTICA", "SOLUCIONES"]
+SECTORES = ["DEL CAMPO", "ANDINA", "DEL VALLE", "NACIONAL", "INTEGRALES", "GLOBAL", "DEL ORIENTE", "DE LA SABANA"]
+SUFIJOS_EMPRESA = ["SAS", "S.A.S.", "LTDA", "S.A."]
+PRODUCTOS = ["ROSAS", "CLAVELES", "LIRIOS", "GIRASOLES", "ASTROMELIAS", "HORTENSIAS", "CRISANTEMOS",
+             "ORQUIDEAS", "GERBERAS", "TULIPANES", "FOLLAJE", "CAJAS", "CINTAS", "BASES"]
+COLORES = ["ROJAS", "BLANCAS", "AMARILLAS", "FUCSIA", "NARANJA", "MIXTAS", "ROSADAS", "LILA"]
+RESPONSABILIDADES = ["R-99-PN", "O-13", "O-15", "O-47", "O-13;O-15"]
+ACTIVIDADES = ["4620", "4690", "4923", "4520", "5611", "6810", "8299", "0125"]
+
+# =============================
+# FUNCIONES AUXILIARES
+# =============================
+def digito_verificacion(nit: str) -> int:
+    """
+    Calcula el dígito de verificación de un NIT con el algoritmo de la DIAN.
+    """
+    pesos = [3, 7, 13, 17, 19, 23, 29, 37, 41, 43, 47, 53, 59, 67, 71]
+    suma = sum(int(digito) * peso for digito, peso in zip(reversed(nit), pesos))
+    residuo = suma % 11
+    return residuo if residuo < 2 else 11 - residuo
+
+
+def formatear_miles(valor: float, decimales: int = 2) -> str:
+    """
+    Formatea un número como lo exporta Siigo: "4,846,894.00".
+    """
+    return f"{valor:,.{decimales}f}"
+
+
+def pesos_zipf(cantidad: int, rng: random.Random) -> List[float]:
+    """
+    Pesos con distribución tipo Zipf en orden aleatorio: pocos elementos concentran la mayoría de filas.
+    """
+    pesos = [1 / (rango + 1) for rango in range(cantidad)]
+    rng.shuffle(pesos)
+    return pesos
+
+
+def valor_aleatorio(rng: random.Random, mediana: float = 450_000) -> float:
+    """
+    Valor monetario con distribución lognormal (en pesos, sin centavos).
+    """
+    return float(round(rng.lognormvariate(0, 1.2) * mediana))
+
+
+def generar_terceros(cantidad: int, rng: random.Random) -> List[Dict]:
+    """
+    Genera terceros únicos: personas naturales (cédula) y personas jurídicas (NIT 8xx/9xx).
+    """
+    terceros = []
+    vistos = set()
+    while len(terceros) < cantidad:
+        persona_natural = rng.random() < 0.4
+        if persona_natural:
+            nit = str(rng.randint(1_000_000, 1_199_999_999))
+            nombres = rng.choice(NOMBRES)
+            apellidos = f"{rng.choice(APELLIDOS)} {rng.choice(APELLIDOS)}"
+            nombre = f"{apellidos} {nombres}"
+        else:
+            nit = str(rng.randint(800_000_000, 999_999_999))
+            nombres, apellidos = "", ""
+            nombre = f"{rng.choice(PALABRAS_EMPRESA)} {rng.choice(SECTORES)} {rng.choice(SUFIJOS_EMPRESA)}"
+        if nit in vistos:
+            continue
+        vistos.add(nit)
+        terceros.append({
+            "nit": nit,
+            "dv": digito_verificacion(nit),
+            "nombre": nombre,
+            "nombres": nombres,
+            "apellidos": apellidos,
+            "persona_natural": persona_natural,
+        })
+    return terceros
+
+
+def leer_encabezado_csv(ruta: str, indice: int = 0) -> Tuple[List[str], List[List[str]]]:
+    """
+    Retorna la fila de encabezado de una plantilla CSV y las filas de preámbulo que la preceden.
+    """
+    filas, _ = leer_lineas_iniciales(ruta, max_lineas=indice + 1, codificaciones=("utf-8-sig", "latin1"))
+    return filas[indice], filas[:indice]
+
+
+def escribir_filas_por_nombre(escritor, encabezado: List[str], filas, relleno: str = " ") -> int:
+    """
+    Escribe filas expresadas como diccionarios {columna: valor} en el orden del encabezado.
+    Como en las exportaciones de Siigo, las columnas sin valor se rellenan con espacios en lugar de quedar vacías.
+    """
+    total = 0
+    for fila in filas:
+        escritor.writerow([fila.get(columna, relleno) for columna in encabezado])
+        total += 1
+    return total
+
+# =============================
+# LIBRO AUXILIAR
+# =============================
+def generar_libro_auxiliar(ruta: str, anio: int, filas: int, proveedores: List[Dict], rng: random.Random) -> Dict:
+    """
+    Escribe un Libro Auxiliar por tercero con el formato de exportación de Siigo y retorna sus conteos esperados.
+
+    El archivo se ordena por cuenta, tercero y fecha; cada cuenta cierra con una fila TOTAL CUENTA
+    y el saldo acumulado corre por cuenta y tercero.
+    """
+    cuentas = CUENTAS_RESULTADO + CUENTAS_BALANCE
+    es_resultado = [True] * len(CUENTAS_RESULTADO) + [False] * len(CUENTAS_BALANCE)
+    pesos_cuentas = [
+        (PROPORCION_RESULTADO / len(CUENTAS_RESULTADO)) if resultado else ((1 - PROPORCION_RESULTADO) / len(CUENTAS_BALANCE))
+        for resultado in es_resultado
+    ]
+    pesos_proveedores = pesos_zipf(len(proveedores), rng)
+    inicio = datetime.date(anio, 1, 1)
+    dias_anio = (datetime.date(anio, 12, 31) - inicio).days + 1
+
+    movimientos: Dict[int, List[Tuple]] = {}
+    indices_cuenta = rng.choices(range(len(cuentas)), weights=pesos_cuentas, k=filas)
+    indices_proveedor = rng.choices(range(len(proveedores)), weights=pesos_proveedores, k=filas)
+    for numero, (i_cuenta, i_proveedor) in enumerate(zip(indices_cuenta, indices_proveedor)):
+        fecha = inicio + datetime.timedelta(days=rng.randrange(dias_anio))
+        movimientos.setdefault(i_cuenta, []).append((proveedores[i_proveedor]["nit"], fecha, numero, i_proveedor))
+
+    conteos = {"total_rows": 0, "puc_5_rows": 0, "puc_6_rows": 0}
+    proveedores_por_nit = {p["nit"]: p for p in proveedores}
+    with open(ruta, "w", newline="", encoding="latin1") as archivo:
+        escritor = csv.writer(archivo)
+        vacio = [""] * (len(ENCABEZADO_LIBRO) - 1)
+        escritor.writerow([EMPRESA] + vacio)
+        escritor.writerow([f"NIT: {formatear_miles(int(NIT_EMPRESA), 0)}-{digito_verificacion(NIT_EMPRESA)}"] + vacio)
+        escritor.writerow(["LIBRO AUXILIAR POR TERCERO"] + vacio)
+        escritor.writerow([f"DE: ENE 1/{anio}  A: DIC 31/{anio}"] + vacio)
+        escritor.writerow([f"FECHA DE IMPRESION: {datetime.date(anio + 1, 1, 15).strftime('%d/%m/%Y')}"] + vacio)
+        escritor.writerow([""] + vacio)
+        escritor.writerow([""] + vacio)
+        escritor.writerow(ENCABEZADO_LIBRO)
+
+        for i_cuenta in sorted(movimientos, key=lambda i: cuentas[i][0]):
+            codigo, descripcion = cuentas[i_cuenta]
+            resultado = es_resultado[i_cuenta]
+            saldo_por_tercero: Dict[str, float] = {}
+            total_cuenta = 0.0
+            for nit, fecha, numero, _ in sorted(movimientos[i_cuenta]):
+                tercero = proveedores_por_nit[nit]
+                valor = valor_aleatorio(rng)
+                # Las cuentas de resultado se mueven al débito; las de balance, mayormente al crédito
+                debito_normal = resultado or rng.random() < 0.3
+                debito, credito = (valor, 0.0) if debito_normal else (0.0, valor)
+                saldo = saldo_por_tercero.get(nit, 0.0) + debito - credito
+                saldo_por_tercero[nit] = saldo
+                total_cuenta += valor
+                escritor.writerow([
+                    6, codigo, descripcion,
+                    f"{nit} {tercero['nombre']}", formatear_miles(int(nit), 0), tercero["dv"], 0, tercero["nombre"],
+                    f"{rng.choice('PGL')}-{rng.randint(1, 3)}-{numero}", fecha.strftime("%d/%m/%Y"),
+                    f"FACTURA {rng.choice(['FE', 'FEV', 'E'])} {rng.randint(100, 99_999)}",
+                    rng.choice(["", "", 1, 2, 3]) if resultado else "", "",
+                    formatear_miles(debito), formatear_miles(credito), formatear_miles(saldo),
+                ])
+                if resultado:
+                    conteos["total_rows"] += 1
+                    conteos["puc_5_rows" if str(codigo).startswith("5") else "puc_6_rows"] += 1
+            escritor.writerow(["", "TOTAL CUENTA"] + [""] * 11 + [formatear_miles(total_cuenta), "", ""])
+    conteos["description"] = os.path.splitext(os.path.basename(ruta))[0]
+    return conteos
+
+# =============================
+# PRODUCTOS Y TERCEROS
+# =============================
+def generar_productos(ruta_plantilla: str, ruta: str, cantidad: int, proveedores: List[Dict], rng: random.Random) -> int:
+    """
+    Escribe la lista de productos con el preámbulo y el encabezado de la plantilla de Siigo.
+    """
+    indice, _, _ = detectar_encabezado_archivo(ruta_plantilla, PATRONES_PRODUCTOS, codificaciones=("utf-8-sig", "latin1"))
+    encabezado, preambulo = leer_encabezado_csv(ruta_plantilla, indice)
+    columnas_nit = [c for c in encabezado if c.startswith("NIT PROVEEDOR")]
+
+    def filas():
+        for numero in range(1, cantidad + 1):
+            producto = f"{rng.choice(PRODUCTOS)} {rng.choice(COLORES)}"
+            precio = valor_aleatorio(rng, mediana=20_000)
+            fila = {
+                encabezado[0]: rng.randint(1, 20),
+                encabezado[1]: rng.randint(1, 9),
+                encabezado[2]: numero,
+                encabezado[3]: producto.ljust(50),
+                encabezado[4]: f"'{producto.title()} x {rng.choice([10, 12, 20, 25])}".ljust(60),
+                encabezado[6]: formatear_miles(precio),
+                "IVA INCLUIDO": "N",
+                "PORCENTAJE DE IVA": rng.choice([0, 0, 5, 19]),
+                "COSTO DE COMPRA": formatear_miles(precio * 0.8),
+                "UNIDAD": "UN ",
+                "ACTIVO": "S",
+                "COSTO UNITARIO": formatear_miles(precio * 0.7),
+            }
+            for columna in rng.sample(columnas_nit, rng.randint(1, len(columnas_nit))):
+                fila[columna] = formatear_miles(int(rng.choice(proveedores)["nit"]), 0)
+            if len(encabezado) > 79:
+                fila[encabezado[79]] = "'94  "
+            yield fila
+
+    with open(ruta, "w", newline="", encoding="utf-8-sig") as archivo:
+        escritor = csv.writer(archivo)
+        for fila in preambulo:
+            escritor.writerow([fila[0].replace("SURTIFLORA SAS", EMPRESA) if fila else ""] + [""] * (len(encabezado) - 1))
+        escritor.writerow(encabezado)
+        return escribir_filas_por_nombre(escritor, encabezado, filas())
+
+
+def generar_modelo_terceros(ruta_plantilla: str, ruta: str, terceros: List[Dict], rng: random.Random) -> int:
+    """
+    Escribe el modelo de terceros con el encabezado de la plantilla y los campos que usa el onboarding.
+    """
+    encabezado, _ = leer_encabezado_csv(ruta_plantilla)
+
+    def buscar(fragmento: str) -> str:
+        return next((c for c in encabezado if fragmento in c.upper()), fragmento)
+
+    columna_nit = encabezado[0]
+    columna_actividad = buscar("CÓDIGO ACTIVIDAD")
+    columna_responsabilidad = buscar("RESPONSABILIDAD FISCAL")
+
+    def filas():
+        for tercero in terceros:
+            correo = f"{tercero['nombre'].split()[0].lower()}{rng.randint(1, 999)}@correo.com"
+            yield {
+                columna_nit: f"{formatear_miles(int(tercero['nit']), 0)} ",
+                "SUCURSAL  (OBLIGATORIO)": "0 ",
+                "DIGITO DE VERIFICACIÓN": f"{tercero['dv']} ",
+                "NOMBRE": tercero["nombre"].ljust(100),
+                "RAZÓN SOCIAL": "N" if tercero["persona_natural"] else "S",
+                "PRIMER NOMBRE": tercero["nombres"].ljust(25),
+                "PRIMER APELLIDO": tercero["apellidos"].split(" ")[0].ljust(25),
+                "NOMBRE DEL CONTACTO": tercero["nombre"][:50].ljust(50),
+                "DIRECCIÓN": f"CR {rng.randint(1, 99)} {rng.randint(1, 99)} {rng.randint(1, 99)}".ljust(100),
+                "PAÍS": "1 ",
+                "CIUDAD": f"{rng.choice([1, 110, 150, 200])} ",
+                "ACTIVO": "A",
+                "TELÉFONO 1": f"{formatear_miles(rng.randint(3_000_000_000, 3_299_999_999), 0)} ",
+                "CORREO ELECTRÓNICO": correo.upper().ljust(100),
+                "TIPO DE PERSONA": "1 " if tercero["persona_natural"] else "2 ",
+                columna_actividad: rng.choice(ACTIVIDADES),
+                columna_responsabilidad: "R-99-PN" if tercero["persona_natural"] else rng.choice(RESPONSABILIDADES),
+            }
+
+    with open(ruta, "w", newline="", encoding="utf-8-sig") as archivo:
+        escritor = csv.writer(archivo)
+        escritor.writerow(encabezado)
+        return escribir_filas_por_nombre(escritor, encabezado, filas())
+
+# =============================
+# MODELO DE CAUSACIÓN Y FACTURAS
+# =============================
+def generar_documentos_causacion(filas: int, proveedores: List[Dict], anio: int, mes: int, rng: random.Random) -> List[Dict]:
+    """
+    Genera documentos de causación (una factura de proveedor con sus secuencias contables) hasta
+    completar aproximadamente `filas` secuencias.
+    """
+    cuentas_seccion = {seccion: [c[0] for c in cuentas] for seccion, cuentas in CATALOGO_HOJA5.items()}
+    pesos_tipos = [tipo[1] for tipo in TIPOS_FACTURA]
+    pesos_proveedores = pesos_zipf(len(proveedores), rng)
+    documentos = []
+    total_filas = 0
+    numero_documento = 1
+    numeros_factura = set()
+    while total_filas < filas:
+        tipo, _, seccion, cuentas_base = rng.choices(TIPOS_FACTURA, weights=pesos_tipos)[0]
+        proveedor = rng.choices(proveedores, weights=pesos_proveedores)[0]
+        numero_factura = rng.randint(100, 9_999_999)
+        while numero_factura in numeros_factura:
+            numero_factura = rng.randint(100, 9_999_999)
+        numeros_factura.add(numero_factura)
+
+        cuentas = cuentas_seccion[seccion]
+        iva_cuenta = next(c for c in cuentas if str(c).startswith("2408"))
+        retencion_cuenta = next(c for c in cuentas if str(c).startswith("2365"))
+        por_pagar_cuenta = next(c for c in cuentas if str(c).startswith("233"))
+        base = valor_aleatorio(rng, mediana=1_500_000)
+        iva = round(base * 0.19) if rng.random() < 0.8 else 0
+        retencion = round(base * rng.choice([0.025, 0.035, 0.04]))
+        secuencias = [(rng.choice(cuentas_base), "D", base)]
+        if iva:
+            secuencias.append((iva_cuenta, "D", iva))
+        secuencias.append((retencion_cuenta, "C", retencion))
+        secuencias.append((por_pagar_cuenta, "C", base + iva - retencion))
+
+        dia = rng.randint(1, 28)
+        documentos.append({
+            "tipo": tipo,
+            "numero_documento": numero_documento,
+            "numero_factura": numero_factura,
+            "prefijo": rng.choice(["FE", "FEV", "E", "GA09"]),
+            "proveedor": proveedor,
+            "fecha": datetime.date(anio, mes, dia),
+            "descripcion": f"{proveedor['nombre'][:30]} {numero_factura} {MESES[mes - 1]}",
+            "secuencias": secuencias,
+        })
+        numero_documento += 1
+        total_filas += len(secuencias)
+    return documentos
+
+
+def generar_modelo_causacion(ruta_plantilla: str, ruta: str, documentos: List[Dict]) -> int:
+    """
+    Escribe el modelo de causación: Hoja1 con el encabezado de la plantilla en la fila 5 y la
+    Hoja5 con el catálogo PUC por sección (encabezado 'Código PUC' | 'Item' en la fila 4).
+    """
+    plantilla = openpyxl.load_workbook(ruta_plantilla, read_only=True)
+    encabezado = [c if c is not None else "" for c in next(plantilla["Hoja1"].iter_rows(min_row=5, max_row=5, values_only=True))]
+    plantilla.close()
+    posiciones = {}
+    for indice, nombre in enumerate(encabezado):
+        if nombre:
+            posiciones.setdefault(nombre, indice)
+
+    libro = openpyxl.Workbook(write_only=True)
+    hoja1 = libro.create_sheet("Hoja1")
+    fecha = documentos[0]["fecha"] if documentos else datetime.date.today()
+    hoja1.append([None, EMPRESA])
+    hoja1.append([None, "MODELO PARA LA IMPORTACION DE MOVIMIENTO CONTABLE - MODELO GENERAL"])
+    hoja1.append([None, f"De :  {MESES[fecha.month - 1]}  1/{fecha.year}   A :  {MESES[fecha.month - 1]} 28/{fecha.year}"])
+    hoja1.append([None, "Documento interno"])
+    hoja1.append(encabezado)
+
+    total = 0
+    for documento in documentos:
+        proveedor = documento["proveedor"]
+        for secuencia, (cuenta, naturaleza, valor) in enumerate(documento["secuencias"], start=1):
+            valores = {
+                "TIPO DE FACTURA": documento["tipo"],
+                "TIPO DE COMPROBANTE (OBLIGATORIO)": "P",
+                "CÓDIGO COMPROBANTE  (OBLIGATORIO)": 1,
+                "NÚMERO DE DOCUMENTO": documento["numero_documento"],
+                "CUENTA CONTABLE   (OBLIGATORIO)": cuenta,
+                "DÉBITO O CRÉDITO (OBLIGATORIO)": naturaleza,
+                "VALOR DE LA SECUENCIA   (OBLIGATORIO)": valor,
+                "AÑO DEL DOCUMENTO": documento["fecha"].year,
+                "MES DEL DOCUMENTO": documento["fecha"].month,
+                "DÍA DEL DOCUMENTO": documento["fecha"].day,
+                "CÓDIGO DEL VENDEDOR": 1,
+                "CÓDIGO DE LA CIUDAD": 110,
+                "CÓDIGO DE LA ZONA": 1,
+                "SECUENCIA": secuencia,
+                "CENTRO DE COSTO": 1 if secuencia == 1 else 0,
+                "SUBCENTRO DE COSTO": 0,
+                "NIT": int(proveedor["nit"]),
+                "SUCURSAL": 0,
+                "DESCRIPCIÓN DE LA SECUENCIA": documento["descripcion"].ljust(50),
+                "COMPROBANTE ANULADO": "N",
+                "NÚMERO DEL DOCUMENTO DEL PROVEEDOR": documento["numero_factura"],
+                "PREFIJO DEL DOCUMENTO DEL PROVEEDOR": f"'{documento['prefijo']}".ljust(11),
+                "AÑO DOCUMENTO DEL PROVEEDOR": documento["fecha"].year,
+                "MES DOCUMENTO DEL PROVEEDOR": documento["fecha"].month,
+                "DÍA DOCUMENTO DEL PROVEEDOR": documento["fecha"].day,
+            }
+            fila = [None] * len(encabezado)
+            for nombre, valor_celda in valores.items():
+                if nombre in posiciones:
+                    fila[posiciones[nombre]] = valor_celda
+            hoja1.append(fila)
+            total += 1
+
+    hoja2 = libro.create_sheet("Hoja2")
+    hoja2.append([])
+    hoja2.append([None, "NIT", "NÚMERO DE DOCUMENTO", "CUENTA CONTABLE   (OBLIGATORIO)", "DÉBITO O CRÉDITO (OBLIGATORIO)",
+                  "Suma de VALOR DE LA SECUENCIA   (OBLIGATORIO)"])
+    hoja3 = libro.create_sheet("Hoja3")
+    hoja3.append([])
+    hoja3.append([None, "Número de documento Consecutivo NDR", "Número de factura DIAN", "Archivo zip", "Coincidencia"])
+    for documento in documentos[:1000]:
+        hoja3.append([None, documento["numero_documento"], f"{documento['prefijo']:<10}{documento['numero_factura']}",
+                      documento["numero_factura"], "Si"])
+    hoja4 = libro.create_sheet("Hoja4")
+    hoja4.append([])
+    hoja4.append([None, "Códigos PUC", "Significado"])
+    for cuentas in CATALOGO_HOJA5.values():
+        for codigo, item, _, _ in cuentas:
+            hoja4.append([None, codigo, item])
+
+    hoja5 = libro.create_sheet("Hoja5")
+    hoja5.append([])
+    hoja5.append([])
+    for seccion, cuentas in CATALOGO_HOJA5.items():
+        hoja5.append([None, seccion])
+        hoja5.append([None, "Código PUC", "Item", "Cálculo", "Fuente"])
+        for codigo, item, calculo, fuente in cuentas:
+            hoja5.append([None, codigo, item, calculo, fuente])
+    libro.save(ruta)
+    return total
+
+
+def construir_pdf_factura(documento: Dict) -> bytes:
+    """
+    Construye un PDF mínimo con el número de factura y una tabla con bordes cuya columna
+    'Descripción' pueden leer pdfplumber y pdfquery.
+    """
+    def texto(valor: str) -> str:
+        return valor.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+    numero = f"{documento['prefijo']} {documento['numero_factura']}"
+    columnas = [("Código", 60, 80), ("Descripción", 140, 260), ("Cantidad", 400, 70), ("Valor", 470, 90)]
+    filas = [[c[0] for c in columnas]]
+    _, _, base = documento["secuencias"][0]
+    filas.append(["1", f"{documento['tipo']} {documento['descripcion'][:25]}", "1", formatear_miles(base)])
+
+    comandos = ["BT /F1 14 Tf 60 740 Td (" + texto(f"Número de Factura: {numero}") + ") Tj ET",
+                "BT /F1 10 Tf 60 720 Td (" + texto(f"NIT: {documento['proveedor']['nit']}-{documento['proveedor']['dv']}") + ") Tj ET",
+                "0.5 w"]
+    alto_fila = 20
+    y_superior = 680
+    for indice_fila, fila in enumerate(filas):
+        y = y_superior - indice_fila * alto_fila
+        for (_, x, ancho), valor in zip(columnas, fila):
+            comandos.append(f"{x} {y - alto_fila} {ancho} {alto_fila} re S")
+            comandos.append(f"BT /F1 9 Tf {x + 3} {y - 14} Td (" + texto(valor) + ") Tj ET")
+    contenido = "\n".join(comandos).encode("cp1252")
+
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] /Contents 4 0 R /Resources << /Font << /F1 5 0 R >> >> >>",
+        b"<< /Length " + str(len(contenido)).encode() + b" >>\nstream\n" + contenido + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    salida = bytearray(b"%PDF-1.4\n")
+    desplazamientos = []
+    for numero_objeto, objeto in enumerate(objetos, start=1):
+        desplazamientos.append(len(salida))
+        salida += f"{numero_objeto} 0 obj\n".encode() + objeto + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += f"xref\n0 {len(objetos) + 1}\n0000000000 65535 f \n".encode()
+    for desplazamiento in desplazamientos:
+        salida += f"{desplazamiento:010d} 00000 n \n".encode()
+    salida += f"trailer\n<< /Size {len(objetos) + 1} /Root 1 0 R >>\nstartxref\n{inicio_xref}\n%%EOF\n".encode()
+    return bytes(salida)
+
+
+def construir_xml_factura(documento: Dict) -> bytes:
+    """
+    Construye una factura electrónica UBL 2.1 mínima con proveedor, líneas y totales.
+    """
+    proveedor = documento["proveedor"]
+    base = documento["secuencias"][0][2]
+    iva = sum(valor for cuenta, _, valor in documento["secuencias"] if str(cuenta).startswith("2408"))
+    xml = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="no"?>'
+        '<Invoice xmlns="urn:oasis:names:specification:ubl:schema:xsd:Invoice-2" '
+        'xmlns:cac="urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2" '
+        'xmlns:cbc="urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2">'
+        f'<cbc:ID>{escape(documento["prefijo"])}{documento["numero_factura"]}</cbc:ID>'
+        f'<cbc:IssueDate>{documento["fecha"].isoformat()}</cbc:IssueDate>'
+        '<cac:AccountingSupplierParty><cac:Party><cac:PartyTaxScheme>'
+        f'<cbc:RegistrationName>{escape(proveedor["nombre"])}</cbc:RegistrationName>'
+        f'<cbc:CompanyID schemeID="{proveedor["dv"]}" schemeName="31">{proveedor["nit"]}</cbc:CompanyID>'
+        '</cac:PartyTaxScheme></cac:Party></cac:AccountingSupplierParty>'
+        '<cac:AccountingCustomerParty><cac:Party><cac:PartyTaxScheme>'
+        f'<cbc:RegistrationName>{EMPRESA}</cbc:RegistrationName><cbc:CompanyID>{NIT_EMPRESA}</cbc:CompanyID>'
+        '</cac:PartyTaxScheme></cac:Party></cac:AccountingCustomerParty>'
+        f'<cac:TaxTotal><cbc:TaxAmount currencyID="COP">{iva:.2f}</cbc:TaxAmount></cac:TaxTotal>'
+        '<cac:LegalMonetaryTotal>'
+        f'<cbc:LineExtensionAmount currencyID="COP">{base:.2f}</cbc:LineExtensionAmount>'
+        f'<cbc:PayableAmount currencyID="COP">{base + iva:.2f}</cbc:PayableAmount>'
+        '</cac:LegalMonetaryTotal>'
+        '<cac:InvoiceLine><cbc:ID>1</cbc:ID><cbc:InvoicedQuantity>1</cbc:InvoicedQuantity>'
+        f'<cbc:LineExtensionAmount currencyID="COP">{base:.2f}</cbc:LineExtensionAmount>'
+        f'<cac:Item><cbc:Description>{escape(documento["tipo"])} {escape(documento["descripcion"])}</cbc:Description></cac:Item>'
+        f'<cac:Price><cbc:PriceAmount currencyID="COP">{base:.2f}</cbc:PriceAmount></cac:Price>'
+        '</cac:InvoiceLine></Invoice>'
+    )
+    return xml.encode("utf-8")
+
+
+def generar_facturas(directorio: str, documentos: List[Dict]) -> int:
+    """
+    Escribe un zip por factura, nombrado con el número de factura del proveedor (columna 86 de la Hoja1),
+    con un PDF y un XML de nombre hash como los que entrega la DIAN.
+    """
+    for documento in documentos:
+        nombre = hashlib.sha384(f"{documento['proveedor']['nit']}-{documento['numero_factura']}".encode()).hexdigest()
+        with zipfile.ZipFile(os.path.join(directorio, f"{documento['numero_factura']}.zip"), "w", zipfile.ZIP_DEFLATED) as archivo_zip:
+            archivo_zip.writestr(f"{nombre}.pdf", construir_pdf_factura(documento))
+            archivo_zip.writestr(f"{nombre}.xml", construir_xml_factura(documento))
+    return len(documentos)
+
+# =============================
+# MAIN
+# =============================
+def generar_conjunto(directorio_salida: str, filas: int, escala: float, anios: List[int], tipos: List[str],
+                     directorio_plantillas: str, semilla: int) -> Dict[str, int]:
+    """
+    Genera el conjunto de datos sintéticos completo y retorna el número de registros por tipo.
+    """
+    rng = random.Random(semilla)
+    terceros = generar_terceros(max(20, round(TAMANOS_BASE["terceros"] * escala)), rng)
+    # Solo una parte de los terceros son proveedores con movimiento en el Libro Auxiliar
+    proveedores = terceros[:max(10, len(terceros) // 4)]
+    resumen = {}
+
+    if "libro_auxiliar" in tipos:
+        directorio = os.path.join(directorio_salida, "proveedores")
+        os.makedirs(directorio, exist_ok=True)
+        conteos = {}
+        filas_por_anio = [filas // len(anios) + (1 if i < filas % len(anios) else 0) for i in range(len(anios))]
+        for anio, filas_anio in zip(anios, filas_por_anio):
+            nombre = f"Sintetica-LibroAuxiliar_{anio}.csv"
+            conteos[nombre] = generar_libro_auxiliar(os.path.join(directorio, nombre), anio, filas_anio, proveedores, rng)
+        with open(os.path.join(directorio_salida, "conteos_esperados.json"), "w", encoding="utf-8") as archivo:
+            json.dump(conteos, archivo, indent=2, ensure_ascii=False)
+        resumen["libro_auxiliar"] = filas
+
+    if "productos" in tipos:
+        directorio = os.path.join(directorio_salida, "productos")
+        os.makedirs(directorio, exist_ok=True)
+        resumen["productos"] = generar_productos(
+            os.path.join(directorio_plantillas, PLANTILLA_PRODUCTOS), os.path.join(directorio, "SinteticaListaProductos.csv"),
+            max(1, round(TAMANOS_BASE["productos"] * escala)), proveedores, rng)
+
+    if "terceros" in tipos:
+        directorio = os.path.join(directorio_salida, "modelos_terceros")
+        os.makedirs(directorio, exist_ok=True)
+        resumen["terceros"] = generar_modelo_terceros(
+            os.path.join(directorio_plantillas, PLANTILLA_TERCEROS), os.path.join(directorio, "Sintetica-Modelo_de_terceros.csv"),
+            terceros, rng)
+
+    if "causacion" in tipos or "facturas" in tipos:
+        documentos = generar_documentos_causacion(max(1, round(TAMANOS_BASE["causacion"] * escala)), proveedores, anios[-1], 4, rng)
+        if "causacion" in tipos:
+            directorio = os.path.join(directorio_salida, "modelos_causacion")
+            os.makedirs(directorio, exist_ok=True)
+            resumen["causacion"] = generar_modelo_causacion(
+                os.path.join(directorio_plantillas, PLANTILLA_CAUSACION), os.path.join(directorio, "SinteticaModeloCausacion.xlsx"),
+                documentos)
+        if "facturas" in tipos:
+            directorio = os.path.join(directorio_salida, "facturas")
+            os.makedirs(directorio, exist_ok=True)
+            resumen["facturas"] = generar_facturas(directorio, documentos)
+    return resumen
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generador de datos sintéticos para benchmarks del onboarding")
+    parser.add_argument("--salida", default=os.path.join("results", "sinteticos"), help="Carpeta de salida (misma estructura que data/)")
+    parser.add_argument("--filas", type=int, default=FILAS_BASE_LIBRO, help="Filas de movimiento del Libro Auxiliar (p. ej. 10000, 100000, 1000000)")
+    parser.add_argument("--escala", type=float, default=None, help="Factor de escala para las demás entradas (por defecto filas / 10000)")
+    parser.add_argument("--anios", type=int, nargs="+", default=[2022, 2023, 2024], help="Un Libro Auxiliar por año")
+    parser.add_argument("--tipos", nargs="+", choices=TIPOS_DISPONIBLES, default=list(TIPOS_DISPONIBLES), help="Entradas a generar")
+    parser.add_argument("--plantillas", default=os.path.join(project_root, "data"), help="Carpeta con los archivos de muestra de donde se toman los encabezados")
+    parser.add_argument("--semilla", type=int, default=42, help="Semilla para resultados reproducibles")
+    args = parser.parse_args()
+
+    escala = args.escala if args.escala is not None else args.filas / FILAS_BASE_LIBRO
+    print(f"Generando datos sintéticos en {args.salida} (filas={args.filas}, escala={escala:g})")
+    resumen = generar_conjunto(args.salida, args.filas, escala, args.anios, args.tipos, args.plantillas, args.semilla)
+    for tipo, cantidad in resumen.items():
+        print(f"  - {tipo}: {cantidad}")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,6 @@ import os
 import sys
 import logging
 import gc
-import openpyxl
 import pdfplumber
 import pymongo_auth_aws
 from typing import Optional
@@ -12,14 +11,19 @@ from pathlib import Path
 
 AMBIENTE = "STAGING"
 
-# Add the project root directory to Python path
+# Rutas del proyecto (los módulos usan imports relativos a src/ y a la raíz)
 project_root = str(Path(__file__).parent.parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+src_root = str(Path(__file__).parent.parent)
+for ruta in (project_root, src_root):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
 
 from dotenv import load_dotenv
 from src.config.mongodb_config import MongoDBConfig
 from src.utils.mongodb_manager import MongoDBManager
+from utils.normalizacion import extraer_id_factura, limpiar_nit
+from utils.libro_excel import abrir_libro_en_cache
+from utils.esquema_hoja import EsquemaHoja
 from src.causaciones.renombrar_zips import get_zip_files, extract_zip, process_zip_files
 from src.causaciones.renombrar_excels import rename_excel_files
 
@@ -28,6 +32,13 @@ from src.causaciones.renombrar_excels import rename_excel_files
 # =============================
 XLSX_PATH = os.path.join("data", "modelos_causacion", "SurtifloraModeloCausacionAbril2025.xlsx")
 ZIP_PATH = os.path.join("data", "facturas")
+# Columnas usadas del modelo: tipo, NIT del proveedor, descripción del archivo y número de factura
+ESQUEMA_FACTURA = EsquemaHoja("modelo de facturas", [
+    ("tipo_factura", "TIPO DE FACTURA"),
+    ("nit_proveedor", "NIT"),
+    ("descripcion_archivo", "DESCRIPCIÓN DE LA SECUENCIA"),
+    ("numero_factura", "NÚMERO DEL DOCUMENTO DEL PROVEEDOR"),
+])
 
 logging.basicConfig(
     level=logging.INFO,
@@ -37,24 +48,6 @@ logging.basicConfig(
 # =============================
 # Funciones auxiliares
 # =============================
-def limpiar_nit(nit_raw: str) -> str:
-    """
-    Limpia el NIT/cédula de caracteres no numéricos y espacios.
-    """
-    return ''.join(filter(str.isdigit, nit_raw or ''))
-
-def extraer_id_factura(descripcion_archivo: str):
-    """
-    Extrae el identificador de factura de una descripción de archivo.
-    """
-    descripcion_archivo = descripcion_archivo.strip()
-    if not descripcion_archivo:
-        return 0
-    partes = descripcion_archivo.split()
-    for parte in partes:
-        if any(char.isdigit() for char in parte):
-            return parte
-
 def buscar_zip_similar(lista_zips, id_factura):
     """
     Busca el archivo zip más similar al id_factura.
@@ -149,36 +142,34 @@ def procesar_y_subir_facturas(uid):
     created_count = 0
     invoice_index = 1
     facturas_procesadas = set()
-    wb = openpyxl.load_workbook(XLSX_PATH, data_only=True)
-    ws = wb.active
-    rows = list(ws.iter_rows(values_only=True))
-    header_found = False
-    for idx, row in enumerate(rows):
-        if row and str(row[0]).strip() == "TIPO DE FACTURA":
-            logging.info("[INICIO] Encabezado XLSX encontrado, procesando facturas...")
-            start_idx = idx + 1
-            header_found = True
-            break
-    if not header_found:
-        logging.error("[ERROR] No se encontró el encabezado en el archivo XLSX.")
+    wb = abrir_libro_en_cache(XLSX_PATH)
+    # La hoja de facturas y sus columnas se ubican por el encabezado (la hoja activa del modelo
+    # puede ser otra, p. ej. Hoja5) y se validan antes de leer las facturas
+    try:
+        ws, fila_encabezado, posiciones = ESQUEMA_FACTURA.localizar_en_libro(wb)
+    except ValueError as e:
+        logging.error(f"[ERROR] No se encontró el encabezado en el archivo XLSX: {e}")
+        wb.close()
         manager.close()
         return
-    for row in rows[start_idx:]:
-        if not row or not row[0]:
+    logging.info(f"[INICIO] Encabezado XLSX encontrado en la hoja '{ws.title}', procesando facturas...")
+    # Solo se leen las columnas del esquema, desde la fila siguiente al encabezado
+    for row in ESQUEMA_FACTURA.filas(ws, posiciones, min_row=fila_encabezado + 1):
+        if not row.tipo_factura:
             continue
-        tipo_factura = str(row[0]).strip()
+        tipo_factura = str(row.tipo_factura).strip()
         if "Servicio" not in tipo_factura and "Arrendamiento" not in tipo_factura:
             logging.info(f"[SKIP] Tipo de factura '{tipo_factura}' no es 'Servicio - Gasto' ni 'Arrendamiento', saltando...")
             continue
-        id_proveedor = limpiar_nit(str(row[16])).strip()
-        descripcion_archivo = str(row[18]).strip()
+        id_proveedor = limpiar_nit(str(row.nit_proveedor)).strip()
+        descripcion_archivo = str(row.descripcion_archivo).strip()
         id_factura_original = extraer_id_factura(descripcion_archivo)
         if id_factura_original in facturas_procesadas:
             logging.info(f"[SKIP] Factura duplicada en Excel: {id_factura_original}")
             invoice_index += 1
             continue
         facturas_procesadas.add(id_factura_original)
-        id_factura = str(row[86]).strip()
+        id_factura = str(row.numero_factura).strip()
         descripcion_dian = extraer_descripcion_dian(id_factura)
         # Verificar si ya existe un documento con la misma clave única
         if manager.collection.find_one({
@@ -205,6 +196,7 @@ def procesar_y_subir_facturas(uid):
         except Exception as e:
             logging.error(f"[ERROR] Error al insertar factura {id_factura}: {str(e)}")
         invoice_index += 1
+    wb.close()
     manager.close()
     logging.info(f"[RESUMEN] Se crearon {created_count} facturas nuevas en la base de datos.")
 
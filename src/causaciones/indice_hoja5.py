@@ -0,0 +1,136 @@
+"""
+Índice en memoria de la Hoja5 del modelo de causación.
+
+La búsqueda anterior (obtener_code_field y obtener_item) recorría la Hoja5 completa (hasta
+cuatro veces) por cada fila de la Hoja1. Este índice se construye una sola vez por libro y
+resuelve las mismas búsquedas con diccionarios:
+- coincidencia exacta del código PUC (columna B) -> Item y code_field (columna E),
+- respaldo por prefijo: la primera fila (en orden de la hoja) cuyo código empieza por los
+  primeros 6 dígitos de la cuenta.
+"""
+
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+HOJA_INDICE = "Hoja5"
+FILA_ENCABEZADOS = 4
+COLUMNA_PUC = 1  # Columna B
+COLUMNA_CODE_FIELD = 4  # Columna E
+COLUMNA_ITEM_POR_DEFECTO = 2  # Columna C
+LONGITUD_PREFIJO = 6
+CODE_FIELD_POR_DEFECTO = "default_code_field"
+
+# =============================
+# UTILIDADES
+# =============================
+def procesar_code_field(code_field_raw) -> List[str]:
+    """
+    Convierte el valor de la columna E en la lista de code_field (una entrada por línea).
+    """
+    if code_field_raw is None:
+        return [CODE_FIELD_POR_DEFECTO]
+    code_field_str = str(code_field_raw).strip()
+    if '\n' in code_field_str:
+        return [item.strip() for item in code_field_str.split('\n') if item.strip()]
+    return [code_field_str] if code_field_str else [CODE_FIELD_POR_DEFECTO]
+
+
+def _indice_columna_item(encabezados: List[str]) -> int:
+    try:
+        return next(i for i, h in enumerate(encabezados) if h.strip().lower().replace(" ", "") == "item")
+    except StopIteration:
+        return COLUMNA_ITEM_POR_DEFECTO
+
+
+def ancho_columnas(encabezados: List[str]) -> int:
+    """
+    Columnas de la Hoja5 que necesita el índice (hasta la de code_field o la de 'Item').
+    """
+    return max(COLUMNA_CODE_FIELD, _indice_columna_item(encabezados)) + 1
+
+# =============================
+# ÍNDICE
+# =============================
+class IndiceHoja5:
+    """
+    Búsquedas de code_field e Item por cuenta contable con los mismos resultados que la búsqueda
+    fila a fila anterior (se conserva como referencia en benchmarks/benchmark_causacion.py).
+    """
+
+    def __init__(self, filas: Optional[Iterable[tuple]], encabezados: Optional[List[str]] = None):
+        """
+        Args:
+            filas: Filas de la Hoja5 desde la fila 5 (valores), o None si el libro no tiene Hoja5
+            encabezados: Encabezados de la fila 4 (para ubicar la columna 'Item')
+        """
+        self.presente = filas is not None
+        self.exactos: Dict[str, Tuple[str, List[str]]] = {}
+        self.por_prefijo: Dict[str, List[str]] = {}
+        if not self.presente:
+            return
+        idx_item = _indice_columna_item(encabezados or [])
+        for fila in filas:
+            if len(fila) <= COLUMNA_PUC or fila[COLUMNA_PUC] is None:
+                continue
+            codigo_puc = str(fila[COLUMNA_PUC]).strip()
+            # Una fila sin columna E da [""], como el error capturado en la búsqueda anterior
+            code_field = procesar_code_field(fila[COLUMNA_CODE_FIELD]) if len(fila) > COLUMNA_CODE_FIELD else [""]
+            if codigo_puc not in self.exactos:
+                valor_item = fila[idx_item] if idx_item < len(fila) else ""
+                self.exactos[codigo_puc] = (str(valor_item) if valor_item is not None else "", code_field)
+            # Todos los prefijos posibles de una cuenta de hasta 6 dígitos (incluido el vacío);
+            # gana la primera fila, como en el recorrido secuencial
+            for longitud in range(min(LONGITUD_PREFIJO, len(codigo_puc)) + 1):
+                self.por_prefijo.setdefault(codigo_puc[:longitud], code_field)
+
+    @classmethod
+    def desde_libro(cls, libro) -> "IndiceHoja5":
+        """
+        Construye el índice leyendo la Hoja5 de un libro de openpyxl una sola vez. Las filas se
+        recorren en flujo y solo hasta la última columna usada, por lo que sirve también con
+        libros abiertos en modo read_only.
+        """
+        if HOJA_INDICE not in libro.sheetnames:
+            logger.warning("Hoja5 no encontrada en el archivo Excel")
+            return cls(None)
+        hoja = libro[HOJA_INDICE]
+        fila_encabezados = next(hoja.iter_rows(min_row=FILA_ENCABEZADOS, max_row=FILA_ENCABEZADOS, values_only=True), ())
+        encabezados = [str(h).strip() if h is not None else "" for h in fila_encabezados]
+        filas = hoja.iter_rows(min_row=FILA_ENCABEZADOS + 1, max_col=ancho_columnas(encabezados), values_only=True)
+        indice = cls(filas, encabezados)
+        logger.info(f"Índice de Hoja5: {len(indice.exactos)} códigos PUC")
+        return indice
+
+    def code_field(self, cuenta_contable) -> List[str]:
+        """
+        code_field de la cuenta: coincidencia exacta y, si no hay, primera fila que empiece por
+        sus 6 primeros dígitos. [""] si no se encuentra.
+        """
+        if not self.presente:
+            return [CODE_FIELD_POR_DEFECTO]
+        cuenta_contable = str(cuenta_contable).strip()
+        exacto = self.exactos.get(cuenta_contable)
+        if exacto is not None:
+            return list(exacto[1])
+        code_field = self.por_prefijo.get(cuenta_contable[:LONGITUD_PREFIJO])
+        if code_field is not None:
+            return list(code_field)
+        logger.warning(f"No se encontró code_field para cuenta_contable '{cuenta_contable}', asignando valor por defecto")
+        return [""]
+
+    def item(self, cuenta_contable) -> str:
+        """
+        Valor de la columna 'Item' de la fila con coincidencia exacta, o "" si no existe.
+        """
+        if not self.presente:
+            raise KeyError(f"Worksheet {HOJA_INDICE} does not exist.")
+        exacto = self.exactos.get(str(cuenta_contable).strip())
+        if exacto is None:
+            logger.warning(f"No se encontró 'Item' para cuenta_contable '{cuenta_contable}' en Hoja5")
+            return ""
+        return exacto[0]
@@ -0,0 +1,349 @@
+"""
+Lectura y fusión de modelos de causación (sin acceso a MongoDB).
+
+analizar_modelo_causacion convierte un libro en un diccionario con tipos simples (se puede
+enviar entre procesos), de modo que varios modelos se leen en paralelo y se fusionan antes
+de escribir una sola vez en client_pucs y cost_center_per_puc.
+
+Un modelo también puede venir exportado como CSV: la Hoja1 en un archivo (p. ej.
+'ModeloAbril2025_Hoja1.csv' o 'Hoja1.csv' dentro de una carpeta por modelo) y la Hoja5 en el
+archivo del mismo nombre con 'Hoja5'. Se leen con el motor C de pandas, sin pasar por openpyxl,
+y producen el mismo resultado que el libro.
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from utils.libro_excel import abrir_libro_en_cache
+from utils.esquema_hoja import EsquemaHoja
+from utils.encabezados import leer_lineas_iniciales
+from causaciones.indice_hoja5 import IndiceHoja5, CODE_FIELD_POR_DEFECTO, FILA_ENCABEZADOS, HOJA_INDICE, ancho_columnas
+
+logger = logging.getLogger(__name__)
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+HOJA_MODELO = "Hoja1"
+FILA_ENCABEZADOS_MODELO = 5
+FILA_INICIO_MODELO = 6
+ESQUEMA_MODELO = EsquemaHoja("modelo de causación", [
+    ("cuenta_contable", "CUENTA CONTABLE   (OBLIGATORIO)"),
+    ("centro_costo", "CENTRO DE COSTO"),
+    ("nit", "NIT"),
+    ("subcentro_costo", "SUBCENTRO DE COSTO"),
+])
+COLUMNAS_MODELO = ESQUEMA_MODELO.encabezados
+EXTENSIONES_MODELO = (".xlsx", ".xlsm")
+EXTENSION_CSV = ".csv"
+CODIFICACIONES_CSV = ("utf-8-sig", "latin1")
+MAX_LINEAS_ENCABEZADO_CSV = 50
+PATRON_HOJA_MODELO = re.compile(HOJA_MODELO, re.IGNORECASE)
+PATRON_HOJA_INDICE = re.compile(HOJA_INDICE, re.IGNORECASE)
+# Celdas del CSV que en el libro serían números. Los ceros a la izquierda solo los conserva una
+# celda de texto, así que esas se dejan como cadena
+PATRON_NUMERO_CSV = re.compile(r"-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?")
+
+MESES = {
+    "enero": 1, "febrero": 2, "marzo": 3, "abril": 4, "mayo": 5, "junio": 6, "julio": 7,
+    "agosto": 8, "septiembre": 9, "setiembre": 9, "octubre": 10, "noviembre": 11, "diciembre": 12,
+}
+PATRON_PERIODO = re.compile(r"(" + "|".join(MESES) + r")[\s_-]*(\d{4})", re.IGNORECASE)
+
+# =============================
+# LECTURA DE UN MODELO
+# =============================
+def obtener_encabezados_excel(libro, fila_encabezados=FILA_ENCABEZADOS_MODELO):
+    """
+    Obtiene los encabezados del archivo Excel a partir de la fila especificada.
+    """
+    hoja = libro[HOJA_MODELO]
+    fila = list(hoja.iter_rows(min_row=fila_encabezados, max_row=fila_encabezados, values_only=True))[0]
+    encabezados = [str(h).strip() if h is not None else "" for h in fila]
+    logger.info(f"Encabezados encontrados: {encabezados}")
+    return encabezados
+
+
+def periodo_desde_nombre(nombre_archivo: str) -> Tuple[int, int]:
+    """
+    Extrae (año, mes) del nombre del archivo, p. ej. 'SurtifloraModeloCausacionAbril2025.xlsx'
+    -> (2025, 4). Retorna (0, 0) si el nombre no tiene un mes y un año.
+    """
+    coincidencia = PATRON_PERIODO.search(nombre_archivo)
+    if not coincidencia:
+        return 0, 0
+    return int(coincidencia.group(2)), MESES[coincidencia.group(1).lower()]
+
+
+def _cuentas_del_modelo(filas: Iterable[tuple], indice_hoja5: IndiceHoja5) -> Tuple[List[Dict], int]:
+    """
+    Recorre las filas (cuenta, centro, NIT, subcentro) de la Hoja1 y arma una entrada por cuenta
+    contable (primera aparición). Retorna las cuentas y el número de filas repetidas omitidas.
+    """
+    cuentas = {}
+    filas_omitidas = 0
+    for valores in filas:
+        cuenta_contable, centro_costo, nit, subcentro_costo = (
+            str(valor).strip() if valor is not None else "" for valor in valores
+        )
+        if not cuenta_contable:
+            continue
+        if cuenta_contable in cuentas:
+            logger.debug(f"Cuenta contable '{cuenta_contable}' repetida, saltando...")
+            filas_omitidas += 1
+            continue
+        cuentas[cuenta_contable] = {
+            "cuenta_contable": cuenta_contable,
+            "description": indice_hoja5.item(cuenta_contable),
+            "code_field": indice_hoja5.code_field(cuenta_contable),
+            "nit": nit,
+            "centro": centro_costo,
+            "subcentro": subcentro_costo,
+        }
+    return list(cuentas.values()), filas_omitidas
+
+
+def analizar_modelo_causacion(ruta_xlsx: str) -> Dict:
+    """
+    Lee un modelo de causación: por cada cuenta contable de la Hoja1 (primera aparición, como
+    al omitir las cuentas repetidas) su Item y code_field de la Hoja5, y el NIT, centro y
+    subcentro de costo de esa fila. Si la ruta es un .csv se lee con analizar_modelo_causacion_csv.
+
+    Args:
+        ruta_xlsx (str): Ruta del archivo Excel (o del CSV de la Hoja1)
+
+    Returns:
+        Dict: {"archivo", "periodo", "cuentas": [dict por cuenta], "filas_omitidas"}
+
+    Raises:
+        ValueError: Si falta la Hoja1 o alguna de las columnas requeridas
+        KeyError: Si falta la Hoja5
+    """
+    if ruta_xlsx.lower().endswith(EXTENSION_CSV):
+        return analizar_modelo_causacion_csv(ruta_xlsx)
+    # Las hojas ya leídas por otro paso o ejecución se toman de la instantánea en caché
+    libro = abrir_libro_en_cache(ruta_xlsx)
+    if HOJA_MODELO not in libro.sheetnames:
+        raise ValueError(f"Hoja '{HOJA_MODELO}' no encontrada en el archivo. Hojas disponibles: {libro.sheetnames}")
+    # Las columnas se ubican y validan una sola vez, antes de leer los datos
+    posiciones = ESQUEMA_MODELO.resolver(obtener_encabezados_excel(libro), HOJA_MODELO)
+    # La Hoja5 se indexa una sola vez en lugar de recorrerla por cada fila de la Hoja1
+    indice_hoja5 = IndiceHoja5.desde_libro(libro)
+    # Solo se leen las cuatro columnas que se usan de cada fila
+    cuentas, filas_omitidas = _cuentas_del_modelo(
+        ESQUEMA_MODELO.filas(libro[HOJA_MODELO], posiciones, min_row=FILA_INICIO_MODELO), indice_hoja5
+    )
+    nombre = os.path.basename(ruta_xlsx)
+    return {
+        "archivo": nombre,
+        "periodo": periodo_desde_nombre(nombre),
+        "cuentas": cuentas,
+        "filas_omitidas": filas_omitidas,
+    }
+
+# =============================
+# LECTURA DESDE CSV
+# =============================
+def ruta_hoja5_csv(ruta_csv: str) -> str:
+    """
+    CSV de la Hoja5 que acompaña al de la Hoja1: 'X_Hoja1.csv' -> 'X_Hoja5.csv' y, si el nombre
+    no dice 'Hoja1', 'X.csv' -> 'X_Hoja5.csv'.
+    """
+    directorio, nombre = os.path.split(ruta_csv)
+    if PATRON_HOJA_MODELO.search(nombre):
+        return os.path.join(directorio, PATRON_HOJA_MODELO.sub(HOJA_INDICE, nombre, count=1))
+    return os.path.join(directorio, f"{os.path.splitext(nombre)[0]}_{HOJA_INDICE}{EXTENSION_CSV}")
+
+
+def convertir_celda_csv(valor: Optional[str]):
+    """
+    Valor que openpyxl daría para una celda exportada a CSV: los números como int (si no tienen
+    parte decimal, p. ej. "5135" o "5135.0") o float, y el resto sin cambios.
+    """
+    if valor is None or not PATRON_NUMERO_CSV.fullmatch(valor):
+        return valor
+    numero = float(valor)
+    return int(numero) if numero.is_integer() and abs(numero) < 2 ** 53 else numero
+
+
+def _leer_filas_csv(ruta_csv: str, fila_inicio: int, columnas: Sequence[int], codificacion: str) -> Iterator[tuple]:
+    """
+    Filas de un CSV desde `fila_inicio` (base 1) con solo las columnas pedidas, en ese orden;
+    las celdas vacías se entregan como None y los números como int o float, igual que en
+    openpyxl. Las filas más cortas se completan y las columnas sobrantes se ignoran.
+    """
+    columnas = list(columnas)
+    codificaciones = [codificacion] + [c for c in CODIFICACIONES_CSV if c != codificacion]
+    for intento in codificaciones:
+        try:
+            marco_datos = pd.read_csv(
+                ruta_csv, engine="c", encoding=intento, header=None, skiprows=fila_inicio - 1,
+                names=range(max(columnas) + 1), usecols=sorted(set(columnas)), index_col=False, dtype=str,
+                keep_default_na=False, na_values=[""], skip_blank_lines=False,
+            )
+            break
+        except UnicodeDecodeError:
+            continue
+        except pd.errors.EmptyDataError:
+            return iter(())
+    else:
+        raise ValueError(f"No se pudo leer {ruta_csv} con ninguna de las codificaciones: {', '.join(codificaciones)}")
+    marco_datos = marco_datos[columnas].astype(object)
+    marco_datos = marco_datos.where(marco_datos.notna(), None)
+    return (tuple(map(convertir_celda_csv, fila)) for fila in marco_datos.itertuples(index=False, name=None))
+
+
+def _indice_hoja5_csv(ruta_csv: str) -> IndiceHoja5:
+    if not os.path.exists(ruta_csv):
+        logger.warning(f"CSV de la Hoja5 no encontrado: {ruta_csv}")
+        return IndiceHoja5(None)
+    lineas, codificacion = leer_lineas_iniciales(ruta_csv, FILA_ENCABEZADOS, CODIFICACIONES_CSV)
+    fila_encabezados = lineas[FILA_ENCABEZADOS - 1] if len(lineas) >= FILA_ENCABEZADOS else []
+    encabezados = [celda.strip() for celda in fila_encabezados]
+    filas = _leer_filas_csv(ruta_csv, FILA_ENCABEZADOS + 1, range(ancho_columnas(encabezados)), codificacion)
+    indice = IndiceHoja5(filas, encabezados)
+    logger.info(f"Índice de Hoja5: {len(indice.exactos)} códigos PUC")
+    return indice
+
+
+def analizar_modelo_causacion_csv(ruta_csv: str) -> Dict:
+    """
+    Lee un modelo de causación exportado como CSV (ver ruta_hoja5_csv para el archivo de la
+    Hoja5). La fila de encabezados de la Hoja1 se busca entre las primeras líneas, por lo que
+    el preámbulo puede variar.
+
+    Args:
+        ruta_csv (str): Ruta del CSV de la Hoja1
+
+    Returns:
+        Dict: El mismo resultado que analizar_modelo_causacion con el libro
+
+    Raises:
+        ValueError: Si el encabezado o alguna de las columnas requeridas no está en la Hoja1
+        KeyError: Si falta el CSV de la Hoja5
+    """
+    lineas, codificacion = leer_lineas_iniciales(ruta_csv, MAX_LINEAS_ENCABEZADO_CSV, CODIFICACIONES_CSV)
+    numero_encabezado = next((i for i, fila in enumerate(lineas, start=1) if not ESQUEMA_MODELO.faltantes(fila)), None)
+    if numero_encabezado is None:
+        raise ValueError(
+            f"No se encontró el encabezado del {ESQUEMA_MODELO.nombre} en las primeras "
+            f"{MAX_LINEAS_ENCABEZADO_CSV} líneas de {ruta_csv} (columnas {list(COLUMNAS_MODELO)})"
+        )
+    posiciones = ESQUEMA_MODELO.resolver(lineas[numero_encabezado - 1], os.path.basename(ruta_csv))
+    indice_hoja5 = _indice_hoja5_csv(ruta_hoja5_csv(ruta_csv))
+    cuentas, filas_omitidas = _cuentas_del_modelo(
+        _leer_filas_csv(ruta_csv, numero_encabezado + 1, posiciones, codificacion), indice_hoja5
+    )
+    nombre = os.path.basename(ruta_csv)
+    periodo = periodo_desde_nombre(nombre)
+    if periodo == (0, 0):
+        # Carpeta por modelo: 'ModeloAbril2025/Hoja1.csv'
+        periodo = periodo_desde_nombre(os.path.basename(os.path.dirname(os.path.abspath(ruta_csv))))
+    return {
+        "archivo": nombre,
+        "periodo": periodo,
+        "cuentas": cuentas,
+        "filas_omitidas": filas_omitidas,
+    }
+
+# =============================
+# VARIOS MODELOS
+# =============================
+def listar_modelos_causacion(directorio: str) -> List[str]:
+    """
+    Lista los modelos de causación de una carpeta: libros de Excel (se ignoran los archivos
+    temporales '~$') y CSV de la Hoja1 (los CSV de la Hoja5 se leen junto con su Hoja1).
+    """
+    return sorted(
+        os.path.join(directorio, nombre) for nombre in os.listdir(directorio)
+        if not nombre.startswith("~$") and (
+            nombre.lower().endswith(EXTENSIONES_MODELO)
+            or (nombre.lower().endswith(EXTENSION_CSV) and not PATRON_HOJA_INDICE.search(nombre))
+        )
+    )
+
+
+def analizar_modelos_causacion(rutas: Sequence[str], procesos: Optional[int] = None) -> List[Dict]:
+    """
+    Lee varios modelos en procesos separados (openpyxl no libera el GIL).
+
+    Args:
+        rutas (Sequence[str]): Archivos a leer
+        procesos (Optional[int]): Máximo de procesos; por defecto uno por archivo hasta os.cpu_count()
+
+    Returns:
+        List[Dict]: Resultado de analizar_modelo_causacion por archivo, en el orden de `rutas`
+    """
+    procesos = min(len(rutas), procesos or os.cpu_count() or 1)
+    if procesos <= 1:
+        return [analizar_modelo_causacion(ruta) for ruta in rutas]
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        return list(ejecutor.map(analizar_modelo_causacion, rutas))
+
+# =============================
+# FUSIÓN DE MODELOS
+# =============================
+def _code_field_informativo(code_field: List[str]) -> bool:
+    return code_field not in ([""], [CODE_FIELD_POR_DEFECTO])
+
+
+def fusionar_modelos_causacion(modelos: Sequence[Dict]) -> Dict:
+    """
+    Fusiona los modelos de varios meses en un único conjunto de cuentas y centros de costo.
+
+    Reglas:
+    - Los modelos se aplican del más antiguo al más reciente (periodo del nombre y luego nombre).
+    - Para una cuenta presente en varios modelos, el más reciente reemplaza la descripción y el
+      code_field, salvo que venga vacío ('' o code_field por defecto): un dato vacío no borra
+      uno informado en un mes anterior.
+    - Los centros de costo se unen (cada modelo aporta el de la primera fila de cada cuenta).
+
+    Args:
+        modelos (Sequence[Dict]): Resultados de analizar_modelo_causacion
+
+    Returns:
+        Dict: {"archivos", "cuentas": {cuenta: {"cuenta_contable", "description", "code_field"}},
+            "centros_costo": [(nit, cuenta, centro, subcentro)], "filas_omitidas", "conflictos"}
+    """
+    cuentas = {}
+    centros_costo = []
+    filas_omitidas = 0
+    conflictos = 0
+    ordenados = sorted(modelos, key=lambda modelo: (tuple(modelo["periodo"]), modelo["archivo"]))
+    for modelo in ordenados:
+        filas_omitidas += modelo["filas_omitidas"]
+        for fila in modelo["cuentas"]:
+            cuenta_contable = fila["cuenta_contable"]
+            centros_costo.append((fila["nit"], cuenta_contable, fila["centro"], fila["subcentro"]))
+            actual = cuentas.get(cuenta_contable)
+            if actual is None:
+                cuentas[cuenta_contable] = {
+                    "cuenta_contable": cuenta_contable,
+                    "description": fila["description"],
+                    "code_field": fila["code_field"],
+                }
+                continue
+            # La misma cuenta ya vino de otro modelo: cuenta como omitida, como en un solo archivo
+            filas_omitidas += 1
+            cambio = False
+            if fila["description"] and fila["description"] != actual["description"]:
+                actual["description"] = fila["description"]
+                cambio = True
+            if _code_field_informativo(fila["code_field"]) and fila["code_field"] != actual["code_field"]:
+                actual["code_field"] = fila["code_field"]
+                cambio = True
+            if cambio:
+                conflictos += 1
+                logger.info(f"Cuenta '{cuenta_contable}' actualizada con los datos de {modelo['archivo']}")
+    return {
+        "archivos": [modelo["archivo"] for modelo in ordenados],
+        "cuentas": cuentas,
+        "centros_costo": centros_costo,
+        "filas_omitidas": filas_omitidas,
+        "conflictos": conflictos,
+    }
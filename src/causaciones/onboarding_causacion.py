@@ -8,15 +8,25 @@ Script para procesar el archivo de modelo de causación y almacenar los datos en
 # =============================
 import os
 import sys
+import json
+import time
 import logging
 from datetime import datetime
 from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 from bson import ObjectId
-import openpyxl
+from pymongo import InsertOne, UpdateOne
+from pymongo.errors import BulkWriteError
 
 from config.mongodb_config import MongoDBConfig
 from utils.mongodb_manager import MongoDBManager
-from config.beanie_config import init_db
+from utils.normalizacion import limpiar_nit
+from causaciones.modelo_causacion import (
+    analizar_modelo_causacion,
+    analizar_modelos_causacion,
+    fusionar_modelos_causacion,
+    listar_modelos_causacion,
+)
 
 
 # =============================
@@ -28,117 +38,13 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# =============================
-# Utilidades de Excel
-# =============================
-def obtener_encabezados_excel(libro, fila_encabezados=5):
-    """
-    Obtiene los encabezados del archivo Excel a partir de la fila especificada.
-    """
-    hoja = libro["Hoja1"]
-    fila = list(hoja.iter_rows(min_row=fila_encabezados, max_row=fila_encabezados, values_only=True))[0]
-    encabezados = [str(h).strip() if h is not None else "" for h in fila]
-    logger.info(f"Encabezados encontrados: {encabezados}")
-    return encabezados
+# Caché en disco de los códigos de puc_embeddings, uno por ambiente y base de datos
+DIRECTORIO_CACHE_EMBEDDINGS = os.path.join("results", "cache", "puc_embeddings")
+TTL_CACHE_EMBEDDINGS = 24 * 60 * 60  # segundos
 
-def obtener_code_field(libro, cuenta_contable):
-    try:
-        if "Hoja5" not in libro.sheetnames:
-            logger.warning("Hoja5 no encontrada en el archivo Excel")
-            return ["default_code_field"]  # Devolver como array
-        
-        hoja = libro["Hoja5"]
-        cuenta_contable = str(cuenta_contable).strip()  # Normalizar a cadena
-        logger.info(f"Buscando code_field para cuenta_contable: {cuenta_contable}")
-
-        # Verificar las filas leídas de Hoja5
-        logger.debug("Iniciando iteración sobre filas de Hoja5...")
-        puc_values = []
-        for idx, fila in enumerate(hoja.iter_rows(min_row=5, values_only=True), start=5):
-            logger.debug(f"Fila {idx}: {fila}")  # Registrar todos los valores de la fila
-            if fila[1] is not None:  # Usar columna B (índice 1) para los códigos PUC
-                codigo_puc = str(fila[1]).strip()
-                puc_values.append(codigo_puc)
-                logger.debug(f"Leyendo PUC desde columna B (fila {idx}, col 1): {codigo_puc} (tipo: {type(fila[1])})")
-        
-        logger.debug(f"Valores de PUC encontrados en Hoja5: {puc_values}")
-
-        # Buscar coincidencia exacta
-        for fila in hoja.iter_rows(min_row=5, values_only=True):
-            if fila[1] is not None:  # Usar columna B (índice 1) para los códigos PUC
-                codigo_puc = str(fila[1]).strip()
-                logger.debug(f"Comparando PUC '{codigo_puc}' (tipo: {type(codigo_puc)}) con cuenta_contable '{cuenta_contable}' (tipo: {type(cuenta_contable)})")
-                if codigo_puc == cuenta_contable:
-                    code_field_raw = fila[4] if fila[4] is not None else None  # Columna E (índice 4)
-                    
-                    # Procesar el code_field como array
-                    if code_field_raw is not None:
-                        code_field_str = str(code_field_raw).strip()
-                        # Verificar si hay saltos de línea y dividir
-                        if '\n' in code_field_str:
-                            code_field_array = [item.strip() for item in code_field_str.split('\n') if item.strip()]
-                        else:
-                            code_field_array = [code_field_str] if code_field_str else ["default_code_field"]
-                    else:
-                        code_field_array = ["default_code_field"]
-                    
-                    logger.info(f"Coincidencia exacta encontrada. Raw code_field (col E): {code_field_raw}, Procesado como array: {code_field_array}")
-                    return code_field_array
-        
-        # Fallback: buscar por los primeros 6 dígitos
-        puc_6_digitos = cuenta_contable[:6]
-        logger.info(f"Fallback: Buscando con los primeros 6 dígitos: {puc_6_digitos}")
-        for fila in hoja.iter_rows(min_row=5, values_only=True):
-            if fila[1] is not None:
-                codigo_puc = str(fila[1]).strip()
-                logger.debug(f"Fallback: Comparando PUC '{codigo_puc}' con '{puc_6_digitos}'")
-                if codigo_puc.startswith(puc_6_digitos):
-                    code_field_raw = fila[4] if fila[4] is not None else None  # Columna E (índice 4)
-                    
-                    # Procesar el code_field como array
-                    if code_field_raw is not None:
-                        code_field_str = str(code_field_raw).strip()
-                        # Verificar si hay saltos de línea y dividir
-                        if '\n' in code_field_str:
-                            code_field_array = [item.strip() for item in code_field_str.split('\n') if item.strip()]
-                        else:
-                            code_field_array = [code_field_str] if code_field_str else ["default_code_field"]
-                    else:
-                        code_field_array = ["default_code_field"]
-                    
-                    logger.info(f"Coincidencia por fallback encontrada. Raw code_field (col E): {code_field_raw}, Procesado como array: {code_field_array}")
-                    return code_field_array
-        
-        logger.warning(f"No se encontró code_field para cuenta_contable '{cuenta_contable}', asignando valor por defecto")
-        return [""]  # Devolver como array vacío
-        
-    except Exception as e:
-        logger.error(f"Error obteniendo code_field para cuenta {cuenta_contable}: {str(e)}")
-        return [""]  # Devolver como array vacío en caso de error
-
-def obtener_item(libro, cuenta_contable, fila_encabezados=4):
-    """
-    Busca en la hoja 'Hoja5' la fila donde la columna de cuenta contable (columna B) coincida exactamente
-    con el valor dado y retorna el valor de la columna 'Item' (columna C) de esa fila como string.
-    Si no encuentra coincidencia, retorna una cadena vacía.
-    """
-    hoja = libro["Hoja5"]
-    # Leer encabezados desde la fila indicada
-    encabezados = [str(h).strip() if h is not None else "" for h in list(hoja.iter_rows(min_row=fila_encabezados, max_row=fila_encabezados, values_only=True))[0]]
-    # Buscar el índice de la columna 'Item' (por defecto columna C = índice 2)
-    try:
-        idx_item = next(i for i, h in enumerate(encabezados) if h.strip().lower().replace(" ", "") == "item")
-    except StopIteration:
-        idx_item = 2  # Forzar columna C si no se encuentra el encabezado
-    for fila in hoja.iter_rows(min_row=fila_encabezados+1, values_only=True):
-        if fila[1] is not None:
-            codigo_puc = str(fila[1]).strip()
-            if codigo_puc == str(cuenta_contable).strip():
-                valor_item = fila[idx_item] if idx_item < len(fila) else ""
-                logger.info(f"Valor de 'Item' para cuenta_contable '{cuenta_contable}': {valor_item}")
-                return str(valor_item) if valor_item is not None else ""
-    logger.warning(f"No se encontró 'Item' para cuenta_contable '{cuenta_contable}' en Hoja5")
-    return ""
+# Operaciones por bulk_write en cost_center_per_puc y documentos por insert_many en client_pucs
+TAMANO_LOTE_CENTROS_COSTO = 1000
+TAMANO_LOTE_CLIENT_PUCS = 1000
 
 # =============================
 # Índices y limpieza en MongoDB
@@ -195,160 +101,362 @@ def eliminar_client_pucs_existentes(uid_usuario: str, ambiente):
 # =============================
 # Procesamiento y subida de datos
 # =============================
-def procesar_archivo_excel(uid_usuario: str, ruta_xlsx: str, ambiente: str):
+def documento_client_puc(uid_usuario: str, cuenta: Dict, codigos_embedding: Set[str], fecha: datetime) -> Dict:
+    """
+    Construye el documento de client_pucs de una cuenta; uniquePuc indica que su PUC (6 primeros
+    dígitos) no tiene embedding.
+    """
+    documento = {
+        "UID": ObjectId(uid_usuario),
+        "cuenta_contable": cuenta["cuenta_contable"],
+        "description": cuenta["description"],
+        "code_field": cuenta["code_field"],
+    }
+    if cuenta["cuenta_contable"][:6] not in codigos_embedding:
+        documento["uniquePuc"] = True
+    documento["createdAt"] = fecha
+    documento["updatedAt"] = fecha
+    return documento
+
+
+def cargar_client_pucs_existentes(gestor: MongoDBManager, uid_usuario: str) -> Dict[str, Dict]:
+    """
+    Lee con una sola consulta (solo los campos comparados) las cuentas ya guardadas del usuario.
+
+    Returns:
+        Dict[str, Dict]: cuenta_contable -> {description, code_field, uniquePuc}
+    """
+    cursor = gestor.collection.find(
+        {"UID": ObjectId(uid_usuario)},
+        {"_id": 0, "cuenta_contable": 1, "description": 1, "code_field": 1, "uniquePuc": 1}
+    )
+    return {documento["cuenta_contable"]: documento for documento in cursor}
+
+
+def operaciones_reconciliacion(documentos: List[Dict], existentes: Dict[str, Dict], fecha: datetime) -> Tuple[List, int]:
+    """
+    Compara los documentos del modelo con los existentes y genera solo las escrituras necesarias:
+    InsertOne para las cuentas nuevas y UpdateOne ($set de los campos que cambiaron, $unset de
+    uniquePuc si la cuenta ya tiene embedding) para las modificadas.
+
+    Returns:
+        Tuple[List, int]: Operaciones para bulk_write y cantidad de cuentas sin cambios
+    """
+    operaciones = []
+    sin_cambios = 0
+    for documento in documentos:
+        actual = existentes.get(documento["cuenta_contable"])
+        if actual is None:
+            operaciones.append(InsertOne(documento))
+            continue
+        cambios = {campo: documento[campo] for campo in ("description", "code_field") if actual.get(campo) != documento[campo]}
+        actualizacion = {}
+        if bool(actual.get("uniquePuc", False)) != documento.get("uniquePuc", False):
+            if documento.get("uniquePuc", False):
+                cambios["uniquePuc"] = True
+            else:
+                actualizacion["$unset"] = {"uniquePuc": ""}
+        if not cambios and not actualizacion:
+            sin_cambios += 1
+            continue
+        cambios["updatedAt"] = fecha
+        actualizacion["$set"] = cambios
+        operaciones.append(UpdateOne({"UID": documento["UID"], "cuenta_contable": documento["cuenta_contable"]}, actualizacion))
+    return operaciones, sin_cambios
+
+
+def reconciliar_client_pucs(gestor: MongoDBManager, uid_usuario: str, documentos: List[Dict], fecha: datetime,
+                            eliminar_obsoletas: bool = False, tamano_lote: int = TAMANO_LOTE_CLIENT_PUCS) -> Dict[str, int]:
+    """
+    Lleva client_pucs del usuario al estado del modelo sin borrarlo: inserta las cuentas nuevas,
+    actualiza las que cambiaron y, si se indica, elimina las que ya no están en el modelo.
+
+    Returns:
+        Dict[str, int]: creados, actualizados, sin_cambios y eliminados
+    """
+    existentes = cargar_client_pucs_existentes(gestor, uid_usuario)
+    operaciones, sin_cambios = operaciones_reconciliacion(documentos, existentes, fecha)
+    estadisticas = {"creados": 0, "actualizados": 0, "sin_cambios": sin_cambios, "eliminados": 0}
+    for inicio in range(0, len(operaciones), tamano_lote):
+        try:
+            detalles = gestor.collection.bulk_write(operaciones[inicio:inicio + tamano_lote], ordered=False).bulk_api_result
+        except BulkWriteError as bwe:
+            detalles = bwe.details
+            for error in detalles.get("writeErrors", []):
+                logger.error(f"Error reconciliando client_pucs: {error.get('errmsg')}")
+        estadisticas["creados"] += detalles.get("nInserted", 0)
+        estadisticas["actualizados"] += detalles.get("nModified", 0)
+    if eliminar_obsoletas:
+        obsoletas = sorted(set(existentes) - {documento["cuenta_contable"] for documento in documentos})
+        for inicio in range(0, len(obsoletas), tamano_lote):
+            resultado = gestor.collection.delete_many({
+                "UID": ObjectId(uid_usuario),
+                "cuenta_contable": {"$in": obsoletas[inicio:inicio + tamano_lote]}
+            })
+            estadisticas["eliminados"] += resultado.deleted_count
+    logger.info(f"Reconciliación de client_pucs: {estadisticas}")
+    return estadisticas
+
+
+def subir_modelo_causacion(uid_usuario: str, modelo: Dict, ambiente: str, reconciliar: bool = False,
+                           eliminar_obsoletas: bool = False, tamano_lote: int = TAMANO_LOTE_CLIENT_PUCS):
+    """
+    Escribe un modelo ya leído (y fusionado) en client_pucs y cost_center_per_puc.
+
+    Args:
+        uid_usuario (str): UID del usuario
+        modelo (Dict): Resultado de fusionar_modelos_causacion
+        ambiente (str): Ambiente de MongoDB
+        reconciliar (bool): Actualizar client_pucs con solo las diferencias en lugar de borrar y
+            volver a insertar todas las cuentas del usuario
+        eliminar_obsoletas (bool): Al reconciliar, eliminar las cuentas que ya no están en el modelo
+        tamano_lote (int): Documentos por insert_many / bulk_write
+    """
+    if not reconciliar:
+        logger.info("Eliminando documentos existentes...")
+        eliminar_client_pucs_existentes(uid_usuario, ambiente)
+    logger.info("Creando índices...")
+    crear_indices_client_pucs(uid_usuario, ambiente)
+    # Los códigos con embedding se cargan una vez en lugar de consultar puc_embeddings por fila
+    codigos_embedding = cargar_codigos_embedding(ambiente)
+    config = MongoDBConfig(env_prefix=ambiente)
+    config.set_collection_name("client_pucs")
+    gestor = MongoDBManager(config)
+    fecha = datetime.now()
+    documentos = [documento_client_puc(uid_usuario, cuenta, codigos_embedding, fecha) for cuenta in modelo["cuentas"].values()]
+    if reconciliar:
+        reconciliar_client_pucs(gestor, uid_usuario, documentos, fecha, eliminar_obsoletas, tamano_lote)
+    else:
+        for inicio in range(0, len(documentos), tamano_lote):
+            gestor.collection.insert_many(documentos[inicio:inicio + tamano_lote], ordered=False)
+            logger.info(f"Procesadas {min(inicio + tamano_lote, len(documentos))} filas...")
+    gestor.close()
+    crear_centros_costo_en_bloque(
+        (documento_centro_costo(uid_usuario, *centro) for centro in modelo["centros_costo"]), ambiente
+    )
+    logger.info(f"Proceso completado. Se procesaron {len(documentos)} filas en total.")
+    if modelo["filas_omitidas"] > 0:
+        logger.info(f"Se saltaron {modelo['filas_omitidas']} filas con cuentas contables duplicadas.")
+
+
+def procesar_archivo_excel(uid_usuario: str, ruta_xlsx: str, ambiente: str, reconciliar: bool = False,
+                           eliminar_obsoletas: bool = False):
     """
     Procesa el archivo Excel y almacena los datos en MongoDB.
+    Con reconciliar=True solo se escriben las diferencias con client_pucs (ver subir_modelo_causacion).
     """
     try:
         if not os.path.exists(ruta_xlsx):
             logger.error(f"Archivo Excel no encontrado: {ruta_xlsx}")
             sys.exit(1)
-        logger.info("Eliminando documentos existentes...")
-        eliminar_client_pucs_existentes(uid_usuario, ambiente)
-        logger.info("Creando índices...")
-        crear_indices_client_pucs(uid_usuario, ambiente)
-        config = MongoDBConfig(env_prefix=ambiente)
-        config.set_collection_name("client_pucs")
-        gestor = MongoDBManager(config)
         logger.info(f"Cargando archivo Excel: {ruta_xlsx}")
-        libro = openpyxl.load_workbook(ruta_xlsx, data_only=True)
-        if "Hoja1" not in libro.sheetnames:
-            logger.error(f"Hoja 'Hoja1' no encontrada en el archivo. Hojas disponibles: {libro.sheetnames}")
-            sys.exit(1)
-        encabezados = obtener_encabezados_excel(libro)
-        hoja = libro["Hoja1"]
-        filas_procesadas = 0
-        filas_omitidas = 0
-        for idx, fila in enumerate(hoja.iter_rows(min_row=6, values_only=True), start=6):
-            idx_cuenta = encabezados.index("CUENTA CONTABLE   (OBLIGATORIO)")
-            cuenta_contable = str(fila[idx_cuenta]).strip() if fila[idx_cuenta] is not None else ""
-            idx_centro = encabezados.index("CENTRO DE COSTO")
-            centro_costo = str(fila[idx_centro]).strip() if fila[idx_centro] is not None else ""
-            idx_nit = encabezados.index("NIT")
-            nit = str(fila[idx_nit]).strip() if fila[idx_nit] is not None else ""
-            idx_subcentro = encabezados.index("SUBCENTRO DE COSTO")
-            subcentro_costo = str(fila[idx_subcentro]).strip() if fila[idx_subcentro] is not None else ""
-            if not cuenta_contable:
-                continue
-            doc_existente = gestor.collection.find_one({
-                "UID": ObjectId(uid_usuario),
-                "cuenta_contable": cuenta_contable
-            })
-            if doc_existente:
-                logger.warning(f"Cuenta contable '{cuenta_contable}' ya existe, saltando...")
-                filas_omitidas += 1
-                continue
-            puc = cuenta_contable[:6]
-            
-            # Obtener el code_field desde la Hoja5 del Excel
-            code_field = obtener_code_field(libro, cuenta_contable)
-            descripcion = obtener_item(libro, cuenta_contable)
-            
-            if buscar_embedding(puc, ambiente):
-                documento = {
-                    "UID": ObjectId(uid_usuario),
-                    "cuenta_contable": cuenta_contable,
-                    "description": descripcion,
-                    "code_field": code_field,
-                    "createdAt": datetime.now(),
-                    "updatedAt": datetime.now()
-                }
-            else:
-                documento = {
-                    "UID": ObjectId(uid_usuario),
-                    "cuenta_contable": cuenta_contable,
-                    "description": descripcion,
-                    "code_field": code_field,
-                    "uniquePuc": True,
-                    "createdAt": datetime.now(),
-                    "updatedAt": datetime.now()
-                }
-            gestor.collection.insert_one(documento)
-            crear_centro_costo_por_puc(uid_usuario, nit, cuenta_contable, centro_costo, subcentro_costo, ambiente)
-            filas_procesadas += 1
-            logger.info(f"Documento creado: {documento}")
-            if filas_procesadas % 100 == 0:
-                logger.info(f"Procesadas {filas_procesadas} filas...")
-        logger.info(f"Proceso completado. Se procesaron {filas_procesadas} filas en total.")
-        if filas_omitidas > 0:
-            logger.info(f"Se saltaron {filas_omitidas} filas con cuentas contables duplicadas.")
-        gestor.close()
+        modelo = fusionar_modelos_causacion([analizar_modelo_causacion(ruta_xlsx)])
+        subir_modelo_causacion(uid_usuario, modelo, ambiente, reconciliar, eliminar_obsoletas)
     except Exception as e:
         logger.error(f"Error procesando archivo Excel: {str(e)}")
         sys.exit(1)
 
+
+def procesar_modelos_causacion(uid_usuario: str, directorio: str, ambiente: str, procesos: Optional[int] = None,
+                               reconciliar: bool = False, eliminar_obsoletas: bool = False):
+    """
+    Procesa todos los modelos de causación de una carpeta (normalmente uno por mes): los lee
+    en paralelo, fusiona cuentas, code_field y centros de costo (ver fusionar_modelos_causacion)
+    y escribe el resultado una sola vez.
+
+    Args:
+        uid_usuario (str): UID del usuario
+        directorio (str): Carpeta con los archivos .xlsx o los CSV de la Hoja1
+        ambiente (str): Ambiente de MongoDB
+        procesos (Optional[int]): Máximo de procesos de lectura
+        reconciliar (bool): Escribir solo las diferencias con client_pucs
+        eliminar_obsoletas (bool): Al reconciliar, eliminar las cuentas que no están en ningún modelo
+    """
+    try:
+        rutas = listar_modelos_causacion(directorio)
+        if not rutas:
+            logger.error(f"No se encontraron modelos de causación en: {directorio}")
+            sys.exit(1)
+        logger.info(f"Leyendo {len(rutas)} modelos de causación: {[os.path.basename(ruta) for ruta in rutas]}")
+        modelo = fusionar_modelos_causacion(analizar_modelos_causacion(rutas, procesos))
+        logger.info(f"Modelos fusionados (del más antiguo al más reciente): {modelo['archivos']}; "
+                    f"{len(modelo['cuentas'])} cuentas, {modelo['conflictos']} actualizadas por un modelo más reciente")
+        subir_modelo_causacion(uid_usuario, modelo, ambiente, reconciliar, eliminar_obsoletas)
+    except Exception as e:
+        logger.error(f"Error procesando modelos de causación: {str(e)}")
+        sys.exit(1)
+
 # =============================
 # Utilidades de búsqueda y limpieza
 # =============================
-def buscar_embedding(puc: str, ambiente: str):
+def _ruta_cache_embeddings(directorio_cache: str, ambiente: str, db_name: Optional[str]) -> str:
+    return os.path.join(directorio_cache, f"{ambiente}-{db_name}.json")
+
+
+def leer_cache_embeddings(ruta_cache: str, ttl: float) -> Optional[Set[str]]:
     """
-    Busca si existe un embedding para el PUC dado en la colección puc_embeddings.
+    Lee los códigos guardados en la caché si existen y no han vencido.
     """
     try:
-        config = MongoDBConfig(env_prefix=ambiente)
-        config.set_collection_name("puc_embeddings")
-        gestor_embedding = MongoDBManager(config)
-        existe_puc = gestor_embedding.collection.find_one({"code": puc})
-        return bool(existe_puc)
-    except Exception as e:
-        logger.error(f"Error buscando embedding para el PUC {puc}: {str(e)}")
-        return False
+        with open(ruta_cache, encoding="utf-8") as archivo:
+            datos = json.load(archivo)
+    except (OSError, ValueError):
+        return None
+    if time.time() - datos.get("creado", 0) > ttl:
+        logger.info(f"Caché de puc_embeddings vencida: {ruta_cache}")
+        return None
+    return set(datos.get("codigos", []))
+
+
+def guardar_cache_embeddings(ruta_cache: str, codigos: Set[str]):
+    """
+    Guarda los códigos en la caché (escritura atómica).
+    """
+    os.makedirs(os.path.dirname(ruta_cache), exist_ok=True)
+    with open(ruta_cache + ".tmp", "w", encoding="utf-8") as archivo:
+        json.dump({"creado": time.time(), "codigos": sorted(codigos)}, archivo)
+    os.replace(ruta_cache + ".tmp", ruta_cache)
 
-def limpiar_nit(nit):
+
+def cargar_codigos_embedding(ambiente: str, directorio_cache: str = DIRECTORIO_CACHE_EMBEDDINGS,
+                             ttl: float = TTL_CACHE_EMBEDDINGS, usar_cache: bool = True) -> Set[str]:
     """
-    Limpia el NIT/cédula de caracteres no numéricos y espacios.
+    Retorna el conjunto de códigos PUC con embedding en puc_embeddings (los que tienen un
+    documento con ese code). Se consulta Mongo una sola vez (solo el campo code) y el resultado
+    se guarda en disco por `ttl` segundos para las siguientes ejecuciones en el mismo ambiente.
+
+    Args:
+        ambiente (str): Ambiente de MongoDB
+        directorio_cache (str): Carpeta de la caché
+        ttl (float): Vigencia de la caché en segundos
+        usar_cache (bool): Leer y escribir la caché en disco
+
+    Returns:
+        Set[str]: Códigos con embedding (vacío si la consulta falla)
     """
-    if isinstance(nit, str):
-        return ''.join(filter(str.isdigit, nit))
-    return nit
+    config = MongoDBConfig(env_prefix=ambiente)
+    config.set_collection_name("puc_embeddings")
+    ruta_cache = _ruta_cache_embeddings(directorio_cache, ambiente, config.db_name)
+    if usar_cache:
+        codigos = leer_cache_embeddings(ruta_cache, ttl)
+        if codigos is not None:
+            logger.info(f"Códigos de puc_embeddings desde caché: {len(codigos)} ({ruta_cache})")
+            return codigos
+    try:
+        gestor_embedding = MongoDBManager(config)
+        try:
+            # find_one({"code": puc}) solo coincide con códigos guardados como texto
+            codigos = {codigo for codigo in gestor_embedding.collection.distinct("code") if isinstance(codigo, str)}
+        finally:
+            gestor_embedding.close()
+    except Exception as e:
+        logger.error(f"Error cargando los códigos de puc_embeddings: {str(e)}")
+        return set()
+    logger.info(f"Códigos de puc_embeddings cargados: {len(codigos)}")
+    if usar_cache:
+        try:
+            guardar_cache_embeddings(ruta_cache, codigos)
+        except OSError as e:
+            logger.warning(f"No se pudo guardar la caché de puc_embeddings: {str(e)}")
+    return codigos
 
 # =============================
 # Creación de centro de costo por PUC
 # =============================
-def crear_centro_costo_por_puc(uid: str, nit: str, cuenta: str, centro: str, subcentro: str = None, ambiente=None):
+def documento_centro_costo(uid: str, nit: str, cuenta: str, centro: str, subcentro: str = None) -> Dict:
     """
-    Crea un documento de centro de costo por PUC en la colección correspondiente.
+    Construye el documento de cost_center_per_puc; sus cuatro campos son la clave natural.
     """
-    logger.info(f"Iniciando creación de centro de costo para PUC: UID={uid}, NIT={nit}, Cuenta={cuenta}, CentroCosto={centro}, SubCentro={subcentro}")
-    config = MongoDBConfig(env_prefix=ambiente)
-    config.set_collection_name("cost_center_per_puc")
-    gestor = MongoDBManager(config)
-    nit_limpio = limpiar_nit(nit)
     centro_costo_obj = {"center": centro}
     if subcentro:
         centro_costo_obj["subcenter"] = subcentro
-    doc_existente = gestor.collection.find_one({
-        "UID": ObjectId(uid),
-        "id_supplier": nit_limpio,
-        "account_code": cuenta,
-        "cost_center": centro_costo_obj,
-    })
-    if doc_existente:
-        logger.warning(f"Ya existe un centro de costo para la cuenta '{cuenta}' y NIT '{nit_limpio}', se omite...")
-        return
-    documento = {
+    return {
         "UID": ObjectId(uid),
-        "id_supplier": nit_limpio,
+        "id_supplier": limpiar_nit(nit),
         "account_code": cuenta,
         "cost_center": centro_costo_obj
     }
-    resultado = gestor.collection.insert_one(documento)
-    logger.info(f"Centro de costo por PUC creado con _id: {resultado.inserted_id} para NIT: {nit_limpio}, Cuenta: {cuenta}, CentroCosto: {centro_costo_obj}")
+
+
+def crear_indice_centros_costo(gestor: MongoDBManager):
+    """
+    Crea el índice único sobre la clave natural de cost_center_per_puc.
+    """
+    try:
+        gestor.collection.create_index(
+            [("UID", 1), ("id_supplier", 1), ("account_code", 1), ("cost_center", 1)],
+            unique=True,
+            name="uid_supplier_account_cost_center_unique"
+        )
+    except Exception as e:
+        logger.error(f"Error creando índice de cost_center_per_puc: {str(e)}")
+        logger.warning("Continuando sin crear índices...")
+
+
+def crear_centros_costo_en_bloque(documentos: Iterable[Dict], ambiente=None,
+                                  tamano_lote: int = TAMANO_LOTE_CENTROS_COSTO) -> Tuple[int, int]:
+    """
+    Crea los centros de costo por PUC que no existan: se eliminan los repetidos en memoria y los
+    distintos se escriben con upserts ($setOnInsert) en bulk_write, sin modificar los existentes.
+
+    Args:
+        documentos (Iterable[Dict]): Documentos construidos con documento_centro_costo
+        ambiente: Ambiente de MongoDB
+        tamano_lote (int): Operaciones por bulk_write
+
+    Returns:
+        Tuple[int, int]: (creados, ya existentes)
+    """
+    unicos = {}
+    for documento in documentos:
+        clave = (documento["UID"], documento["id_supplier"], documento["account_code"],
+                 tuple(documento["cost_center"].items()))
+        unicos.setdefault(clave, documento)
+    if not unicos:
+        return 0, 0
+    config = MongoDBConfig(env_prefix=ambiente)
+    config.set_collection_name("cost_center_per_puc")
+    gestor = MongoDBManager(config)
+    crear_indice_centros_costo(gestor)
+    documentos_unicos = list(unicos.values())
+    creados = 0
+    for inicio in range(0, len(documentos_unicos), tamano_lote):
+        lote = documentos_unicos[inicio:inicio + tamano_lote]
+        operaciones = [UpdateOne(dict(documento), {"$setOnInsert": documento}, upsert=True) for documento in lote]
+        try:
+            detalles = gestor.collection.bulk_write(operaciones, ordered=False).bulk_api_result
+        except BulkWriteError as bwe:
+            detalles = bwe.details
+            for error in detalles.get("writeErrors", []):
+                # 11000: otro proceso insertó el mismo centro de costo entre el upsert y el índice
+                if error.get("code") != 11000:
+                    documento = lote[error["index"]]
+                    logger.error(f"Error creando centro de costo para NIT {documento['id_supplier']}, Cuenta {documento['account_code']}: {error.get('errmsg')}")
+        creados += detalles.get("nUpserted", 0)
+    gestor.close()
+    existentes = len(documentos_unicos) - creados
+    logger.info(f"Centros de costo por PUC: {creados} creados, {existentes} ya existían")
+    return creados, existentes
 
 # =============================
 # Función principal
 # =============================
-def main(uid_usuario=None, ruta_xlsx=None, ambiente=None):
+def main(uid_usuario=None, ruta_xlsx=None, ambiente=None, reconciliar=False, eliminar_obsoletas=False):
     """
     Orquesta el proceso completo de onboarding de causación.
-    Recibe el UID y la ruta del archivo Excel como argumentos.
+    Recibe el UID y la ruta del archivo Excel como argumentos; si la ruta es una carpeta se
+    procesan juntos todos los modelos de causación que contiene. El modelo también puede ser un
+    CSV de la Hoja1 exportado de Siigo (con su Hoja5 en 'X_Hoja5.csv'), o una carpeta con
+    Hoja1.csv y Hoja5.csv; se lee sin openpyxl (ver analizar_modelo_causacion_csv).
+    Con reconciliar=True (--reconciliar) client_pucs se actualiza con solo las diferencias y con
+    eliminar_obsoletas=True (--eliminar-obsoletas) se borran las cuentas que ya no están en el modelo.
     Si no se proporcionan, los toma de la línea de comandos o usa la ruta por defecto.
     """
     logger.info("Iniciando procesamiento del archivo de causación...")
     # Convertir uid_usuario a ObjectId si es necesario
     if uid_usuario is None:
         if len(sys.argv) < 3:
-            print("Uso: python onboarding_causacion.py <UID> <AMBIENTE> [ruta_xlsx]")
+            print("Uso: python onboarding_causacion.py <UID> <AMBIENTE> [ruta_xlsx | ruta_csv | carpeta_modelos] [--reconciliar] [--eliminar-obsoletas]")
             sys.exit(1)
         try:
             uid_usuario = ObjectId(sys.argv[1])
@@ -356,8 +464,11 @@ def main(uid_usuario=None, ruta_xlsx=None, ambiente=None):
             print("El UID proporcionado no es un ObjectId válido.")
             sys.exit(1)
         ambiente = sys.argv[2]
-        if len(sys.argv) > 3:
-            ruta_xlsx = sys.argv[3]
+        argumentos = [argumento for argumento in sys.argv[3:] if not argumento.startswith("--")]
+        if argumentos:
+            ruta_xlsx = argumentos[0]
+        reconciliar = "--reconciliar" in sys.argv[3:]
+        eliminar_obsoletas = "--eliminar-obsoletas" in sys.argv[3:]
     else:
         if not isinstance(uid_usuario, ObjectId):
             try:
@@ -368,7 +479,10 @@ def main(uid_usuario=None, ruta_xlsx=None, ambiente=None):
     if ruta_xlsx is None:
         app_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
         ruta_xlsx = os.path.abspath(os.path.join(app_root, "data", "modelos_causacion", "SurtifloraModeloCausacionAbril2025.xlsx"))
-    procesar_archivo_excel(str(uid_usuario), ruta_xlsx, ambiente)
+    if os.path.isdir(ruta_xlsx):
+        procesar_modelos_causacion(str(uid_usuario), ruta_xlsx, ambiente, reconciliar=reconciliar, eliminar_obsoletas=eliminar_obsoletas)
+    else:
+        procesar_archivo_excel(str(uid_usuario), ruta_xlsx, ambiente, reconciliar, eliminar_obsoletas)
     logger.info("Proceso completado exitosamente.")
 
 if __name__ == "__main__":
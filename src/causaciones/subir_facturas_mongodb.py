@@ -3,21 +3,25 @@ import os
 import sys
 import logging
 import gc
-import openpyxl
 import pdfplumber
 import pymongo_auth_aws
 from typing import Optional
 from bson import ObjectId
 from pathlib import Path
 
-# Add the project root directory to Python path
+# Rutas del proyecto (los módulos usan imports relativos a src/ y a la raíz)
 project_root = str(Path(__file__).parent.parent.parent)
-if project_root not in sys.path:
-    sys.path.insert(0, project_root)
+src_root = str(Path(__file__).parent.parent)
+for ruta in (project_root, src_root):
+    if ruta not in sys.path:
+        sys.path.insert(0, ruta)
 
 from dotenv import load_dotenv
 from src.config.mongodb_config import MongoDBConfig
 from src.utils.mongodb_manager import MongoDBManager
+from utils.normalizacion import extraer_id_factura, limpiar_nit
+from utils.libro_excel import abrir_libro_en_cache
+from utils.esquema_hoja import EsquemaHoja
 from src.causaciones.renombrar_zips import obtener_archivos_zip, extraer_zip, procesar_archivos_zip
 from src.causaciones.renombrar_excels import renombrar_archivos_excel
 
@@ -26,6 +30,13 @@ from src.causaciones.renombrar_excels import renombrar_archivos_excel
 # =============================
 RUTA_XLSX = os.path.join("data", "modelos_causacion", "SurtifloraModeloCausacionAbril2025.xlsx")
 RUTA_ZIPS = os.path.join("data", "facturas")
+# Columnas usadas del modelo: tipo, NIT del proveedor, descripción del archivo y número de factura
+ESQUEMA_FACTURA = EsquemaHoja("modelo de facturas", [
+    ("tipo_factura", "TIPO DE FACTURA"),
+    ("nit_proveedor", "NIT"),
+    ("descripcion_archivo", "DESCRIPCIÓN DE LA SECUENCIA"),
+    ("numero_factura", "NÚMERO DEL DOCUMENTO DEL PROVEEDOR"),
+])
 
 logging.basicConfig(
     level=logging.INFO,
@@ -35,24 +46,6 @@ logging.basicConfig(
 # =============================
 # Funciones auxiliares
 # =============================
-def limpiar_nit(nit_raw: str) -> str:
-    """
-    Limpia el NIT/cédula de caracteres no numéricos y espacios.
-    """
-    return ''.join(filter(str.isdigit, nit_raw or ''))
-
-def extraer_id_factura(descripcion_archivo: str):
-    """
-    Extrae el identificador de factura de una descripción de archivo.
-    """
-    descripcion_archivo = descripcion_archivo.strip()
-    if not descripcion_archivo:
-        return 0
-    partes = descripcion_archivo.split()
-    for parte in partes:
-        if any(char.isdigit() for char in parte):
-            return parte
-
 def buscar_zip_similar(lista_zips, id_factura):
     """
     Busca el archivo zip más similar al id_factura.
@@ -147,36 +140,34 @@ def procesar_y_subir_facturas(uid, ambiente):
     contador_creadas = 0
     indice_factura = 1
     facturas_procesadas = set()
-    libro_trabajo = openpyxl.load_workbook(RUTA_XLSX, data_only=True)
-    hoja_trabajo = libro_trabajo.active
-    filas = list(hoja_trabajo.iter_rows(values_only=True))
-    encabezado_encontrado = False
-    for idx, fila in enumerate(filas):
-        if fila and str(fila[0]).strip() == "TIPO DE FACTURA":
-            logging.info("[INICIO] Encabezado XLSX encontrado, procesando facturas...")
-            indice_inicio = idx + 1
-            encabezado_encontrado = True
-            break
-    if not encabezado_encontrado:
-        logging.error("[ERROR] No se encontró el encabezado en el archivo XLSX.")
+    libro_trabajo = abrir_libro_en_cache(RUTA_XLSX)
+    # La hoja de facturas y sus columnas se ubican por el encabezado (la hoja activa del modelo
+    # puede ser otra, p. ej. Hoja5) y se validan antes de leer las facturas
+    try:
+        hoja_trabajo, fila_encabezado, posiciones = ESQUEMA_FACTURA.localizar_en_libro(libro_trabajo)
+    except ValueError as e:
+        logging.error(f"[ERROR] No se encontró el encabezado en el archivo XLSX: {e}")
+        libro_trabajo.close()
         gestor.close()
         return
-    for fila in filas[indice_inicio:]:
-        if not fila or not fila[0]:
+    logging.info(f"[INICIO] Encabezado XLSX encontrado en la hoja '{hoja_trabajo.title}', procesando facturas...")
+    # Solo se leen las columnas del esquema, desde la fila siguiente al encabezado
+    for fila in ESQUEMA_FACTURA.filas(hoja_trabajo, posiciones, min_row=fila_encabezado + 1):
+        if not fila.tipo_factura:
             continue
-        tipo_factura = str(fila[0]).strip()
+        tipo_factura = str(fila.tipo_factura).strip()
         if "Servicio" not in tipo_factura and "Arrendamiento" not in tipo_factura:
             logging.info(f"[SKIP] Tipo de factura '{tipo_factura}' no es 'Servicio - Gasto' ni 'Arrendamiento', saltando...")
             continue
-        id_proveedor = limpiar_nit(str(fila[16])).strip()
-        descripcion_archivo = str(fila[18]).strip()
+        id_proveedor = limpiar_nit(str(fila.nit_proveedor)).strip()
+        descripcion_archivo = str(fila.descripcion_archivo).strip()
         id_factura_original = extraer_id_factura(descripcion_archivo)
         if id_factura_original in facturas_procesadas:
             logging.info(f"[SKIP] Factura duplicada en Excel: {id_factura_original}")
             indice_factura += 1
             continue
         facturas_procesadas.add(id_factura_original)
-        id_factura = str(fila[86]).strip()
+        id_factura = str(fila.numero_factura).strip()
         descripcion_dian = extraer_descripcion_dian(id_factura)
         # Verificar si ya existe un documento con la misma clave única
         if gestor.collection.find_one({
@@ -203,6 +194,7 @@ def procesar_y_subir_facturas(uid, ambiente):
         except Exception as e:
             logging.error(f"[ERROR] Error al insertar factura {id_factura}: {str(e)}")
         indice_factura += 1
+    libro_trabajo.close()
     gestor.close()
     logging.info(f"[RESUMEN] Se crearon {contador_creadas} facturas nuevas en la base de datos.")
 
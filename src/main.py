@@ -47,8 +47,31 @@ def main_onboarding(cfg: DictConfig) -> None:
     # Configuración del ambiente (puede venir como parámetro o por defecto)
     ambiente = getattr(cfg, 'ambiente', 'DEV')
     
+    # Motor para el Libro Auxiliar (pasos 3 y 4): pandas o polars
+    motor = getattr(cfg, 'engine', 'pandas')
+    
+    # Diagnóstico detallado (lecturas extra por NIT) en la subida de proveedores
+    depurar = bool(getattr(cfg, 'debug', False))
+    
+    # Transacciones de proveedores embebidas o en la colección provider_transactions
+    almacenamiento = getattr(cfg, 'transactions_storage', 'embebido')
+    
+    # Sincronización incremental de proveedores (no borra, sube solo lo posterior a la marca de agua)
+    incremental = bool(getattr(cfg, 'incremental', False))
+    
+    # Campos del modelo de terceros escritos al crear los proveedores (omite el paso 5)
+    terceros_en_creacion = bool(getattr(cfg, 'terceros_en_creacion', False))
+    
+    # Procesar juntos todos los modelos de causación de data/modelos_causacion (paso 7)
+    todos_los_modelos = bool(getattr(cfg, 'causacion_todos_los_modelos', False))
+    
+    # client_pucs: escribir solo las diferencias en lugar de borrar y reinsertar (paso 7)
+    reconciliar_causacion = bool(getattr(cfg, 'causacion_reconciliar', False))
+    eliminar_obsoletas = bool(getattr(cfg, 'causacion_eliminar_obsoletas', False))
+    
     print("🔍 Configuración cargada desde YAML:")
     print(f"  - Ambiente: {ambiente}")
+    print(f"  - Motor: {motor}")
     print(f"  - Usuario: {config_dict['user']['email']}")
     print(f"  - DB: {config_dict['mongodb'][ambiente]['db_name']}")
     print("🔍 Fin de debug de configuración\n")
@@ -100,7 +123,7 @@ def main_onboarding(cfg: DictConfig) -> None:
         try:
             input_dir = os.path.join("data", "proveedores")
             output_dir = os.path.join(".", "results")
-            limpiar_y_procesar_proveedores(input_dir, output_dir, ambiente)
+            limpiar_y_procesar_proveedores(input_dir, output_dir, ambiente, motor)
             print("Libro Auxiliar procesado correctamente.")
         except Exception as e:
             print(f"\nError en el procesamiento del Libro Auxiliar: {str(e)}")
@@ -113,7 +136,7 @@ def main_onboarding(cfg: DictConfig) -> None:
         print("="*80)
         from proveedores.subir_proveedores_mongodb import subir_main as onboarding_proveedores
         try:
-            onboarding_proveedores(UID, ambiente)
+            onboarding_proveedores(UID, ambiente, motor, depurar, almacenamiento, incremental, terceros_en_creacion)
             print("Onboarding de proveedores ejecutado correctamente.")
         except Exception as e:
             print(f"\nError en el onboarding de proveedores: {str(e)}")
@@ -126,8 +149,11 @@ def main_onboarding(cfg: DictConfig) -> None:
         print("="*80)
         from proveedores.actualizar_proveedores_de_modelo_terceros import main as actualizar_responsabilidad_fiscal
         try:
-            actualizar_responsabilidad_fiscal(UID, ambiente)
-            print("Actualización de responsabilidad fiscal y actividad económica completada.")
+            if terceros_en_creacion:
+                print("Campos del modelo de terceros ya escritos en el paso 4, se omite.")
+            else:
+                actualizar_responsabilidad_fiscal(UID, ambiente)
+                print("Actualización de responsabilidad fiscal y actividad económica completada.")
         except Exception as e:
             print(f"\nError en la actualización de responsabilidad fiscal: {str(e)}")
             traceback.print_exc()
@@ -155,8 +181,11 @@ def main_onboarding(cfg: DictConfig) -> None:
         from causaciones.onboarding_causacion import main as procesamiento_causacion
         try:
             app_root = os.path.abspath(os.path.dirname(__file__))
-            xlsx_path = os.path.abspath(os.path.join(app_root, "..", "data", "modelos_causacion", "SurtifloraModeloCausacionAbril2025.xlsx"))
-            procesamiento_causacion(UID, xlsx_path, ambiente)
+            if todos_los_modelos:
+                xlsx_path = os.path.abspath(os.path.join(app_root, "..", "data", "modelos_causacion"))
+            else:
+                xlsx_path = os.path.abspath(os.path.join(app_root, "..", "data", "modelos_causacion", "SurtifloraModeloCausacionAbril2025.xlsx"))
+            procesamiento_causacion(UID, xlsx_path, ambiente, reconciliar_causacion, eliminar_obsoletas)
             print("Procesamiento del modelo de causación y subida de PUCs completado.")
         except Exception as e:
             print(f"\nError en el procesamiento del modelo de causación y subida de PUCs: {str(e)}")
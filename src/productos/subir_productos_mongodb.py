@@ -8,6 +8,8 @@ import sys
 
 from src.utils.mongodb_manager import MongoDBManager
 from src.config.mongodb_config import MongoDBConfig
+from src.utils.encabezados import detectar_encabezado_archivo, PATRONES_PRODUCTOS
+from utils.normalizacion import convertir_precio, limpiar_nit
 
 """
 Script para limpiar y cargar productos en la base de datos MongoDB a partir de un archivo CSV.
@@ -27,27 +29,11 @@ Este script realiza las siguientes acciones:
 load_dotenv()
 
 RUTA_CSV = os.path.join("data", "productos", "SurtifloraListaProductos.csv")
+LINEAS_PREAMBULO_POR_DEFECTO = 5
 
 # =============================
 # FUNCIONES AUXILIARES
 # =============================
-def convertir_precio(cadena_valor):
-    """
-    Convierte una cadena con separadores de miles (coma) y punto decimal en un float.
-    Ejemplo: "25,000.00000" -> 25000.0
-    """
-    limpiado = cadena_valor.replace(',', '')
-    try:
-        return float(limpiado)
-    except ValueError:
-        return 0.0
-
-def limpiar_nit(nit_raw: str) -> str:
-    """
-    Limpia el NIT/cédula de caracteres no numéricos y espacios.
-    """
-    return ''.join(filter(str.isdigit, nit_raw or ''))
-
 # =============================
 # LECTURA Y PROCESAMIENTO DEL CSV
 # =============================
@@ -64,10 +50,13 @@ def leer_productos_desde_csv(ruta_csv=RUTA_CSV, uid=None):
         raise ValueError("El parámetro 'uid' es obligatorio y debe ser un ObjectId válido.")
     productos = []
     indice_producto = 1
+    # Detectar el encabezado en el preámbulo; si no se encuentra se asumen 5 líneas
+    fila_encabezado, _, _ = detectar_encabezado_archivo(ruta_csv, PATRONES_PRODUCTOS, codificaciones=("utf-8",))
+    lineas_a_saltar = fila_encabezado + 1 if fila_encabezado is not None else LINEAS_PREAMBULO_POR_DEFECTO
     with open(ruta_csv, newline="", encoding="utf-8") as f:
         lector = csv.reader(f)
-        # Saltar las primeras 5 líneas (encabezados)
-        for _ in range(5):
+        # Saltar el preámbulo y la fila de encabezados
+        for _ in range(lineas_a_saltar):
             next(lector, None)
         for fila in lector:
             nombre = (fila[3] or "").strip()
@@ -3,10 +3,13 @@ import os
 import logging
 import pandas as pd
 from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 import sys
 
 from src.utils.mongodb_manager import MongoDBManager
 from src.config.mongodb_config import MongoDBConfig
+from utils.normalizacion import limpiar_campo, limpiar_campo_serie, limpiar_nit, limpiar_nit_serie
 
 # =============================
 # Configuración de logging
@@ -22,26 +25,12 @@ logger = logging.getLogger(__name__)
 # =============================
 NOMBRE_COLECCION = "providers"
 ruta_archivo = os.path.join('data', 'modelos_terceros', 'Surtiflora-Modelo_de_terceros.csv')
+CAMPOS_TERCEROS = ['fiscalResponsability', 'activity', 'city', 'businessName', 'branchOffice']
+TAMANO_LOTE = 1000
 
 # =============================
 # Funciones auxiliares de limpieza
 # =============================
-def limpiar_nit(nit_raw: str) -> str:
-    """
-    Limpia el NIT/cédula de caracteres no numéricos y espacios.
-    """
-    return ''.join(filter(str.isdigit, nit_raw or ''))
-
-
-def limpiar_campo(valor: str) -> str:
-    """
-    Limpia el valor de un campo eliminando espacios extra y normalizando.
-    """
-    if valor is None:
-        return ''
-    return valor.strip()
-
-
 # =============================
 # Procesamiento del archivo CSV
 # =============================
@@ -54,8 +43,42 @@ def procesar_csv_terceros(ruta_archivo: str):
     except Exception as e:
         logger.error(f"Error al leer el archivo CSV: {ruta_archivo}: {e}")
         return None, f"Error al leer el archivo CSV: {e}"
+    # Celdas vacías como '' (NaN es verdadero y limpiar_campo lo retornaría sin cambios),
+    # igual que en la lectura por columnas
+    marco_datos = marco_datos.fillna('')
+
+    columnas = detectar_columnas_terceros(marco_datos.columns)
+
+    # Validar columnas requeridas
+    if not columnas['resp_fiscal'] or not columnas['act_economica'] or not columnas['codigo_ciudad']:
+        logger.error(f"No se encontraron todas las columnas necesarias en el archivo {ruta_archivo}")
+        return None, "Faltan columnas requeridas en el archivo CSV."
+
+    logger.info(f"Columnas detectadas: {columnas}")
+    datos = []
+    for idx, fila in marco_datos.iterrows():
+        nit_raw = fila.get(columnas['nit'])
+        if pd.isna(nit_raw) or not nit_raw:
+            logger.warning(f"Fila {idx+2} sin NIT válido, se omite.")
+            continue
+        nit = limpiar_nit(nit_raw)
+        registro = {
+            'nit': nit,
+            'fiscalResponsability': limpiar_campo(fila.get(columnas['resp_fiscal']) or ''),
+            'activity': limpiar_campo(fila.get(columnas['act_economica']) or ''),
+            'city': limpiar_campo(fila.get(columnas['codigo_ciudad']) or ''),
+            'businessName': limpiar_campo(fila.get(columnas['razon_social']) or ''),
+            'branchOffice': limpiar_campo(fila.get(columnas['sucursal']) or '')
+        }
+        datos.append(registro)
+    logger.info(f"Total de registros procesados del CSV: {len(datos)}")
+    return datos, None
+
 
-    # Identificar columnas relevantes
+def detectar_columnas_terceros(nombres_columnas):
+    """
+    Identifica las columnas relevantes del modelo de terceros (si varias coinciden, gana la última).
+    """
     columnas = {
         'nit': 'IDENTIFICACIÓN  (OBLIGATORIO)',
         'resp_fiscal': None,
@@ -64,7 +87,7 @@ def procesar_csv_terceros(ruta_archivo: str):
         'razon_social': None,
         'sucursal': None
     }
-    for col in marco_datos.columns:
+    for col in nombres_columnas:
         if 'RESPONSABILIDAD FISCAL' in col.upper():
             columnas['resp_fiscal'] = col
         if 'ACTIVIDAD ECONÓMICA' in col.upper() or 'CODIGO ACTIVIDAD' in col.upper():
@@ -75,29 +98,41 @@ def procesar_csv_terceros(ruta_archivo: str):
             columnas['razon_social'] = col
         if 'SUCURSAL' in col.upper():
             columnas['sucursal'] = col
+    return columnas
 
-    # Validar columnas requeridas
+
+def procesar_csv_terceros_por_columnas(ruta_archivo: str):
+    """
+    Igual que procesar_csv_terceros, pero limpia cada columna completa de una vez en lugar
+    de recorrer las filas con iterrows. Las celdas vacías se toman como ''.
+    """
+    try:
+        marco_datos = pd.read_csv(ruta_archivo, encoding='utf-8', low_memory=False, dtype=str)
+    except Exception as e:
+        logger.error(f"Error al leer el archivo CSV: {ruta_archivo}: {e}")
+        return None, f"Error al leer el archivo CSV: {e}"
+
+    columnas = detectar_columnas_terceros(marco_datos.columns)
     if not columnas['resp_fiscal'] or not columnas['act_economica'] or not columnas['codigo_ciudad']:
         logger.error(f"No se encontraron todas las columnas necesarias en el archivo {ruta_archivo}")
         return None, "Faltan columnas requeridas en el archivo CSV."
-
     logger.info(f"Columnas detectadas: {columnas}")
-    datos = []
-    for idx, fila in marco_datos.iterrows():
-        nit_raw = fila.get(columnas['nit'])
-        if pd.isna(nit_raw) or not nit_raw:
-            logger.warning(f"Fila {idx+2} sin NIT válido, se omite.")
-            continue
-        nit = limpiar_nit(nit_raw)
-        registro = {
-            'nit': nit,
-            'fiscalResponsability': limpiar_campo(fila.get(columnas['resp_fiscal'], '')),
-            'activity': limpiar_campo(fila.get(columnas['act_economica'], '')),
-            'city': limpiar_campo(fila.get(columnas['codigo_ciudad'], '')),
-            'businessName': limpiar_campo(fila.get(columnas['razon_social'], '')),
-            'branchOffice': limpiar_campo(fila.get(columnas['sucursal'], ''))
-        }
-        datos.append(registro)
+
+    def columna_limpia(nombre):
+        if nombre is None or nombre not in marco_datos.columns:
+            return [''] * len(marco_datos)
+        return limpiar_campo_serie(marco_datos[nombre].fillna('')).tolist()
+
+    nits_raw = marco_datos[columnas['nit']] if columnas['nit'] in marco_datos.columns else pd.Series([None] * len(marco_datos), dtype=object)
+    con_nit = nits_raw.notna() & (nits_raw != '')
+    if (~con_nit).any():
+        logger.warning(f"{int((~con_nit).sum())} filas sin NIT válido, se omiten.")
+    nits = limpiar_nit_serie(nits_raw.fillna('')).tolist()
+    valores = [columna_limpia(columnas[clave]) for clave in ('resp_fiscal', 'act_economica', 'codigo_ciudad', 'razon_social', 'sucursal')]
+    datos = [
+        {'nit': nit, **dict(zip(CAMPOS_TERCEROS, campos))}
+        for nit, incluir, *campos in zip(nits, con_nit.tolist(), *valores) if incluir
+    ]
     logger.info(f"Total de registros procesados del CSV: {len(datos)}")
     return datos, None
 
@@ -175,14 +210,102 @@ def actualizar_proveedores(datos, uid, ambiente):
     return estadisticas
 
 
+def indexar_terceros_por_nit(datos):
+    """
+    Construye el índice NIT -> campos de enriquecimiento a partir de los registros del CSV.
+    Si un NIT aparece en varias filas, sus campos no vacíos se combinan en orden (gana la
+    última fila), como con las actualizaciones sucesivas de actualizar_proveedores.
+    """
+    indice = {}
+    for registro in datos:
+        if registro['nit']:
+            indice.setdefault(registro['nit'], {}).update(
+                {campo: registro[campo] for campo in CAMPOS_TERCEROS if registro[campo]}
+            )
+    return indice
+
+
+def cargar_indice_terceros(ruta=ruta_archivo):
+    """
+    Lee el modelo de terceros y retorna su índice por NIT (ver indexar_terceros_por_nit).
+    Returns:
+        tuple: (indice, error)
+    """
+    datos, error = procesar_csv_terceros_por_columnas(ruta)
+    if error:
+        return None, error
+    return indexar_terceros_por_nit(datos), None
+
+
+def actualizar_proveedores_en_bloque(datos, uid, ambiente, tamano_lote=TAMANO_LOTE):
+    """
+    Variante rápida de actualizar_proveedores: lee de MongoDB solo 'id' y '_id' de los
+    proveedores del UID y aplica todo el enriquecimiento en bulk_write no ordenados.
+    Las filas repetidas de un NIT se combinan como en indexar_terceros_por_nit.
+    Returns:
+        dict: Mismas estadísticas que actualizar_proveedores.
+    """
+    estadisticas = {
+        'proveedores_actualizados_fiscal': 0,
+        'registros_procesados_fiscal': 0,
+        'registros_fallidos_fiscal': 0,
+        'errores': []
+    }
+    gestor_mongo = None
+    try:
+        configuracion_mongodb = MongoDBConfig(env_prefix=ambiente)
+        configuracion_mongodb.set_collection_name(NOMBRE_COLECCION)
+        gestor_mongo = MongoDBManager(configuracion_mongodb)
+        coleccion = gestor_mongo.collection
+        mapa_proveedor_por_id = {
+            p['id']: p['_id'] for p in coleccion.find({'UID': uid}, {'id': 1, '_id': 1}) if p.get('id')
+        }
+
+        encontrados = []
+        for registro in datos:
+            estadisticas['registros_procesados_fiscal'] += 1
+            nit = registro['nit']
+            if not nit or nit not in mapa_proveedor_por_id:
+                if nit:
+                    logger.warning(f"Proveedor no encontrado para NIT {nit}.")
+                estadisticas['registros_fallidos_fiscal'] += 1
+                continue
+            encontrados.append(registro)
+        campos_por_nit = indexar_terceros_por_nit(encontrados)
+
+        fecha_actualizacion = datetime.datetime.now(datetime.timezone.utc)
+        operaciones = [
+            UpdateOne({'_id': mapa_proveedor_por_id[nit]}, {'$set': {'ultima_actualizacion': fecha_actualizacion, **campos}})
+            for nit, campos in campos_por_nit.items()
+        ]
+        for inicio in range(0, len(operaciones), tamano_lote):
+            try:
+                resultado = coleccion.bulk_write(operaciones[inicio:inicio + tamano_lote], ordered=False)
+                estadisticas['proveedores_actualizados_fiscal'] += resultado.modified_count
+            except BulkWriteError as bwe:
+                estadisticas['proveedores_actualizados_fiscal'] += bwe.details.get('nModified', 0)
+                for error in bwe.details.get('writeErrors', []):
+                    logger.error(f"Error al actualizar proveedor: {error.get('errmsg')}")
+                    estadisticas['errores'].append(error.get('errmsg'))
+    except Exception as e:
+        logger.error(f"Error general al actualizar proveedores: {e}", exc_info=True)
+        estadisticas['errores'].append(str(e))
+    finally:
+        if gestor_mongo:
+            gestor_mongo.close()
+    logger.info(f"Finalizado. Proveedores actualizados: {estadisticas['proveedores_actualizados_fiscal']}")
+    return estadisticas
+
+
 # =============================
 # Función principal
 # =============================
-def main(uid=None, ambiente=None):
+def main(uid=None, ambiente=None, rapido=True):
     """
     Orquesta el procesamiento del CSV y la actualización de proveedores en MongoDB.
     Recibe el UID como argumento (ObjectId o str convertible a ObjectId).
     Si no se proporciona, lo toma de la línea de comandos.
+    Con rapido=True usa la lectura por columnas y la actualización en bloque.
     """
     # Convertir uid a ObjectId si es necesario
     if uid is None:
@@ -203,12 +326,14 @@ def main(uid=None, ambiente=None):
                 print("El UID proporcionado no es un ObjectId válido.")
                 return
     logger.info(f"Iniciando procesamiento de archivo: {ruta_archivo}")
-    datos, error = procesar_csv_terceros(ruta_archivo)
+    procesar = procesar_csv_terceros_por_columnas if rapido else procesar_csv_terceros
+    datos, error = procesar(ruta_archivo)
     if error:
         logger.error(error)
         print(f"Error: {error}")
         return
-    estadisticas = actualizar_proveedores(datos, uid, ambiente)
+    actualizar = actualizar_proveedores_en_bloque if rapido else actualizar_proveedores
+    estadisticas = actualizar(datos, uid, ambiente)
     print("--- Resultado de la actualización ---")
     print(f"Proveedores procesados: {estadisticas['registros_procesados_fiscal']}")
     print(f"Proveedores actualizados: {estadisticas['proveedores_actualizados_fiscal']}")
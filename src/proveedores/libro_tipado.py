@@ -0,0 +1,170 @@
+from typing import Iterable, List, NamedTuple
+
+import numpy as np
+import pandas as pd
+
+"""
+Representación tipada y compacta en memoria de los Libros Auxiliares ya procesados.
+
+- Las columnas que se repiten miles de veces (NIT, CUENTA, ...) se guardan como categóricas.
+- DEBITOS, CREDITOS y SALDO ACUMULADO se convierten a numéricos una sola vez.
+- FECHA se convierte a datetime64 al cargar.
+
+Los tipos se aplican al leer el CSV (read_csv construye directamente categóricas, float64 y
+datetime64), así el pico de memoria no incluye una copia del libro como cadenas.
+"""
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+# NOMBRE se incluye porque se repite igual que el NIT al que pertenece
+COLUMNAS_CATEGORICAS = ['NIT', 'CUENTA', 'CENTRO COSTO', 'DESCRIPCION', 'NOMBRE']
+COLUMNAS_NUMERICAS = ['DEBITOS', 'CREDITOS', 'SALDO ACUMULADO']
+COLUMNA_FECHA = 'FECHA'
+FORMATO_FECHA = '%d/%m/%Y'
+# Caracteres del nombre de columna que se reemplazan por '_' en el nombre del campo de MongoDB
+TABLA_NOMBRE_CAMPO = str.maketrans(' .-', '___')
+
+
+class ColumnaAdicional(NamedTuple):
+    """Columna del Libro Auxiliar que se copia a campos_adicionales."""
+    posicion: int
+    columna: str
+    campo: str
+
+# =============================
+# PLAN DE COLUMNAS
+# =============================
+def normalizar_nombre_campo(columna: str) -> str:
+    """
+    Convierte un nombre de columna del CSV en nombre de campo para MongoDB ("DIG.VER." -> "dig_ver_").
+
+    Args:
+        columna (str): Nombre de la columna
+
+    Returns:
+        str: Nombre del campo
+    """
+    return columna.translate(TABLA_NOMBRE_CAMPO).lower()
+
+
+def plan_columnas_adicionales(columnas: Iterable[str], columnas_requeridas: Iterable[str]) -> List[ColumnaAdicional]:
+    """
+    Calcula una sola vez por archivo qué columnas van a campos_adicionales, su posición y el
+    nombre del campo en MongoDB, para no repetir ese trabajo por fila.
+
+    Args:
+        columnas (Iterable[str]): Columnas del archivo, en orden
+        columnas_requeridas (Iterable[str]): Columnas que no se copian
+
+    Returns:
+        List[ColumnaAdicional]: Columnas adicionales en el orden del archivo
+    """
+    requeridas = set(columnas_requeridas)
+    return [
+        ColumnaAdicional(posicion, columna, normalizar_nombre_campo(columna))
+        for posicion, columna in enumerate(columnas) if columna not in requeridas
+    ]
+
+# =============================
+# CONVERSIONES
+# =============================
+def convertir_a_numerico(serie: pd.Series) -> pd.Series:
+    """
+    Convierte valores con separador de miles (coma) y punto decimal a float64.
+    Ejemplo: "4,846,894.00" -> 4846894.0. Los valores no convertibles quedan como NaN.
+
+    Args:
+        serie (pd.Series): Serie de cadenas
+
+    Returns:
+        pd.Series: Serie float64
+    """
+    limpia = serie.astype('string').str.strip().str.replace(',', '', regex=False)
+    return pd.to_numeric(limpia, errors='coerce').astype('float64')
+
+
+def convertir_a_fecha(serie: pd.Series) -> pd.Series:
+    """
+    Convierte fechas en formato dd/mm/aaaa a datetime64. Las fechas inválidas quedan como NaT.
+
+    Args:
+        serie (pd.Series): Serie de cadenas
+
+    Returns:
+        pd.Series: Serie datetime64[ns]
+    """
+    return pd.to_datetime(serie.astype('string').str.strip(), format=FORMATO_FECHA, errors='coerce')
+
+
+def recortar_categorias(serie: pd.Series) -> pd.Series:
+    """
+    Quita los espacios de los extremos a las categorías de una serie categórica sin pasar por
+    cadenas fila a fila. Si dos categorías quedan iguales al recortarlas se unen en una.
+
+    Args:
+        serie (pd.Series): Serie categórica
+
+    Returns:
+        pd.Series: Serie categórica con las categorías recortadas
+    """
+    categorias = serie.cat.categories.astype(str).str.strip()
+    if categorias.is_unique:
+        return serie.cat.rename_categories(categorias)
+    unicas = pd.Index(categorias.unique())
+    codigos_nuevos = unicas.get_indexer(categorias)
+    codigos = serie.cat.codes.to_numpy()
+    codigos = np.where(codigos >= 0, codigos_nuevos[codigos], -1)
+    return pd.Series(pd.Categorical.from_codes(codigos, unicas), index=serie.index, name=serie.name)
+
+
+def tipar_libro(marco_datos: pd.DataFrame) -> pd.DataFrame:
+    """
+    Completa los tipos compactos de un Libro Auxiliar procesado. Acepta columnas ya tipadas por
+    read_csv (solo se recortan las categorías) o leídas como cadenas (se convierten aquí).
+
+    Args:
+        marco_datos (pd.DataFrame): DataFrame leído con leer_libro_procesado o con dtype=str
+
+    Returns:
+        pd.DataFrame: El mismo DataFrame con columnas categóricas, numéricas y de fecha
+    """
+    for columna in COLUMNAS_CATEGORICAS:
+        if columna in marco_datos.columns:
+            if not isinstance(marco_datos[columna].dtype, pd.CategoricalDtype):
+                marco_datos[columna] = marco_datos[columna].astype('category')
+            marco_datos[columna] = recortar_categorias(marco_datos[columna])
+    for columna in COLUMNAS_NUMERICAS:
+        if columna in marco_datos.columns:
+            if pd.api.types.is_numeric_dtype(marco_datos[columna]):
+                marco_datos[columna] = marco_datos[columna].astype('float64')
+            else:
+                marco_datos[columna] = convertir_a_numerico(marco_datos[columna])
+    if COLUMNA_FECHA in marco_datos.columns and not pd.api.types.is_datetime64_any_dtype(marco_datos[COLUMNA_FECHA]):
+        marco_datos[COLUMNA_FECHA] = convertir_a_fecha(marco_datos[COLUMNA_FECHA])
+    return marco_datos
+
+
+def leer_libro_procesado(ruta_archivo: str) -> pd.DataFrame:
+    """
+    Lee un archivo *_Procesado.csv y lo devuelve con la representación tipada.
+
+    Los tipos se pasan a read_csv para que el parser construya directamente las categóricas, los
+    importes (con la coma como separador de miles) y las fechas, sin un DataFrame intermedio de
+    cadenas. Solo las columnas con valores que el parser no pudo convertir se terminan en tipar_libro.
+
+    Args:
+        ruta_archivo (str): Ruta al CSV procesado
+
+    Returns:
+        pd.DataFrame: Libro Auxiliar tipado
+    """
+    columnas = pd.read_csv(ruta_archivo, encoding='utf-8', nrows=0).columns
+    tipos = {
+        columna: 'category' if columna in COLUMNAS_CATEGORICAS else str
+        for columna in columnas if columna not in COLUMNAS_NUMERICAS
+    }
+    fechas = [COLUMNA_FECHA] if COLUMNA_FECHA in columnas else None
+    marco_datos = pd.read_csv(ruta_archivo, encoding='utf-8', low_memory=False, dtype=tipos, thousands=',',
+                              parse_dates=fechas, date_format=FORMATO_FECHA if fechas else None)
+    return tipar_libro(marco_datos)
@@ -4,8 +4,14 @@ import re
 from typing import Tuple, List, Dict
 import numpy as np
 import os
+import inspect
+import shutil
 from collections import Counter
 
+from utils.encabezados import detectar_encabezado, detectar_encabezado_archivo, PATRONES_LIBRO_AUXILIAR
+from utils.cache_contenido import buscar_en_cache, calcular_clave_cache, calcular_version_codigo, guardar_en_cache
+from utils.normalizacion import limpiar_nit
+
 """
 Script profesional para limpiar y procesar archivos de proveedores (Libro Auxiliar).
 - Todos los métodos y logs están en español.
@@ -37,6 +43,16 @@ CONTEOS_ESPERADOS = {
     }
 }
 
+# Fila usada cuando no se detecta un encabezado en el preámbulo
+FILA_ENCABEZADO_POR_DEFECTO = 7
+
+# Motores de procesamiento disponibles (clave "engine" de la configuración Hydra)
+MOTORES_DISPONIBLES = ("pandas", "polars")
+MOTOR_POR_DEFECTO = "pandas"
+
+# Caché de CSV procesados, relativa al directorio de salida (results/cache/libro_auxiliar)
+DIRECTORIO_CACHE = os.path.join("cache", "libro_auxiliar")
+
 # =============================
 # FUNCIONES AUXILIARES
 # =============================
@@ -105,10 +121,10 @@ def extraer_nit_nombre(fila: pd.Series) -> Tuple[str, str]:
         print(f"Columna 8 (Nombre alt): {nombre_alt}")
         
         # Extraer NIT (solo dígitos) de la columna 4
-        nit = ''.join(c for c in nit_nombre if c.isdigit())
+        nit = limpiar_nit(nit_nombre)
         
         # Validar NIT contra la columna 5 (eliminando comas)
-        nit_validacion = ''.join(c for c in nit_formateado if c.isdigit())
+        nit_validacion = limpiar_nit(nit_formateado)
         if nit_validacion and nit != nit_validacion:
             print(f"Advertencia: NIT diferente entre columnas - Col4: {nit}, Col5: {nit_validacion}")
             nit = nit_validacion  # Usar la versión formateada si es diferente
@@ -126,6 +142,7 @@ def extraer_nit_nombre(fila: pd.Series) -> Tuple[str, str]:
 def encontrar_fila_encabezado(marco_datos: pd.DataFrame, umbral_sin_nombre: float = 0.5) -> int:
     """
     Busca la primera fila que debe usarse como encabezados verificando la proporción de columnas sin nombre.
+    Se conserva por compatibilidad; procesar_libro_auxiliar usa detectar_encabezado_archivo sobre las líneas crudas.
     
     Args:
         marco_datos (pd.DataFrame): El DataFrame de entrada
@@ -134,39 +151,14 @@ def encontrar_fila_encabezado(marco_datos: pd.DataFrame, umbral_sin_nombre: floa
     Returns:
         int: Índice de la fila a usar como encabezado
     """
-    for idx in range(len(marco_datos)):
-        # Convertir fila a nombres de columna y verificar proporción de sin nombre
-        columnas_prueba = marco_datos.iloc[idx].tolist()
-        
-        # Contar valores vacíos, nan, o sin nombre
-        sin_nombre = sum(1 for col in columnas_prueba 
-                          if pd.isna(col)
-                          or not str(col).strip()
-                          or str(col).strip().startswith('Unnamed:'))
-        
-        # Contar valores significativos (no solo cualquier cadena no vacía)
-        valores_significativos = sum(1 for col in columnas_prueba 
-                              if pd.notna(col)
-                              and str(col).strip()
-                              and any(palabra in str(col).lower() for palabra in 
-                                    ['cuenta', 'nit', 'saldo', 'fecha', 'descripcion', 'debito', 'credito', 'comprobante']))
-        
-        proporcion_sin_nombre = sin_nombre / len(columnas_prueba)
-        
-        # Queremos al menos 3 nombres de columna significativos y menos que el umbral de sin nombre
-        if valores_significativos >= 3 and proporcion_sin_nombre <= umbral_sin_nombre:
-            print(f"\nEncabezado encontrado en la fila {idx}")
-            print("Encabezados:", [str(col).strip() for col in columnas_prueba if pd.notna(col) and str(col).strip()])
-            return idx
-            
-        # Información de depuración
-        if idx < 10:  # Imprimir primeras 10 filas para depuración
-            print(f"\nAnálisis de fila {idx}:")
-            print(f"Valores significativos: {valores_significativos}")
-            print(f"Proporción sin nombre: {proporcion_sin_nombre:.2f}")
-            print("Valores:", [str(col).strip() for col in columnas_prueba if pd.notna(col) and str(col).strip()])
-            
-    return 7  # Por defecto a la fila 6 si no se encuentra una buena fila de encabezado
+    filas = (["" if pd.isna(col) else str(col) for col in fila]
+             for fila in marco_datos.itertuples(index=False, name=None))
+    indice, mapa_columnas = detectar_encabezado(filas, PATRONES_LIBRO_AUXILIAR, umbral_sin_nombre=umbral_sin_nombre)
+    if indice is None:
+        return FILA_ENCABEZADO_POR_DEFECTO
+    print(f"\nEncabezado encontrado en la fila {indice}")
+    print("Encabezados:", list(mapa_columnas))
+    return indice
 
 def validar_conteo_filas(nombre_archivo: str, total: int, puc_5: int, puc_6: int) -> None:
     """
@@ -200,10 +192,59 @@ def validar_conteo_filas(nombre_archivo: str, total: int, puc_5: int, puc_6: int
         
     print(f"\nValidación de conteo de filas exitosa para {esperado['description']} ✓")
 
+def limpiar_nombres_columnas(columnas) -> List[str]:
+    """
+    Elimina espacios de los nombres de columnas y renombra los duplicados con sufijo _1, _2, ...
+    
+    Args:
+        columnas: Nombres de columnas originales
+        
+    Returns:
+        List[str]: Nombres de columnas limpios y únicos
+    """
+    nuevas_columnas = []
+    ya_vistas = set()
+    for col in columnas:
+        limpio = str(col).strip()
+        if limpio in ya_vistas:
+            i = 1
+            while f"{limpio}_{i}" in ya_vistas:
+                i += 1
+            limpio = f"{limpio}_{i}"
+        ya_vistas.add(limpio)
+        nuevas_columnas.append(limpio)
+    return nuevas_columnas
+
+def reportar_validacion_conteos(total: int, puc_5: int, puc_6: int, conteos_esperados: Dict[str, int]) -> None:
+    """
+    Compara los conteos finales con los esperados e imprime advertencias sin detener el proceso.
+    
+    Args:
+        total (int): Número total de filas procesadas
+        puc_5 (int): Número de filas con PUC comenzando con 5
+        puc_6 (int): Número de filas con PUC comenzando con 6
+        conteos_esperados (Dict[str, int]): Conteos esperados con claves "total_rows", "puc_5_rows", "puc_6_rows"
+    """
+    errores = []
+    if total != conteos_esperados["total_rows"]:
+        errores.append(f"Se esperaban {conteos_esperados['total_rows']} filas, pero hay {total}")
+    if puc_5 != conteos_esperados["puc_5_rows"]:
+        errores.append(f"Se esperaban {conteos_esperados['puc_5_rows']} filas de PUC 5, pero hay {puc_5}")
+    if puc_6 != conteos_esperados["puc_6_rows"]:
+        errores.append(f"Se esperaban {conteos_esperados['puc_6_rows']} filas de PUC 6, pero hay {puc_6}")
+    
+    if errores:
+        print("\nADVERTENCIA: Validación de conteo de filas fallida:")
+        for error in errores:
+            print(f"  - {error}")
+        print("Se continuará con el procesamiento a pesar de las diferencias.")
+    else:
+        print("\nValidación de conteo de filas exitosa ✓")
+
 # =============================
 # PROCESAMIENTO PRINCIPAL DE ARCHIVO
 # =============================
-def procesar_libro_auxiliar(archivo_entrada: str, archivo_salida: str, conteos_esperados: Dict[str, int] | None = None) -> None:
+def procesar_libro_auxiliar(archivo_entrada: str, archivo_salida: str, conteos_esperados: Dict[str, int] | None = None) -> Dict[str, int]:
     """
     Procesa un archivo de libro auxiliar y genera un CSV limpio.
     
@@ -212,47 +253,37 @@ def procesar_libro_auxiliar(archivo_entrada: str, archivo_salida: str, conteos_e
         archivo_salida (str): Ruta para guardar el archivo CSV procesado
         conteos_esperados (Dict[str, int] | None): Diccionario opcional con conteos de filas esperados
             que contiene claves: "total_rows", "puc_5_rows", "puc_6_rows"
+
+    Returns:
+        Dict[str, int]: Conteos obtenidos con las mismas claves que conteos_esperados
     """
     # Asegurar que las rutas de archivo usen separadores compatibles con Windows
     archivo_entrada = os.path.normpath(archivo_entrada)
     archivo_salida = os.path.normpath(archivo_salida)
     
-    # Probar diferentes codificaciones para Windows
-    codificaciones = ['latin1', 'utf-8', 'cp1252']
-    marco_datos = None
-    codificacion_exitosa = None
-    
-    for codificacion in codificaciones:
-        try:
-            print(f"\nIntentando leer el archivo con codificación: {codificacion}")
-            # Leer el archivo CSV sin encabezados primero
-            marco_datos = pd.read_csv(archivo_entrada, engine='python', encoding=codificacion, header=None)
-            codificacion_exitosa = codificacion
-            print(f"Lectura exitosa con codificación: {codificacion}")
-            break
-        except Exception as e:
-            print(f"Error con codificación {codificacion}: {str(e)}")
-            continue
-    
-    if marco_datos is None:
-        raise ValueError("No se pudo leer el archivo con ninguna de las codificaciones intentadas")
-    
-    print(f"\nAnálisis inicial: {len(marco_datos)} filas")
-    
-    # Encontrar la fila del encabezado
-    fila_encabezado = encontrar_fila_encabezado(marco_datos)
-    
-    # Volver a leer el CSV con la fila de encabezado correcta
+    # Detectar codificación y fila de encabezado sobre las primeras líneas crudas
+    fila_encabezado, mapa_columnas, codificacion_exitosa = detectar_encabezado_archivo(archivo_entrada, PATRONES_LIBRO_AUXILIAR)
+    print(f"Lectura exitosa con codificación: {codificacion_exitosa}")
+    if fila_encabezado is None:
+        fila_encabezado = FILA_ENCABEZADO_POR_DEFECTO
+        print(f"No se encontró encabezado en las primeras líneas, se usa la fila {fila_encabezado} por defecto")
+    else:
+        print(f"\nEncabezado encontrado en la fila {fila_encabezado}")
+        print("Encabezados:", list(mapa_columnas))
+    
+    # Leer el CSV con la fila de encabezado correcta
     try:
         marco_datos = pd.read_csv(archivo_entrada, engine='python', encoding=codificacion_exitosa, skiprows=fila_encabezado)
     except Exception as e:
-        print(f"Error al releer con encabezados: {str(e)}")
+        print(f"Error al leer con encabezados: {str(e)}")
         # Probar enfoque alternativo - leer sin encabezados y establecer manualmente
         marco_datos = pd.read_csv(archivo_entrada, engine='python', encoding=codificacion_exitosa, header=None, skiprows=fila_encabezado)
         # Usar la primera fila como encabezado (este enfoque puede necesitar ajustes)
         marco_datos.columns = [f"Col_{i}" if pd.isna(x) or not str(x).strip() else str(x).strip() for i, x in enumerate(marco_datos.iloc[0])]
         marco_datos = marco_datos.iloc[1:].reset_index(drop=True)
     
+    print(f"\nAnálisis inicial: {len(marco_datos)} filas")
+    
     print(f"\nColumnas detectadas: {marco_datos.columns.tolist()}")
     
     # Obtener índices válidos basados en la densidad de datos
@@ -318,18 +349,7 @@ def procesar_libro_auxiliar(archivo_entrada: str, archivo_salida: str, conteos_e
         print(f"Error convirtiendo CUENTA: {str(e)}. Se conserva el formato original.")
     
     # Limpiar nombres de columnas
-    nuevas_columnas = []
-    ya_vistas = set()
-    for col in marco_datos_final.columns:
-        limpio = str(col).strip()
-        if limpio in ya_vistas:
-            i = 1
-            while f"{limpio}_{i}" in ya_vistas:
-                i += 1
-            limpio = f"{limpio}_{i}"
-        ya_vistas.add(limpio)
-        nuevas_columnas.append(limpio)
-    marco_datos_final.columns = nuevas_columnas
+    marco_datos_final.columns = limpiar_nombres_columnas(marco_datos_final.columns)
     
     # Contar códigos PUC que comienzan con 5 y 6
     puc_5 = marco_datos_final['CUENTA'].str.startswith('5').sum()
@@ -343,21 +363,7 @@ def procesar_libro_auxiliar(archivo_entrada: str, archivo_salida: str, conteos_e
     
     # Validar conteos de filas si se proporcionaron conteos esperados
     if conteos_esperados:
-        errores = []
-        if total != conteos_esperados["total_rows"]:
-            errores.append(f"Se esperaban {conteos_esperados['total_rows']} filas, pero hay {total}")
-        if puc_5 != conteos_esperados["puc_5_rows"]:
-            errores.append(f"Se esperaban {conteos_esperados['puc_5_rows']} filas de PUC 5, pero hay {puc_5}")
-        if puc_6 != conteos_esperados["puc_6_rows"]:
-            errores.append(f"Se esperaban {conteos_esperados['puc_6_rows']} filas de PUC 6, pero hay {puc_6}")
-        
-        if errores:
-            print("\nADVERTENCIA: Validación de conteo de filas fallida:")
-            for error in errores:
-                print(f"  - {error}")
-            print("Se continuará con el procesamiento a pesar de las diferencias.")
-        else:
-            print("\nValidación de conteo de filas exitosa ✓")
+        reportar_validacion_conteos(total, puc_5, puc_6, conteos_esperados)
     
     print(f"\nDatos finales procesados: {len(marco_datos_final)} filas, columnas: {list(marco_datos_final.columns)}")
     print("\nMuestra de datos procesados:")
@@ -370,20 +376,116 @@ def procesar_libro_auxiliar(archivo_entrada: str, archivo_salida: str, conteos_e
     except Exception as e:
         print(f"\nError al guardar el archivo CSV: {str(e)}")
 
+    return {"total_rows": int(total), "puc_5_rows": int(puc_5), "puc_6_rows": int(puc_6)}
+
+# =============================
+# SELECCIÓN DEL MOTOR
+# =============================
+def obtener_procesador_libro_auxiliar(motor: str):
+    """
+    Retorna la función que procesa un archivo de libro auxiliar según el motor.
+    
+    Args:
+        motor (str): "pandas" o "polars"
+        
+    Returns:
+        Callable: Función con la firma de procesar_libro_auxiliar
+        
+    Raises:
+        ValueError: Si el motor no es válido
+    """
+    if motor == "pandas":
+        return procesar_libro_auxiliar
+    if motor == "polars":
+        # Importación diferida: polars solo es necesario con este motor
+        from proveedores.motor_polars import procesar_libro_auxiliar_polars
+        return procesar_libro_auxiliar_polars
+    raise ValueError(f"Motor no válido: {motor}. Opciones: {', '.join(MOTORES_DISPONIBLES)}")
+
+# =============================
+# CACHÉ DE ARCHIVOS PROCESADOS
+# =============================
+def calcular_version_limpiador(procesar_archivo) -> str:
+    """
+    Versión del código de limpieza: hash de este módulo, del detector de encabezados, de la
+    normalización de NIT y del módulo del motor usado. Si cualquiera cambia, la caché deja de coincidir.
+    """
+    rutas_fuente = [__file__, inspect.getsourcefile(detectar_encabezado), inspect.getsourcefile(limpiar_nit),
+                    inspect.getsourcefile(procesar_archivo)]
+    return calcular_version_codigo(rutas_fuente)
+
+
+def firma_archivo(ruta: str):
+    """
+    Fecha de modificación (ns) y tamaño de un archivo, o None si no existe. Sirve para saber si un
+    archivo se escribió entre dos momentos.
+    """
+    try:
+        estado = os.stat(ruta)
+    except FileNotFoundError:
+        return None
+    return estado.st_mtime_ns, estado.st_size
+
+
+def procesar_con_cache(procesar_archivo, archivo_entrada: str, archivo_salida: str, conteos_esperados: Dict[str, int] | None,
+                       directorio_cache: str, version_limpiador: str) -> Dict[str, int]:
+    """
+    Reutiliza el CSV procesado si la caché tiene una entrada para el mismo contenido de entrada y la
+    misma versión del limpiador; si no, procesa el archivo y guarda el resultado en la caché, solo
+    si el archivo de salida se escribió en esta ejecución.
+
+    Returns:
+        Dict[str, int]: Conteos del archivo procesado
+    """
+    prefijo = os.path.splitext(os.path.basename(archivo_entrada))[0]
+    clave = calcular_clave_cache(archivo_entrada, version_limpiador)
+    encontrado = buscar_en_cache(directorio_cache, prefijo, clave)
+    if encontrado:
+        ruta_cache, metadatos = encontrado
+        shutil.copyfile(ruta_cache, archivo_salida)
+        conteos = {k: metadatos[k] for k in ("total_rows", "puc_5_rows", "puc_6_rows")}
+        print(f"Entrada sin cambios: se reutiliza {ruta_cache}")
+        if conteos_esperados:
+            reportar_validacion_conteos(conteos["total_rows"], conteos["puc_5_rows"], conteos["puc_6_rows"], conteos_esperados)
+        return conteos
+
+    firma_anterior = firma_archivo(archivo_salida)
+    conteos = procesar_archivo(archivo_entrada, archivo_salida, conteos_esperados)
+    # Solo se guarda la salida escrita en esta ejecución: si la escritura falló, el archivo que
+    # quedó es el de una ejecución anterior y no corresponde a esta entrada
+    firma_nueva = firma_archivo(archivo_salida)
+    if conteos and firma_nueva is not None and firma_nueva != firma_anterior:
+        guardar_en_cache(directorio_cache, prefijo, clave, archivo_salida, conteos)
+    elif conteos:
+        print(f"No se escribió {archivo_salida} en esta ejecución: no se guarda en la caché")
+    return conteos
+
 # =============================
 # PROCESAMIENTO DE TODOS LOS ARCHIVOS
 # =============================
-def procesar_todos_los_archivos(directorio_entrada: str, directorio_salida: str) -> None:
+def procesar_todos_los_archivos(directorio_entrada: str, directorio_salida: str, motor: str = MOTOR_POR_DEFECTO,
+                                conteos_esperados: Dict[str, Dict] | None = None, usar_cache: bool = True) -> None:
     """
     Procesa todos los archivos CSV en el directorio de entrada y guarda los resultados en el de salida.
     
     Args:
         directorio_entrada (str): Directorio que contiene archivos CSV de entrada
         directorio_salida (str): Directorio donde se guardarán los archivos CSV de salida
+        motor (str): Motor de procesamiento, "pandas" o "polars"
+        conteos_esperados (Dict[str, Dict] | None): Reglas de validación por archivo; por defecto CONTEOS_ESPERADOS
+            (los datos sintéticos traen las suyas en conteos_esperados.json)
+        usar_cache (bool): Reutilizar los CSV procesados en {directorio_salida}/cache si la entrada y el
+            código de limpieza no cambiaron
 
     Raises:
-        ValueError: Si algún archivo falla en la validación
+        ValueError: Si algún archivo falla en la validación o el motor no es válido
     """
+    procesar_archivo = obtener_procesador_libro_auxiliar(motor)
+    if conteos_esperados is None:
+        conteos_esperados = CONTEOS_ESPERADOS
+    directorio_cache = os.path.join(directorio_salida, DIRECTORIO_CACHE)
+    version_limpiador = calcular_version_limpiador(procesar_archivo) if usar_cache else None
+
     # Asegurar que el directorio de salida exista
     os.makedirs(directorio_salida, exist_ok=True)
 
@@ -412,11 +514,14 @@ def procesar_todos_los_archivos(directorio_entrada: str, directorio_salida: str)
 
         try:
             # Obtener conteos esperados si están disponibles
-            esperado = CONTEOS_ESPERADOS.get(archivo_csv)
+            esperado = conteos_esperados.get(archivo_csv)
             if not esperado:
                 raise ValueError(f"No hay reglas de validación para {archivo_csv}")
 
-            procesar_libro_auxiliar(archivo_entrada, archivo_salida, esperado)
+            if usar_cache:
+                procesar_con_cache(procesar_archivo, archivo_entrada, archivo_salida, esperado, directorio_cache, version_limpiador)
+            else:
+                procesar_archivo(archivo_entrada, archivo_salida, esperado)
             resultados.append({
                 "archivo": archivo_csv,
                 "estado": "✅ Éxito",
@@ -454,16 +559,20 @@ def procesar_todos_los_archivos(directorio_entrada: str, directorio_salida: str)
 # =============================
 # MÉTODO GENERAL PARA LLAMAR TODO
 # =============================
-def limpiar_y_procesar_proveedores(directorio_entrada, directorio_salida, ambiente):
+def limpiar_y_procesar_proveedores(directorio_entrada, directorio_salida, ambiente, motor=MOTOR_POR_DEFECTO, conteos_esperados=None,
+                                   usar_cache=True):
     """
     Método general para limpiar y procesar todos los archivos de proveedores.
     Args:
         directorio_entrada (str): Directorio de entrada con los archivos CSV
         directorio_salida (str): Directorio de salida para los archivos procesados
         ambiente (str): Ambiente de ejecución
+        motor (str): Motor de procesamiento, "pandas" o "polars"
+        conteos_esperados (dict | None): Reglas de validación por archivo; por defecto CONTEOS_ESPERADOS
+        usar_cache (bool): Reutilizar los archivos ya procesados si la entrada y el código no cambiaron
     """
     # Si en el futuro se requiere usar ambiente, se puede pasar a funciones internas
-    procesar_todos_los_archivos(directorio_entrada, directorio_salida)
+    procesar_todos_los_archivos(directorio_entrada, directorio_salida, motor, conteos_esperados, usar_cache)
 
 # =============================
 # MAIN
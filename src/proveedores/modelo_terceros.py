@@ -6,6 +6,7 @@ import sys
 
 from src.utils.mongodb_manager import MongoDBManager
 from src.config.mongodb_config import MongoDBConfig
+from utils.normalizacion import limpiar_campo, limpiar_nit
 
 AMBIENTE = "STAGING"
 
@@ -27,22 +28,6 @@ ruta_archivo = os.path.join('data', 'modelos_terceros', 'Surtiflora-Modelo_de_te
 # =============================
 # Funciones auxiliares de limpieza
 # =============================
-def limpiar_nit(nit_raw: str) -> str:
-    """
-    Limpia el NIT/cédula de caracteres no numéricos y espacios.
-    """
-    return ''.join(filter(str.isdigit, nit_raw or ''))
-
-
-def limpiar_campo(valor: str) -> str:
-    """
-    Limpia el valor de un campo eliminando espacios extra y normalizando.
-    """
-    if valor is None:
-        return ''
-    return valor.strip()
-
-
 # =============================
 # Procesamiento del archivo CSV
 # =============================
@@ -55,6 +40,8 @@ def procesar_csv_terceros(ruta_archivo: str):
     except Exception as e:
         logger.error(f"Error al leer el archivo CSV: {ruta_archivo}: {e}")
         return None, f"Error al leer el archivo CSV: {e}"
+    # Celdas vacías como '' (NaN es verdadero y limpiar_campo lo retornaría sin cambios)
+    df = df.fillna('')
 
     # Identificar columnas relevantes
     columnas = {
@@ -92,11 +79,11 @@ def procesar_csv_terceros(ruta_archivo: str):
         nit = limpiar_nit(nit_raw)
         registro = {
             'nit': nit,
-            'fiscalResponsability': limpiar_campo(row.get(columnas['resp_fiscal'], '')),
-            'activity': limpiar_campo(row.get(columnas['act_economica'], '')),
-            'city': limpiar_campo(row.get(columnas['codigo_ciudad'], '')),
-            'businessName': limpiar_campo(row.get(columnas['razon_social'], '')),
-            'branchOffice': limpiar_campo(row.get(columnas['sucursal'], ''))
+            'fiscalResponsability': limpiar_campo(row.get(columnas['resp_fiscal']) or ''),
+            'activity': limpiar_campo(row.get(columnas['act_economica']) or ''),
+            'city': limpiar_campo(row.get(columnas['codigo_ciudad']) or ''),
+            'businessName': limpiar_campo(row.get(columnas['razon_social']) or ''),
+            'branchOffice': limpiar_campo(row.get(columnas['sucursal']) or '')
         }
         datos.append(registro)
     logger.info(f"Total de registros procesados del CSV: {len(datos)}")
@@ -0,0 +1,351 @@
+import codecs
+import os
+import tempfile
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import pandas as pd
+import polars as pl
+
+from utils.encabezados import detectar_encabezado_archivo, PATRONES_LIBRO_AUXILIAR
+from proveedores.libro_tipado import COLUMNAS_CATEGORICAS, COLUMNAS_NUMERICAS, COLUMNA_FECHA, FORMATO_FECHA, plan_columnas_adicionales
+from proveedores.limpiar_excels_proveedores import (
+    FILA_ENCABEZADO_POR_DEFECTO,
+    limpiar_nombres_columnas,
+    reportar_validacion_conteos,
+)
+
+"""
+Motor Polars para el pipeline del Libro Auxiliar (paso 3 y lectura del paso 4).
+
+Replica con una consulta perezosa de Polars (pl.scan_csv) lo que hacen procesar_libro_auxiliar y
+leer_y_procesar_csvs con pandas: lectura, filtro de densidad, filtro de PUC, extracción
+de NIT y agrupación por NIT. La salida debe ser idéntica byte a byte a la del motor pandas,
+por eso los tipos de cada columna se infieren con las mismas reglas que usa pandas y el CSV
+final se escribe con DataFrame.to_csv.
+
+Polars solo lee UTF-8: los archivos en otra codificación se transcodifican por bloques a un
+temporal en disco antes de escanearlos, de modo que el archivo de entrada nunca se carga
+completo en memoria. Solo se materializan las filas que pasan los filtros.
+"""
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+# Valores que pandas interpreta como nulos por defecto al leer un CSV
+VALORES_NULOS_PANDAS = [
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+    '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'
+]
+PATRON_ENTERO = r'^[+-]?\d+$'
+UMBRAL_DENSIDAD = 0.3
+TAMANO_BLOQUE_TRANSCODIFICACION = 1 << 20
+
+# =============================
+# FUNCIONES AUXILIARES
+# =============================
+@contextmanager
+def _csv_en_utf8(archivo_entrada: str, codificacion: str) -> Iterator[str]:
+    """
+    Ruta del CSV en UTF-8 para Polars: el mismo archivo si ya lo está o, si no, un temporal
+    transcodificado por bloques (se borra al salir del bloque with).
+    """
+    if codecs.lookup(codificacion).name in ('utf-8', 'utf-8-sig'):
+        yield archivo_entrada
+        return
+    descriptor, ruta_temporal = tempfile.mkstemp(suffix='.csv', prefix='libro_utf8_')
+    try:
+        with open(archivo_entrada, encoding=codificacion, newline='') as origen, \
+                open(descriptor, 'w', encoding='utf-8', newline='') as destino:
+            while bloque := origen.read(TAMANO_BLOQUE_TRANSCODIFICACION):
+                destino.write(bloque)
+        yield ruta_temporal
+    finally:
+        os.remove(ruta_temporal)
+
+
+def _escanear_csv_como_texto(ruta_utf8: str, fila_encabezado: int) -> pl.LazyFrame:
+    """
+    Consulta perezosa del CSV con todas las columnas como texto a partir de la fila de encabezado.
+    """
+    return pl.scan_csv(
+        ruta_utf8,
+        has_header=True,
+        skip_rows=fila_encabezado,
+        infer_schema=False,
+        null_values=VALORES_NULOS_PANDAS,
+        truncate_ragged_lines=True,
+    )
+
+
+def _inferir_tipos_pandas(consulta: pl.LazyFrame, columnas: List[str]) -> Dict[str, pl.DataType]:
+    """
+    Infiere el tipo de cada columna con las reglas de pandas: enteros, luego flotantes y si no texto.
+    Las columnas enteras con nulos se leen como float64, igual que en read_csv.
+    """
+    expresiones = []
+    for i, columna in enumerate(columnas):
+        limpia = pl.col(columna).str.strip_chars()
+        expresiones.append(limpia.str.contains(PATRON_ENTERO).fill_null(True).all().alias(f"entero_{i}"))
+        expresiones.append((limpia.cast(pl.Float64, strict=False).is_null() == pl.col(columna).is_null()).all().alias(f"flotante_{i}"))
+        expresiones.append(pl.col(columna).is_not_null().any().alias(f"con_datos_{i}"))
+        expresiones.append(pl.col(columna).is_null().any().alias(f"con_nulos_{i}"))
+    resumen = consulta.select(expresiones).collect().row(0, named=True)
+    tipos = {}
+    for i, columna in enumerate(columnas):
+        if not resumen[f"con_datos_{i}"]:
+            tipos[columna] = pl.Float64
+        elif resumen[f"entero_{i}"] and not resumen[f"con_nulos_{i}"]:
+            tipos[columna] = pl.Int64
+        elif resumen[f"entero_{i}"]:
+            tipos[columna] = pl.Float64
+        elif resumen[f"flotante_{i}"]:
+            tipos[columna] = pl.Float64
+        else:
+            tipos[columna] = pl.String
+    return tipos
+
+
+def _como_texto(columna: str, tipo: pl.DataType) -> pl.Expr:
+    """Equivalente a str(valor) sobre el valor tipado por pandas (None si es nulo)."""
+    if tipo == pl.String:
+        return pl.col(columna)
+    return pl.col(columna).cast(pl.String)
+
+
+def _solo_digitos(expresion: pl.Expr) -> pl.Expr:
+    """Equivalente vectorizado de ''.join(c for c in texto if c.isdigit())."""
+    return expresion.fill_null("").str.replace_all(r'\D', '')
+
+# =============================
+# PROCESAMIENTO PRINCIPAL DE ARCHIVO
+# =============================
+def _filtrar_libro_auxiliar(consulta: pl.LazyFrame, columnas: List[str], archivo_entrada: str) -> pl.DataFrame:
+    """
+    Aplica a la consulta los tipos de pandas, el filtro de densidad, el de PUC y la extracción de
+    NIT y nombre, y materializa solo las filas válidas con las columnas de salida.
+    """
+    columnas_polars = consulta.collect_schema().names()
+    if len(columnas_polars) != len(columnas):
+        raise ValueError(f"Polars detectó {len(columnas_polars)} columnas y pandas {len(columnas)} en {archivo_entrada}")
+    consulta = consulta.rename(dict(zip(columnas_polars, columnas)))
+
+    tipos = _inferir_tipos_pandas(consulta, columnas)
+    consulta = consulta.with_columns([
+        pl.col(columna).str.strip_chars().cast(tipo, strict=False) for columna, tipo in tipos.items() if tipo != pl.String
+    ])
+
+    # Filtro de densidad: proporción de valores no nulos por fila
+    densidad = pl.sum_horizontal([pl.col(c).is_not_null() for c in columnas]) / len(columnas)
+    consulta = consulta.filter(densidad >= UMBRAL_DENSIDAD)
+
+    # Código PUC: str(int(float(valor))) y, si no es numérico, el texto sin espacios
+    col_cuenta = columnas[1]
+    if tipos[col_cuenta] == pl.String:
+        numero = pl.col(col_cuenta).str.strip_chars().cast(pl.Float64, strict=False)
+        codigo_puc = (
+            pl.when(numero.is_finite())
+            .then(numero.cast(pl.Int64, strict=False).cast(pl.String))
+            .otherwise(pl.col(col_cuenta).str.strip_chars())
+        )
+    else:
+        codigo_puc = pl.col(col_cuenta).cast(pl.Float64).cast(pl.Int64, strict=False).cast(pl.String)
+    codigo_puc = codigo_puc.fill_null("")
+
+    # NIT de la columna 4 validado contra la columna 5, nombre de la columna 8
+    nit = _solo_digitos(_como_texto(columnas[3], tipos[columnas[3]]))
+    nit_validacion = _solo_digitos(_como_texto(columnas[4], tipos[columnas[4]]))
+    nit = pl.when(nit_validacion != "").then(nit_validacion).otherwise(nit)
+    nombre = _como_texto(columnas[7], tipos[columnas[7]]).fill_null("").str.strip_chars()
+    descripcion = _como_texto(columnas[2], tipos[columnas[2]]).fill_null("")
+
+    # Columnas de salida en el mismo orden que el diccionario fila_dict del motor pandas
+    salida = {'CUENTA': pl.col('__cuenta'), 'DESCRIPCION': descripcion, 'NIT': pl.col('__nit'), 'NOMBRE': pl.col('__nombre')}
+    for columna in columnas[2:]:
+        salida[columna] = pl.col(columna)
+
+    return (
+        consulta
+        .with_columns(codigo_puc.alias('__cuenta'), nit.alias('__nit'), nombre.alias('__nombre'))
+        .filter(pl.col('__cuenta').str.starts_with('5') | pl.col('__cuenta').str.starts_with('6'))
+        .filter((pl.col('__nit') != "") & (pl.col('__nombre') != ""))
+        .select([expresion.alias(nombre_col) for nombre_col, expresion in salida.items()])
+        .collect()
+    )
+
+
+def procesar_libro_auxiliar_polars(archivo_entrada: str, archivo_salida: str, conteos_esperados: Dict[str, int] | None = None) -> Dict[str, int]:
+    """
+    Procesa un archivo de libro auxiliar con Polars y genera el mismo CSV limpio que procesar_libro_auxiliar.
+
+    Args:
+        archivo_entrada (str): Ruta al archivo CSV de entrada
+        archivo_salida (str): Ruta para guardar el archivo CSV procesado
+        conteos_esperados (Dict[str, int] | None): Diccionario opcional con conteos de filas esperados
+            que contiene claves: "total_rows", "puc_5_rows", "puc_6_rows"
+
+    Returns:
+        Dict[str, int]: Conteos obtenidos con las mismas claves que conteos_esperados
+    """
+    archivo_entrada = os.path.normpath(archivo_entrada)
+    archivo_salida = os.path.normpath(archivo_salida)
+
+    fila_encabezado, _, codificacion = detectar_encabezado_archivo(archivo_entrada, PATRONES_LIBRO_AUXILIAR)
+    if fila_encabezado is None:
+        fila_encabezado = FILA_ENCABEZADO_POR_DEFECTO
+    print(f"[polars] Encabezado en la fila {fila_encabezado}, codificación {codificacion}")
+
+    # Nombres de columnas con las mismas reglas de pandas ("Unnamed: i", duplicados con ".1")
+    columnas = pd.read_csv(archivo_entrada, engine='python', encoding=codificacion, skiprows=fila_encabezado, nrows=0).columns.tolist()
+    with _csv_en_utf8(archivo_entrada, codificacion) as ruta_utf8:
+        resultado = _filtrar_libro_auxiliar(_escanear_csv_como_texto(ruta_utf8, fila_encabezado), columnas, archivo_entrada)
+
+    if resultado.height == 0:
+        raise ValueError("No se pudo procesar ninguna fila válida")
+
+    # Eliminar columnas completamente vacías y pasar a pandas para escribir con el mismo formato
+    resultado = resultado.select([c for c in resultado.columns if resultado.get_column(c).null_count() < resultado.height])
+    marco_datos_final = pd.DataFrame({c: resultado.get_column(c).to_numpy() for c in resultado.columns})
+    marco_datos_final.columns = limpiar_nombres_columnas(marco_datos_final.columns)
+
+    puc_5 = int(marco_datos_final['CUENTA'].str.startswith('5').sum())
+    puc_6 = int(marco_datos_final['CUENTA'].str.startswith('6').sum())
+    total = len(marco_datos_final)
+    print(f"[polars] Comienza con 5: {puc_5} filas, comienza con 6: {puc_6} filas, total: {total}")
+
+    if conteos_esperados:
+        reportar_validacion_conteos(total, puc_5, puc_6, conteos_esperados)
+
+    marco_datos_final.to_csv(archivo_salida, index=False, encoding='utf-8-sig')
+    print(f"[polars] Archivo procesado guardado como {archivo_salida} con {total} filas y {len(marco_datos_final.columns)} columnas.")
+    return {"total_rows": total, "puc_5_rows": puc_5, "puc_6_rows": puc_6}
+
+# =============================
+# LECTURA Y AGRUPACIÓN POR NIT
+# =============================
+def escanear_libro_procesado_polars(ruta_archivo: str) -> pl.LazyFrame:
+    """
+    Escanea un archivo *_Procesado.csv con los mismos tipos que leer_libro_procesado.
+
+    Args:
+        ruta_archivo (str): Ruta al CSV procesado
+
+    Returns:
+        pl.LazyFrame: Consulta perezosa con importes numéricos, FECHA como fecha y texto sin espacios
+    """
+    consulta = pl.scan_csv(ruta_archivo, infer_schema=False, null_values=VALORES_NULOS_PANDAS)
+    columnas = consulta.collect_schema().names()
+    expresiones = []
+    for columna in columnas:
+        if columna in COLUMNAS_NUMERICAS:
+            expresiones.append(
+                pl.col(columna).str.strip_chars().str.replace_all(',', '', literal=True).cast(pl.Float64, strict=False)
+            )
+        elif columna == COLUMNA_FECHA:
+            expresiones.append(pl.col(columna).str.strip_chars().str.strptime(pl.Datetime('ns'), FORMATO_FECHA, strict=False))
+        elif columna in COLUMNAS_CATEGORICAS:
+            expresiones.append(pl.col(columna).str.strip_chars())
+    return consulta.with_columns(expresiones)
+
+
+def agrupar_proveedores_polars(consulta: pl.LazyFrame, archivo: str, columnas_requeridas: List[str],
+                               campos_transaccion: Dict[str, str], registros_fallidos: list, estadisticas: dict) -> list:
+    """
+    Agrupa por NIT un Libro Auxiliar procesado y construye los proveedores igual que leer_y_procesar_csvs.
+
+    Args:
+        consulta (pl.LazyFrame): Resultado de escanear_libro_procesado_polars
+        archivo (str): Nombre del archivo (para los registros fallidos)
+        columnas_requeridas (List[str]): Columnas que no van a campos_adicionales
+        campos_transaccion (Dict[str, str]): Columna del CSV -> campo de la transacción
+        registros_fallidos (list): Lista donde se agregan los registros fallidos
+        estadisticas (dict): Estadísticas que se actualizan (registros_procesados, registros_fallidos)
+
+    Returns:
+        list: Proveedores del archivo ordenados por NIT
+    """
+    columnas = consulta.collect_schema().names()
+    esquema = consulta.collect_schema()
+    plan_adicionales = plan_columnas_adicionales(columnas, columnas_requeridas)
+
+    # Texto sin espacios y cadenas vacías como nulos (equivale a limpiar_campo + "if valor")
+    consulta = (
+        consulta
+        .with_row_index('__fila')
+        .filter(pl.col('NIT').is_not_null())
+        .with_columns([
+            pl.when(pl.col(c).str.strip_chars() != "").then(pl.col(c).str.strip_chars()).alias(c)
+            for c in columnas if esquema[c] == pl.String and c != 'NIT'
+        ])
+    )
+    fila_valida = pl.col('CUENTA').is_not_null() & pl.col('NOMBRE').is_not_null()
+    marco = consulta.with_columns(fila_valida.alias('__valida')).collect()
+    estadisticas["registros_procesados"] += marco.height
+
+    # Grupos con NIT vacío
+    for grupo in marco.filter(pl.col('NIT') == "").group_by('NIT').len().iter_rows(named=True):
+        registros_fallidos.append({"archivo": archivo, "nit": "N/A", "error": "NIT nulo o inválido"})
+        estadisticas["registros_fallidos"] += grupo['len']
+    marco = marco.filter(pl.col('NIT') != "")
+
+    # Filas sin CUENTA o NOMBRE
+    for fila in marco.filter(~pl.col('__valida')).sort('NIT', '__fila').iter_rows(named=True):
+        registros_fallidos.append({
+            "archivo": archivo, "fila": fila['__fila'] + 2, "cuenta": fila['CUENTA'], "nit": fila['NIT'], "nombre": fila['NOMBRE'],
+            "error": "Campos indispensables (CUENTA, NIT, NOMBRE) faltantes"
+        })
+        estadisticas["registros_fallidos"] += 1
+
+    campos = {original: destino for original, destino in campos_transaccion.items() if original in columnas}
+    agregado = (
+        marco.lazy()
+        .filter(pl.col('__valida'))
+        .group_by('NIT', maintain_order=True)
+        .agg(
+            pl.col('CUENTA').unique(maintain_order=True).alias('__cuentas'),
+            pl.col('DESCRIPCION').drop_nulls().first().alias('__descripcion'),
+            pl.col('NOMBRE').drop_nulls().first().alias('__nombre'),
+            pl.col('FECHA').drop_nulls().first().alias('__fecha'),
+            pl.col('SALDO ACUMULADO').drop_nulls().first().alias('__saldo'),
+            *[pl.col(extra.columna).drop_nulls().last().alias(f'__extra_{i}') for i, extra in enumerate(plan_adicionales)],
+            pl.struct([pl.col(c).alias(destino) for c, destino in campos.items()]).alias('__transacciones'),
+        )
+        .sort('NIT')
+        .collect()
+    )
+
+    # Posiciones de cada columna del agregado, resueltas una vez (las filas se leen como tuplas)
+    posicion = {nombre: i for i, nombre in enumerate(agregado.columns)}
+    (p_nit, p_cuentas, p_descripcion, p_nombre, p_fecha, p_saldo, p_transacciones) = (
+        posicion[c] for c in ('NIT', '__cuentas', '__descripcion', '__nombre', '__fecha', '__saldo', '__transacciones')
+    )
+    extras = [(posicion[f'__extra_{i}'], extra.campo) for i, extra in enumerate(plan_adicionales)]
+    proveedores = []
+    for fila in agregado.iter_rows():
+        nit = fila[p_nit]
+        if len(nit) == 9 and nit[0] in ['8', '9']:
+            tipo, tipoid = 'Company', '31'
+        else:
+            tipo, tipoid = 'Person', '13'
+        campos_adicionales = {}
+        for posicion_extra, nombre_campo_db in extras:
+            if fila[posicion_extra] is not None:
+                campos_adicionales[nombre_campo_db] = fila[posicion_extra]
+        transacciones = []
+        for registro in fila[p_transacciones]:
+            transaccion = {campo: valor for campo, valor in registro.items() if valor is not None}
+            if transaccion:
+                transacciones.append(transaccion)
+        proveedores.append({
+            "nit": nit,
+            "descripcion": fila[p_descripcion],
+            "name": fila[p_nombre],
+            "cuentas": fila[p_cuentas],
+            "tipo": tipo,
+            "tipoid": tipoid,
+            "saldo_acumulado": fila[p_saldo],
+            "campos_adicionales": campos_adicionales,
+            "transacciones": transacciones,
+            "fecha_csv": fila[p_fecha]
+        })
+    return proveedores
@@ -1,20 +1,39 @@
 """
 Script para subir proveedores y transacciones a MongoDB..
+
+Tipos de los valores guardados (desde que los CSV se leen tipados con libro_tipado):
+- debitos, creditos y saldo_acumulado de cada transacción, y saldo_acumulado del proveedor, son
+  números (float) en lugar de la cadena del CSV ("4,846,894.00" -> 4846894.0).
+- fecha de cada transacción y fecha_csv del proveedor son fechas de BSON (datetime) en lugar de
+  cadenas "dd/mm/aaaa".
+- El resto de campos se guarda como antes: cadenas sin espacios en los extremos.
+Quien lea estas colecciones debe esperar esos tipos; los documentos cargados antes del cambio
+conservan las cadenas.
 """
 
 import os
+import re
+import heapq
+import itertools
+import pickle
+import queue
+import tempfile
+import threading
+import zlib
+import numpy as np
 import pandas as pd
-from pymongo import MongoClient
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
 from bson.objectid import ObjectId
 from config.mongodb_config import MongoDBConfig
 from utils.mongodb_manager import MongoDBManager
+from utils.normalizacion import limpiar_campo
+from proveedores.libro_tipado import leer_libro_procesado, plan_columnas_adicionales
 from dotenv import load_dotenv
 import logging
 from urllib.parse import quote_plus
 import datetime
 import json
-import random
-import string
 
 # =============================
 # CONFIGURACIÓN Y CONSTANTES
@@ -51,99 +70,195 @@ CARPETA_CSV = os.path.join(".", "results")
 CSV_FALLIDOS = "fallidos.csv"
 JSON_REPORTE = "reporte_onboarding.json"
 
-def generar_id_proveedor(cadena_fecha_entrada, base_para_unicidad_cadena=""):
+COLUMNAS_REQUERIDAS = ['CUENTA', 'DESCRIPCION', 'NIT', 'NOMBRE', 'FECHA', 'DIG.VER.', 'CENTRO COSTO', 'SALDO ACUMULADO']
+CAMPOS_TRANSACCION = {
+    'COMPROBANTE': 'comprobante',
+    'FECHA': 'fecha',
+    'DETALLE': 'detalle',
+    'DEBITOS': 'debitos',
+    'CREDITOS': 'creditos',
+    'SALDO ACUMULADO': 'saldo_acumulado',
+    'INV-CRUC-BASE': 'inv_cruc_base',
+    'CENTRO COSTO': 'centro_costo'
+}
+MOTOR_POR_DEFECTO = "pandas"
+TAMANO_LOTE_MONGO = 1000
+ESCRITORES_MONGO = 2
+PROFUNDIDAD_COLA = 2 * TAMANO_LOTE_MONGO
+FIN_DE_COLA = object()
+# Almacenamiento de transacciones: "embebido" (lista en el proveedor) o "buckets" (colección aparte)
+ALMACENAMIENTOS_TRANSACCIONES = ("embebido", "buckets")
+ALMACENAMIENTO_POR_DEFECTO = "embebido"
+COLECCION_TRANSACCIONES = "provider_transactions"
+TAMANO_BUCKET = 500
+# Los números dentro del COMPROBANTE se rellenan con ceros a este ancho para que "10" > "9"
+# también al comparar cadenas (en Python y en el $max de MongoDB)
+ANCHO_NUMERO_COMPROBANTE = 20
+PATRON_NUMERO = re.compile(r'\d+')
+
+def valor_limpio(valor):
+    """Cadena sin espacios, o None si el valor es nulo o queda vacío."""
+    if isinstance(valor, str):
+        return valor.strip() or None
+    return None if pd.isna(valor) else valor
+
+def valores_limpios(serie):
     """
-    Genera un ID único para el proveedor basado en la fecha y un sufijo aleatorio.
+    Convierte una columna en un arreglo de objetos Python listo para MongoDB: cadenas sin espacios
+    y None para los valores nulos o vacíos (numéricos y fechas se conservan si no son nulos).
     Args:
-        cadena_fecha_entrada (str): Fecha de la transacción o del archivo.
-        base_para_unicidad_cadena (str): Cadena base para unicidad (opcional).
+        serie (pd.Series): Columna del DataFrame.
     Returns:
-        str: ID generado.
+        np.ndarray: Arreglo de tipo object.
     """
-    fecha_formateada_yyyymmdd = datetime.datetime.now(datetime.timezone.utc).strftime("%Y%m%d")
-    if cadena_fecha_entrada and isinstance(cadena_fecha_entrada, str):
-        fecha_parseada = None
-        try:
-            fecha_parseada = datetime.datetime.strptime(cadena_fecha_entrada, '%d/%m/%Y')
-        except ValueError:
-            try:
-                fecha_parseada = pd.to_datetime(cadena_fecha_entrada, errors='coerce')
-                if pd.isna(fecha_parseada):
-                    fecha_parseada = None
-            except Exception:
-                pass
-        if fecha_parseada:
-            fecha_formateada_yyyymmdd = fecha_parseada.strftime('%Y%m%d')
-        else:
-            logger.warning(f"No se pudo parsear la fecha '{cadena_fecha_entrada}' para el ID. Usando fecha actual.")
+    if pd.api.types.is_numeric_dtype(serie) or pd.api.types.is_datetime64_any_dtype(serie):
+        presentes = serie.notna().to_numpy()
+        valores = serie.astype(object).to_numpy()
+    elif isinstance(serie.dtype, pd.CategoricalDtype):
+        # Se limpian solo las categorías (pocas) y se expanden con los códigos
+        categorias = np.array([valor_limpio(c) for c in serie.cat.categories] + [None], dtype=object)
+        codigos = serie.cat.codes.to_numpy()
+        return categorias[np.where(codigos < 0, len(categorias) - 1, codigos)]
     else:
-        logger.info(f"Fecha no proporcionada o inválida para el ID. Usando fecha actual.")
+        return np.array([valor_limpio(v) for v in serie.to_numpy(dtype=object)], dtype=object)
+    return np.where(presentes, valores, None)
 
-    sufijo_aleatorio = ''.join(random.choices(string.ascii_lowercase + string.digits, k=8))
-    id_final = f"{fecha_formateada_yyyymmdd}_{sufijo_aleatorio}"
-    return id_final
+def _primero_por_grupo(valores, grupos, ultimo=False):
+    """Primer (o último) valor no nulo de cada grupo; None si el grupo no tiene ninguno."""
+    agrupado = pd.Series(valores, dtype=object).groupby(grupos, sort=False)
+    resultado = agrupado.last() if ultimo else agrupado.first()
+    return [valor if valor is not None and not pd.isna(valor) else None for valor in resultado.to_numpy()]
 
-def limpiar_campo(valor):
+def agrupar_proveedores(marco_datos, archivo, columnas_requeridas, campos_transaccion, registros_fallidos, estadisticas):
     """
-    Limpia un campo eliminando espacios en blanco.
+    Agrupa por NIT un Libro Auxiliar tipado y construye los proveedores con operaciones por columna.
+    Por cada NIT se obtienen las cuentas únicas en orden de aparición, la primera descripción, nombre,
+    fecha y saldo no nulos, el último valor no vacío de cada columna adicional y las transacciones.
+    Las filas sin CUENTA o NOMBRE se registran como fallidas.
     Args:
-        valor: Valor a limpiar.
+        marco_datos (pd.DataFrame): Libro Auxiliar leído con leer_libro_procesado.
+        archivo (str): Nombre del archivo (para los registros).
+        columnas_requeridas (list): Columnas que no se copian a campos_adicionales.
+        campos_transaccion (dict): Mapa columna del CSV -> campo de la transacción.
+        registros_fallidos (list): Lista donde se agregan los registros fallidos.
+        estadisticas (dict): Estadísticas del proceso (se actualizan).
     Returns:
-        Valor limpio.
+        list: Proveedores del archivo, ordenados por NIT.
     """
-    if isinstance(valor, str):
-        return valor.strip()
-    return valor
+    # Igual que groupby('NIT'): se descartan los NIT nulos y los grupos quedan ordenados por NIT
+    marco = marco_datos[marco_datos['NIT'].notna()]
+    estadisticas["registros_procesados"] += len(marco)
+    nits = marco['NIT'].astype(str).to_numpy(dtype=object)
+    orden = np.argsort(nits, kind='stable')
+    marco = marco.iloc[orden]
+    nits = nits[orden]
+
+    sin_nit = nits == ''
+    if sin_nit.any():
+        logger.warning(f"Grupo con NIT nulo en {archivo}.")
+        registros_fallidos.append({"archivo": archivo, "nit": "N/A", "error": "NIT nulo o inválido"})
+        estadisticas["registros_fallidos"] += int(sin_nit.sum())
+        marco = marco[~sin_nit]
+        nits = nits[~sin_nit]
+    if len(marco) == 0:
+        return []
+
+    # Cada columna se limpia una sola vez aunque se use en varios campos
+    limpios = {}
+    def columna_limpia(nombre_columna):
+        if nombre_columna not in limpios:
+            limpios[nombre_columna] = valores_limpios(marco[nombre_columna])
+        return limpios[nombre_columna]
+
+    filas = marco.index.to_numpy()
+    cuentas = columna_limpia('CUENTA')
+    nombres = columna_limpia('NOMBRE')
+    validas = pd.notna(cuentas) & pd.notna(nombres)
+    for posicion in np.flatnonzero(~validas):
+        idx = int(filas[posicion])
+        cuenta = marco['CUENTA'].iloc[posicion]
+        nombre = marco['NOMBRE'].iloc[posicion]
+        logger.warning(f"Fila {idx+2} en {archivo} no tiene CUENTA, NIT o NOMBRE indispensables.")
+        registros_fallidos.append({
+            "archivo": archivo, "fila": idx + 2,
+            "cuenta": limpiar_campo(cuenta) if pd.notna(cuenta) else None,
+            "nit": nits[posicion],
+            "nombre": limpiar_campo(nombre) if pd.notna(nombre) else None,
+            "error": "Campos indispensables (CUENTA, NIT, NOMBRE) faltantes"
+        })
+    estadisticas["registros_fallidos"] += int((~validas).sum())
+
+    # Grupos contiguos (las filas ya están ordenadas por NIT)
+    inicios = np.flatnonzero(np.r_[True, nits[1:] != nits[:-1]])
+    nits_grupo = nits[inicios]
+    grupos = np.repeat(np.arange(len(inicios)), np.diff(np.r_[inicios, len(nits)]))
+
+    def solo_validas(valores):
+        return np.where(validas, valores, None)
+
+    descripciones = _primero_por_grupo(solo_validas(columna_limpia('DESCRIPCION')), grupos)
+    nombres_grupo = _primero_por_grupo(solo_validas(nombres), grupos)
+    fechas = _primero_por_grupo(solo_validas(columna_limpia('FECHA')), grupos)
+    saldos = _primero_por_grupo(solo_validas(columna_limpia('SALDO ACUMULADO')), grupos)
+
+    # Cuentas únicas en orden de aparición
+    cuentas_validas = pd.DataFrame({'grupo': grupos[validas], 'cuenta': cuentas[validas]}).drop_duplicates()
+    grupos_cuentas = cuentas_validas['grupo'].to_numpy()
+    limites_cuentas = np.searchsorted(grupos_cuentas, np.arange(len(inicios) + 1))
+    lista_cuentas = cuentas_validas['cuenta'].tolist()
+
+    # Columnas adicionales: último valor no vacío y orden de aparición del campo dentro del grupo
+    posiciones = np.arange(len(marco))
+    adicionales = []
+    for orden_columna, columna, nombre_campo in plan_columnas_adicionales(marco.columns, columnas_requeridas):
+        valores = solo_validas(columna_limpia(columna))
+        primera_aparicion = pd.Series(np.where(pd.notna(valores), posiciones, len(posiciones))).groupby(grupos).min().to_numpy()
+        adicionales.append((nombre_campo, orden_columna, _primero_por_grupo(valores, grupos, ultimo=True), primera_aparicion))
+
+    # Transacciones construidas desde los arreglos de columnas, solo con las filas válidas
+    campos = [(campo_mongodb, columna_limpia(campo_original)[validas])
+              for campo_original, campo_mongodb in campos_transaccion.items() if campo_original in marco.columns]
+    nombres_campos = [campo for campo, _ in campos]
+    transacciones_filas = [
+        {campo: valor for campo, valor in zip(nombres_campos, fila) if valor is not None}
+        for fila in zip(*(valores for _, valores in campos))
+    ] if campos else [{} for _ in range(int(validas.sum()))]
+    limites_transacciones = np.r_[0, np.cumsum(np.bincount(grupos[validas], minlength=len(inicios)))]
 
-def limpiar_nit(nit):
-    """
-    Limpia el NIT dejando solo los dígitos.
-    Args:
-        nit (str): NIT a limpiar.
-    Returns:
-        str: NIT limpio.
-    """
-    if isinstance(nit, str):
-        return ''.join(filter(str.isdigit, nit))
-    return nit
-
-def extraer_datos_transaccion(fila):
-    """
-    Extrae los datos de transacción relevantes de una fila del DataFrame.
-    Args:
-        fila (pd.Series): Fila del DataFrame.
-    Returns:
-        dict: Diccionario con los datos de la transacción.
-    """
-    transaccion = {}
-    campos_transaccion = {
-        'COMPROBANTE': 'comprobante',
-        'FECHA': 'fecha',
-        'DETALLE': 'detalle',
-        'DEBITOS': 'debitos',
-        'CREDITOS': 'creditos',
-        'SALDO ACUMULADO': 'saldo_acumulado',
-        'INV-CRUC-BASE': 'inv_cruc_base',
-        'CENTRO COSTO': 'centro_costo'
-    }
-    for campo_original, campo_mongodb in campos_transaccion.items():
-        if campo_original in fila and pd.notna(fila[campo_original]) and str(fila[campo_original]).strip():
-            transaccion[campo_mongodb] = limpiar_campo(fila[campo_original])
-    return transaccion if transaccion else None
+    proveedores = []
+    for g, nit in enumerate(nits_grupo):
+        if len(nit) == 9 and nit[0] in ['8', '9']:
+            tipo, tipoid = 'Company', '31'
+        else:
+            tipo, tipoid = 'Person', '13'
+        campos_presentes = sorted(
+            (primera[g], orden_columna, nombre_campo, valores[g])
+            for nombre_campo, orden_columna, valores, primera in adicionales if valores[g] is not None
+        )
+        transacciones = [t for t in transacciones_filas[limites_transacciones[g]:limites_transacciones[g + 1]] if t]
+        proveedores.append({
+            "nit": nit,
+            "descripcion": descripciones[g],
+            "name": nombres_grupo[g],
+            "cuentas": lista_cuentas[limites_cuentas[g]:limites_cuentas[g + 1]],  # Lista de códigos PUC
+            "tipo": tipo,
+            "tipoid": tipoid,
+            "saldo_acumulado": saldos[g],
+            "campos_adicionales": {nombre_campo: valor for _, _, nombre_campo, valor in campos_presentes},
+            "transacciones": transacciones,
+            "fecha_csv": fechas[g]
+        })
+    return proveedores
 
 # =============================
 # PROCESAMIENTO DE ARCHIVOS CSV
 # =============================
 
-def leer_y_procesar_csvs():
+def nuevas_estadisticas_csv():
     """
-    Lee los archivos CSV procesados y retorna una lista de proveedores y transacciones.
-    Returns:
-        tuple: (proveedores, registros_fallidos, estadisticas)
+    Crea el diccionario de estadísticas de la lectura de los CSV procesados.
     """
-    proveedores = []
-    registros_fallidos = []
-    estadisticas = {
+    return {
         "fecha_proceso": datetime.datetime.now(datetime.timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
         "archivos_procesados": 0,
         "registros_procesados": 0,
@@ -151,119 +266,44 @@ def leer_y_procesar_csvs():
         "errores": []
     }
 
-    archivos = [f for f in os.listdir(CARPETA_CSV) if f.endswith('_Procesado.csv')]
+
+def _proveedores_por_archivo(registros_fallidos, estadisticas, motor, carpeta_csv):
+    """
+    Lee los archivos CSV procesados uno a uno (en orden de nombre) y entrega la lista de
+    proveedores de cada uno, ordenada por NIT.
+    """
+    if motor not in ("pandas", "polars"):
+        raise ValueError(f"Motor no válido: {motor}. Opciones: pandas, polars")
+    if motor == "polars":
+        # Importación diferida: polars solo es necesario con este motor
+        from proveedores.motor_polars import escanear_libro_procesado_polars, agrupar_proveedores_polars
+
+    archivos = sorted(f for f in os.listdir(carpeta_csv) if f.endswith('_Procesado.csv'))
     for archivo in archivos:
-        registros_unicos_por_archivo = set()
-        ruta_archivo = os.path.join(CARPETA_CSV, archivo)
+        ruta_archivo = os.path.join(carpeta_csv, archivo)
         logger.info(f"Procesando archivo: {ruta_archivo}")
         try:
-            marco_datos = pd.read_csv(ruta_archivo, encoding='utf-8', low_memory=False, dtype=str)
+            # Columnas repetidas como categóricas, importes numéricos y FECHA como datetime64
+            if motor == "polars":
+                marco_datos = escanear_libro_procesado_polars(ruta_archivo)
+                columnas_archivo = marco_datos.collect_schema().names()
+            else:
+                marco_datos = leer_libro_procesado(ruta_archivo)
+                columnas_archivo = marco_datos.columns
             estadisticas["archivos_procesados"] += 1
 
-            columnas_requeridas = ['CUENTA', 'DESCRIPCION', 'NIT', 'NOMBRE', 'FECHA', 'DIG.VER.', 'CENTRO COSTO', 'SALDO ACUMULADO']
-            columnas_faltantes = [col for col in columnas_requeridas if col not in marco_datos.columns]
+            columnas_requeridas = COLUMNAS_REQUERIDAS
+            columnas_faltantes = [col for col in columnas_requeridas if col not in columnas_archivo]
             if columnas_faltantes:
                 mensaje_error = f"Archivo {archivo} no tiene las columnas requeridas: {', '.join(columnas_faltantes)}"
                 logger.error(mensaje_error)
                 estadisticas["errores"].append(mensaje_error)
                 continue
 
-            # Agrupar por NIT para recolectar múltiples códigos PUC
-            for nit, grupo in marco_datos.groupby('NIT'):
-                estadisticas["registros_procesados"] += len(grupo)
-                try:
-                    if pd.isna(nit) or not nit:
-                        logger.warning(f"Grupo con NIT nulo en {archivo}.")
-                        registros_fallidos.append({
-                            "archivo": archivo, "nit": "N/A", "error": "NIT nulo o inválido"
-                        })
-                        estadisticas["registros_fallidos"] += len(grupo)
-                        continue
-
-                    cuentas = []
-                    transacciones = []
-                    descripcion = None
-                    nombre = None
-                    fecha_csv = None
-                    saldo_acumulado = None
-                    tipo = None
-                    tipoid = None
-                    campos_adicionales = {}
-
-                    for idx, fila in grupo.iterrows():
-                        cuenta = limpiar_campo(fila.get('CUENTA'))
-                        descripcion_temp = limpiar_campo(fila.get('DESCRIPCION'))
-                        nombre_temp = limpiar_campo(fila.get('NOMBRE'))
-                        fecha_csv_temp = limpiar_campo(fila.get('FECHA'))
-                        centro_costo = limpiar_campo(fila.iloc[12]) if pd.notna(fila.iloc[12]) else ""
-                        saldo_acumulado_temp = limpiar_campo(fila.get('SALDO ACUMULADO')) if pd.notna(fila.get('SALDO ACUMULADO')) else ""
-
-                        if isinstance(nit, str) and len(nit) == 9 and (nit[0] in ['8', '9']):
-                            tipo = 'Company'
-                            tipoid = '31'
-                        else:
-                            tipo = 'Person'
-                            tipoid = '13'
-
-                        if not cuenta or not nit or not nombre_temp:
-                            logger.warning(f"Fila {idx+2} en {archivo} no tiene CUENTA, NIT o NOMBRE indispensables.")
-                            registros_fallidos.append({
-                                "archivo": archivo, "fila": idx + 2, "cuenta": cuenta, "nit": nit, "nombre": nombre_temp,
-                                "error": "Campos indispensables (CUENTA, NIT, NOMBRE) faltantes"
-                            })
-                            estadisticas["registros_fallidos"] += 1
-                            continue
-
-                        # Verificar duplicados por fila
-                        clave_registro_entrada = f"{archivo}_{idx}"
-                        if clave_registro_entrada in registros_unicos_por_archivo:
-                            logger.info(f"Registro duplicado en archivo {archivo}, fila {idx+2} - Omitiendo")
-                            continue
-                        registros_unicos_por_archivo.add(clave_registro_entrada)
-
-                        if cuenta not in cuentas:
-                            cuentas.append(cuenta)
-                        if not descripcion:
-                            descripcion = descripcion_temp
-                        if not nombre:
-                            nombre = nombre_temp
-                        if not fecha_csv:
-                            fecha_csv = fecha_csv_temp
-                        if not saldo_acumulado:
-                            saldo_acumulado = saldo_acumulado_temp
-
-                        for campo_col_original in marco_datos.columns:
-                            if campo_col_original not in columnas_requeridas and pd.notna(fila[campo_col_original]):
-                                valor = limpiar_campo(fila[campo_col_original])
-                                if valor or isinstance(valor, (int, float)):
-                                    nombre_campo_db = campo_col_original.replace(' ', '_').replace('.', '_').replace('-', '_').lower()
-                                    campos_adicionales[nombre_campo_db] = valor
-
-                        transaccion = extraer_datos_transaccion(fila)
-                        if transaccion:
-                            transacciones.append(transaccion)
-
-                    proveedor = {
-                        "nit": nit,
-                        "descripcion": descripcion,
-                        "name": nombre,
-                        "cuentas": cuentas,  # Lista de códigos PUC
-                        "tipo": tipo,
-                        "tipoid": tipoid,
-                        "saldo_acumulado": saldo_acumulado,
-                        "campos_adicionales": campos_adicionales,
-                        "transacciones": transacciones,
-                        "fecha_csv": fecha_csv
-                    }
-                    proveedores.append(proveedor)
-                except Exception as error_fila:
-                    mensaje_error = f"Error al procesar grupo con NIT {nit} en archivo {archivo}: {str(error_fila)}"
-                    logger.error(mensaje_error, exc_info=True)
-                    registros_fallidos.append({
-                        "archivo": archivo, "nit": nit, "error": str(error_fila)
-                    })
-                    estadisticas["registros_fallidos"] += len(grupo)
-                    continue
+            agrupar = agrupar_proveedores_polars if motor == "polars" else agrupar_proveedores
+            proveedores_archivo = agrupar(
+                marco_datos, archivo, columnas_requeridas, CAMPOS_TRANSACCION, registros_fallidos, estadisticas
+            )
         except pd.errors.EmptyDataError:
             mensaje_error = f"Archivo {archivo} está vacío o no es un CSV válido."
             logger.warning(mensaje_error)
@@ -274,152 +314,609 @@ def leer_y_procesar_csvs():
             logger.error(mensaje_error, exc_info=True)
             estadisticas["errores"].append(mensaje_error)
             continue
+        del marco_datos
+        yield proveedores_archivo
 
+
+def fusionar_proveedor(entradas):
+    """
+    Combina las entradas de un mismo NIT provenientes de varios archivos (en orden de archivo)
+    con el mismo resultado que aplicar sus upserts uno tras otro: los campos simples toman el
+    valor del último archivo (también el PUC por defecto), las cuentas se unen sin repetir y las
+    transacciones se concatenan.
+    Args:
+        entradas (list): Proveedores con el mismo NIT.
+    Returns:
+        dict: Proveedor consolidado.
+    """
+    if len(entradas) == 1:
+        return entradas[0]
+    fusionado = dict(entradas[-1])
+    fusionado["cuentas"] = list(dict.fromkeys(cuenta for entrada in entradas for cuenta in entrada["cuentas"]))
+    fusionado["cuenta_por_defecto"] = entradas[-1]["cuentas"][0] if entradas[-1]["cuentas"] else None
+    fusionado["transacciones"] = [t for entrada in entradas for t in entrada["transacciones"]]
+    fusionado["campos_adicionales"] = {}
+    for entrada in entradas:
+        fusionado["campos_adicionales"].update(entrada["campos_adicionales"])
+    fusionado["fecha_csv"] = entradas[0]["fecha_csv"]
+    return fusionado
+
+
+def _volcar_a_disco(proveedores, directorio, numero):
+    ruta = os.path.join(directorio, f"{numero:04d}.pkl")
+    with open(ruta, 'wb') as archivo:
+        for proveedor in proveedores:
+            pickle.dump(proveedor, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+    return ruta
+
+
+def _leer_de_disco(ruta):
+    with open(ruta, 'rb') as archivo:
+        while True:
+            try:
+                yield pickle.load(archivo)
+            except EOFError:
+                return
+
+
+def fusionar_proveedores_por_nit(listas_por_archivo, en_disco=True):
+    """
+    Fusiona por NIT los proveedores de varios archivos para que cada uno se escriba una sola vez.
+    Cada lista se ordena por NIT y se hace una mezcla ordenada (heapq.merge) entre archivos. La
+    mezcla necesita todos los archivos, así que el primer proveedor sale después de leer el último.
+    Con en_disco=True (por defecto) cada lista se guarda en un temporal en cuanto se lee, de modo
+    que en memoria solo queda un archivo a la vez más el proveedor en curso de cada uno; con
+    en_disco=False las listas de todos los archivos quedan en memoria hasta el final.
+    Args:
+        listas_por_archivo (Iterable[list]): Proveedores de cada archivo, en orden de archivo.
+        en_disco (bool): Usar archivos temporales en lugar de mantener las listas en memoria.
+    Yields:
+        dict: Proveedor consolidado, en orden de NIT.
+    """
+    def por_nit(proveedor):
+        return proveedor["nit"]
+
+    with tempfile.TemporaryDirectory(prefix="proveedores_") as directorio:
+        fuentes = []
+        for numero, proveedores in enumerate(listas_por_archivo):
+            # En el mismo lugar: no se duplica la lista del archivo (suele venir ya ordenada)
+            proveedores.sort(key=por_nit)
+            fuentes.append(_leer_de_disco(_volcar_a_disco(proveedores, directorio, numero)) if en_disco else proveedores)
+            del proveedores
+        # heapq.merge es estable: a igual NIT conserva el orden de los archivos
+        for _, entradas in itertools.groupby(heapq.merge(*fuentes, key=por_nit), key=por_nit):
+            yield fusionar_proveedor(list(entradas))
+
+
+def iterar_proveedores(registros_fallidos, estadisticas, motor=MOTOR_POR_DEFECTO, carpeta_csv=CARPETA_CSV,
+                       fusionar=True, en_disco=True):
+    """
+    Lee los archivos CSV procesados y entrega sus proveedores.
+    - fusionar=True (por defecto): un NIT presente en varios archivos se entrega una sola vez con
+      sus cuentas y transacciones consolidadas. Se leen todos los archivos antes de entregar el
+      primer proveedor (ver fusionar_proveedores_por_nit).
+    - fusionar=False: los proveedores se entregan por archivo a medida que se agrupan, así quien
+      los consume (p. ej. subir_proveedores_en_flujo) trabaja mientras se leen los siguientes.
+    Args:
+        registros_fallidos (list): Lista donde se agregan los registros fallidos.
+        estadisticas (dict): Estadísticas del proceso (ver nuevas_estadisticas_csv), se actualizan.
+        motor (str): Motor de procesamiento, "pandas" o "polars".
+        carpeta_csv (str): Carpeta con los archivos *_Procesado.csv.
+        fusionar (bool): Fusionar por NIT entre archivos.
+        en_disco (bool): En la fusión, guardar cada archivo en un temporal en cuanto se lee en lugar
+            de mantenerlos todos en memoria.
+    Yields:
+        dict: Proveedor con sus cuentas y transacciones.
+    """
+    por_archivo = _proveedores_por_archivo(registros_fallidos, estadisticas, motor, carpeta_csv)
+    if not fusionar:
+        for proveedores_archivo in por_archivo:
+            yield from proveedores_archivo
+        return
+    yield from fusionar_proveedores_por_nit(por_archivo, en_disco)
+
+
+def leer_y_procesar_csvs(motor=MOTOR_POR_DEFECTO, carpeta_csv=CARPETA_CSV, fusionar=True):
+    """
+    Lee los archivos CSV procesados y retorna una lista de proveedores y transacciones.
+    Args:
+        motor (str): Motor de procesamiento, "pandas" o "polars".
+        carpeta_csv (str): Carpeta con los archivos *_Procesado.csv.
+        fusionar (bool): Un solo proveedor por NIT aunque aparezca en varios archivos.
+    Returns:
+        tuple: (proveedores, registros_fallidos, estadisticas)
+    """
+    registros_fallidos = []
+    estadisticas = nuevas_estadisticas_csv()
+    # El resultado queda completo en memoria de todos modos: la fusión no necesita temporales
+    proveedores = list(iterar_proveedores(registros_fallidos, estadisticas, motor, carpeta_csv, fusionar, en_disco=False))
     return proveedores, registros_fallidos, estadisticas
 
+# =============================
+# SINCRONIZACIÓN INCREMENTAL
+# =============================
+
+def normalizar_comprobante(comprobante):
+    """
+    Forma ordenable de un COMPROBANTE: cada número se rellena con ceros a ANCHO_NUMERO_COMPROBANTE
+    dígitos (con ancho 4 sería "9" -> "0009" y "FV-10" -> "FV-0010"), así el orden de cadenas es el
+    numérico.
+    Es idempotente, por lo que también sirve para las marcas de agua ya guardadas.
+    """
+    return PATRON_NUMERO.sub(lambda numero: numero.group().zfill(ANCHO_NUMERO_COMPROBANTE), str(comprobante or "").strip())
+
+
+def clave_transaccion(transaccion):
+    """
+    Clave de orden de una transacción para la marca de agua: (FECHA, COMPROBANTE normalizado).
+    Retorna None si la transacción no tiene fecha.
+    """
+    fecha = transaccion.get("fecha")
+    if not isinstance(fecha, datetime.datetime):
+        return None
+    return fecha, normalizar_comprobante(transaccion.get("comprobante"))
+
+
+def calcular_marca_de_agua(transacciones):
+    """
+    Calcula la marca de agua (última FECHA y COMPROBANTE) de una lista de transacciones.
+    Args:
+        transacciones (list): Transacciones del proveedor.
+    Returns:
+        dict | None: {"fecha", "comprobante"} de la mayor clave (comprobante normalizado), o None si
+            ninguna tiene fecha.
+    """
+    claves = [clave for clave in map(clave_transaccion, transacciones) if clave is not None]
+    if not claves:
+        return None
+    fecha, comprobante = max(claves)
+    return {"fecha": fecha, "comprobante": comprobante}
+
+
+def cargar_marcas_de_agua(config, uid):
+    """
+    Lee de MongoDB, para cada NIT del UID, su marca de agua y los PUC ya asociados.
+    Args:
+        config: Configuración de MongoDB.
+        uid (ObjectId): UID del cliente/proyecto.
+    Returns:
+        dict: NIT -> {"marca": (fecha, comprobante) | None, "cuentas": set}
+    """
+    db_manager = MongoDBManager(config)
+    try:
+        cursor = db_manager.collection.find({"UID": uid}, {"id": 1, "PUC": 1, "marca_sincronizacion": 1, "_id": 0})
+        marcas = {}
+        for doc in cursor:
+            if not doc.get("id"):
+                continue
+            marca = doc.get("marca_sincronizacion")
+            marcas[doc["id"]] = {
+                "marca": (marca["fecha"], normalizar_comprobante(marca.get("comprobante"))) if marca and marca.get("fecha") else None,
+                "cuentas": set(doc.get("PUC") or [])
+            }
+        return marcas
+    finally:
+        db_manager.close()
+
+
+def filtrar_incremental(proveedores, marcas, estadisticas):
+    """
+    Deja pasar solo lo nuevo respecto a lo que ya está en MongoDB: los proveedores sin
+    documento pasan completos; los existentes pasan con las transacciones posteriores a su
+    marca de agua y las cuentas aún no asociadas, y se omiten si no tienen nada nuevo.
+    Con marca de agua, las transacciones sin fecha no se pueden ubicar respecto a ella y se
+    consideran ya cargadas; se cuentan aparte de las omitidas por ser anteriores a la marca.
+    Args:
+        proveedores (Iterable[dict]): Proveedores (p. ej. de iterar_proveedores).
+        marcas (dict): Resultado de cargar_marcas_de_agua.
+        estadisticas (dict): Se actualizan proveedores_sin_cambios, transacciones_omitidas y
+            transacciones_sin_fecha.
+    Yields:
+        dict: Proveedor con solo los datos nuevos ("existente" indica que ya tenía documento).
+    """
+    estadisticas.setdefault("proveedores_sin_cambios", 0)
+    estadisticas.setdefault("transacciones_omitidas", 0)
+    estadisticas.setdefault("transacciones_sin_fecha", 0)
+    for proveedor in proveedores:
+        previo = marcas.get(proveedor["nit"])
+        if previo is None:
+            yield proveedor
+            continue
+        marca = previo["marca"]
+        if marca is None:
+            transacciones = proveedor["transacciones"]
+        else:
+            transacciones = []
+            for transaccion in proveedor["transacciones"]:
+                clave = clave_transaccion(transaccion)
+                if clave is None:
+                    estadisticas["transacciones_sin_fecha"] += 1
+                elif clave > marca:
+                    transacciones.append(transaccion)
+                else:
+                    estadisticas["transacciones_omitidas"] += 1
+        cuentas = [cuenta for cuenta in proveedor["cuentas"] if cuenta not in previo["cuentas"]]
+        if not transacciones and not cuentas:
+            estadisticas["proveedores_sin_cambios"] += 1
+            continue
+        yield {**proveedor, "transacciones": transacciones, "cuentas": cuentas, "existente": True}
+
+
+def enriquecer_con_terceros(proveedores, indice_terceros, estadisticas):
+    """
+    Agrega a cada proveedor los campos del modelo de terceros (fiscalResponsability, activity,
+    city, businessName, branchOffice) para escribirlos en el mismo upsert que lo crea, sin la
+    segunda pasada de actualizar_proveedores_de_modelo_terceros.
+    Args:
+        proveedores (Iterable[dict]): Proveedores a subir.
+        indice_terceros (dict): NIT -> campos (ver cargar_indice_terceros).
+        estadisticas (dict): Se actualiza proveedores_enriquecidos.
+    Yields:
+        dict: Proveedor con "campos_terceros" cuando su NIT está en el índice.
+    """
+    estadisticas.setdefault("proveedores_enriquecidos", 0)
+    for proveedor in proveedores:
+        campos = indice_terceros.get(proveedor["nit"])
+        if campos:
+            estadisticas["proveedores_enriquecidos"] += 1
+            proveedor = {**proveedor, "campos_terceros": campos}
+        yield proveedor
+
 # =============================
 # SUBIDA DE DATOS A MONGODB
 # =============================
 
-def subir_proveedores_a_mongodb(proveedores, uid, config, TARGET_URI, COLLECTION_NAME):
+def _periodo_transaccion(transaccion):
+    fecha = transaccion.get("fecha")
+    return fecha.strftime("%Y-%m") if isinstance(fecha, datetime.datetime) else "sin_fecha"
+
+
+def construir_buckets_transacciones(proveedor, uid, fecha_actualizacion, tamano_bucket=TAMANO_BUCKET):
     """
-    Sube la lista de proveedores procesados a MongoDB.
+    Reparte las transacciones de un proveedor en documentos de la colección de transacciones
+    (patrón bucket): uno por (UID, NIT, año-mes) con hasta tamano_bucket líneas.
     Args:
-        proveedores (list): Lista de proveedores procesados.
+        proveedor (dict): Proveedor procesado por leer_y_procesar_csvs.
+        uid (ObjectId): UID del cliente/proyecto.
+        fecha_actualizacion (datetime): Marca de tiempo común al lote.
+        tamano_bucket (int): Máximo de transacciones por documento.
+    Returns:
+        list: Documentos listos para insert_many.
+    """
+    por_periodo = {}
+    for transaccion in proveedor["transacciones"]:
+        por_periodo.setdefault(_periodo_transaccion(transaccion), []).append(transaccion)
+    buckets = []
+    for periodo in sorted(por_periodo):
+        transacciones = por_periodo[periodo]
+        for inicio in range(0, len(transacciones), tamano_bucket):
+            contenido = transacciones[inicio:inicio + tamano_bucket]
+            buckets.append({
+                "UID": uid,
+                "nit": proveedor["nit"],
+                "periodo": periodo,
+                "cantidad": len(contenido),
+                "transacciones": contenido,
+                "fecha_carga": fecha_actualizacion
+            })
+    return buckets
+
+
+def resumen_transacciones(transacciones):
+    """
+    Calcula los campos de resumen que se guardan en el proveedor cuando las transacciones
+    van en la colección de buckets.
+    Args:
+        transacciones (list): Transacciones del proveedor.
+    Returns:
+        dict: cantidad, fechas extremas, totales y periodos.
+    """
+    fechas = [t["fecha"] for t in transacciones if isinstance(t.get("fecha"), datetime.datetime)]
+    return {
+        "cantidad": len(transacciones),
+        "primera_fecha": min(fechas) if fechas else None,
+        "ultima_fecha": max(fechas) if fechas else None,
+        "total_debitos": float(sum(t.get("debitos") or 0 for t in transacciones)),
+        "total_creditos": float(sum(t.get("creditos") or 0 for t in transacciones)),
+        "periodos": sorted({_periodo_transaccion(t) for t in transacciones})
+    }
+
+
+def construir_operacion_proveedor(proveedor, uid, fecha_actualizacion, almacenamiento=ALMACENAMIENTO_POR_DEFECTO):
+    """
+    Construye el upsert de un proveedor: crea el documento si el NIT no existe para el UID
+    y, si ya existe, actualiza sus datos y agrega los PUC y transacciones nuevas.
+    Con almacenamiento "buckets" el proveedor solo acumula el resumen de sus transacciones.
+    Args:
+        proveedor (dict): Proveedor procesado por leer_y_procesar_csvs.
+        uid (ObjectId): UID del cliente/proyecto.
+        fecha_actualizacion (datetime): Marca de tiempo común al lote.
+        almacenamiento (str): "embebido" o "buckets".
+    Returns:
+        UpdateOne: Operación para bulk_write.
+    """
+    cuentas = proveedor["cuentas"]
+    update_data = {
+        "$set": {
+            "descripcion": proveedor["descripcion"],
+            "name": proveedor["name"],
+            "defaultPUC": {"code": proveedor.get("cuenta_por_defecto", cuentas[0] if cuentas else None)},
+            "personType": proveedor["tipo"],
+            "idType": proveedor["tipoid"],
+            "saldo_acumulado": proveedor["saldo_acumulado"],
+            "ultima_actualizacion": fecha_actualizacion
+        },
+        "$addToSet": {
+            "PUC": {"$each": cuentas}  # Agregar todos los códigos PUC
+        }
+    }
+    if proveedor.get("campos_terceros"):
+        update_data["$set"].update(proveedor["campos_terceros"])
+    if proveedor.get("existente"):
+        # Sincronización incremental: cuentas solo trae las nuevas, el PUC por defecto se conserva
+        update_data["$setOnInsert"] = {"defaultPUC": update_data["$set"].pop("defaultPUC")}
+    marca = calcular_marca_de_agua(proveedor["transacciones"])
+    if marca is not None:
+        update_data["$max"] = {"marca_sincronizacion": marca}
+    if proveedor["transacciones"] and almacenamiento == "buckets":
+        resumen = resumen_transacciones(proveedor["transacciones"])
+        update_data["$inc"] = {
+            "resumen_transacciones.cantidad": resumen["cantidad"],
+            "resumen_transacciones.total_debitos": resumen["total_debitos"],
+            "resumen_transacciones.total_creditos": resumen["total_creditos"]
+        }
+        if resumen["primera_fecha"] is not None:
+            update_data["$min"] = {"resumen_transacciones.primera_fecha": resumen["primera_fecha"]}
+            update_data.setdefault("$max", {})["resumen_transacciones.ultima_fecha"] = resumen["ultima_fecha"]
+        update_data["$addToSet"]["resumen_transacciones.periodos"] = {"$each": resumen["periodos"]}
+    elif proveedor["transacciones"]:
+        update_data["$push"] = {"transacciones": {"$each": proveedor["transacciones"]}}
+    return UpdateOne({"UID": uid, "id": proveedor["nit"]}, update_data, upsert=True)
+
+
+def _documentos_por_nit(collection, uid, nits):
+    return {doc["id"]: doc for doc in collection.find({"UID": uid, "id": {"$in": nits}})}
+
+
+def coleccion_transacciones(db_manager, almacenamiento):
+    """
+    Retorna la colección de buckets de transacciones (con su índice) o None si las
+    transacciones van embebidas en el proveedor.
+    """
+    if almacenamiento not in ALMACENAMIENTOS_TRANSACCIONES:
+        raise ValueError(f"Almacenamiento no válido: {almacenamiento}. Opciones: {', '.join(ALMACENAMIENTOS_TRANSACCIONES)}")
+    if almacenamiento != "buckets":
+        return None
+    coleccion = db_manager.db[COLECCION_TRANSACCIONES]
+    coleccion.create_index([("UID", 1), ("nit", 1), ("periodo", 1)])
+    return coleccion
+
+
+def _insertar_buckets(coleccion_buckets, lote, uid, fecha_actualizacion):
+    """
+    Inserta los buckets de transacciones de un lote y retorna el lote con, por proveedor, solo
+    las transacciones cuyos buckets quedaron guardados. Los buckets con error se registran en el
+    log con su NIT y periodo.
+    """
+    buckets, indices_proveedor = [], []
+    for indice, proveedor in enumerate(lote):
+        for bucket in construir_buckets_transacciones(proveedor, uid, fecha_actualizacion):
+            buckets.append(bucket)
+            indices_proveedor.append(indice)
+    if not buckets:
+        return lote
+    try:
+        coleccion_buckets.insert_many(buckets, ordered=False)
+        return lote
+    except BulkWriteError as bwe:
+        fallidos = set()
+        for error in bwe.details.get("writeErrors", []):
+            fallidos.add(error["index"])
+            bucket = buckets[error["index"]]
+            logger.error(
+                f"Error al guardar transacciones del NIT {bucket['nit']} (periodo {bucket['periodo']}): {error.get('errmsg')}"
+            )
+    insertadas = [[] for _ in lote]
+    for posicion, (bucket, indice) in enumerate(zip(buckets, indices_proveedor)):
+        if posicion not in fallidos:
+            insertadas[indice].extend(bucket["transacciones"])
+    return [{**proveedor, "transacciones": transacciones} for proveedor, transacciones in zip(lote, insertadas)]
+
+
+def _subir_lote(collection, lote, uid, fecha_actualizacion, depurar, numero_lote, coleccion_buckets=None):
+    """
+    Envía un lote de proveedores en un solo bulk_write y retorna (creados, actualizados).
+    Si se indica coleccion_buckets, las transacciones se insertan allí en lugar de embeberse.
+    """
+    nits = [proveedor["nit"] for proveedor in lote]
+    almacenamiento = "buckets" if coleccion_buckets is not None else "embebido"
+    if coleccion_buckets is not None:
+        # Primero los buckets: el resumen ($inc) y la marca de agua del proveedor solo cuentan
+        # las transacciones que sí quedaron guardadas
+        lote = _insertar_buckets(coleccion_buckets, lote, uid, fecha_actualizacion)
+    operaciones = [construir_operacion_proveedor(proveedor, uid, fecha_actualizacion, almacenamiento) for proveedor in lote]
+    documentos_antes = _documentos_por_nit(collection, uid, nits) if depurar else None
+
+    try:
+        resultado = collection.bulk_write(operaciones, ordered=False)
+        detalles = resultado.bulk_api_result
+    except BulkWriteError as bwe:
+        detalles = bwe.details
+        for error in detalles.get("writeErrors", []):
+            logger.error(f"Error al guardar proveedor con NIT {nits[error['index']]}: {error.get('errmsg')}")
+
+    creados = detalles.get("nUpserted", 0)
+    actualizados = detalles.get("nModified", 0)
+    logger.info(
+        f"Lote {numero_lote}: {len(lote)} proveedores "
+        f"({creados} creados, {actualizados} actualizados, "
+        f"{len(detalles.get('writeErrors', []))} con error)"
+    )
+
+    if depurar:
+        indices_creados = {u["index"] for u in detalles.get("upserted", [])}
+        indices_error = {e["index"] for e in detalles.get("writeErrors", [])}
+        documentos_despues = _documentos_por_nit(collection, uid, nits)
+        for indice, nit in enumerate(nits):
+            if indice in indices_creados:
+                logger.debug(f"Creado nuevo proveedor con NIT: {nit}")
+            elif indice not in indices_error:
+                antes, despues = documentos_antes.get(nit), documentos_despues.get(nit)
+                logger.debug(f"Documento antes de la actualización NIT {nit}: {antes}")
+                logger.debug(f"Documento después de la actualización NIT {nit}: {despues}")
+                if antes == despues:
+                    logger.debug(f"Los datos en update_data son idénticos al documento existente para NIT {nit}.")
+    return creados, actualizados
+
+
+def subir_proveedores_en_flujo(proveedores, uid, config, depurar=False, tamano_lote=TAMANO_LOTE_MONGO,
+                               escritores=ESCRITORES_MONGO, profundidad_cola=PROFUNDIDAD_COLA,
+                               almacenamiento=ALMACENAMIENTO_POR_DEFECTO):
+    """
+    Sube proveedores a MongoDB mientras se siguen leyendo: un hilo productor consume el
+    iterable (p. ej. iterar_proveedores) y reparte cada proveedor en colas acotadas, y los
+    hilos escritores las vacían en lotes de bulk_write. Si el iterable entrega proveedores a
+    medida que lee (iterar_proveedores con fusionar=False), el tiempo de red se solapa con el de
+    lectura; la memoria de la subida queda limitada por la profundidad de las colas.
+    Cada NIT va siempre a la misma cola, así dos escritores nunca hacen upsert del mismo NIT
+    a la vez (evita duplicados cuando un NIT aparece en varios archivos).
+    Args:
+        proveedores (Iterable[dict]): Proveedores a subir; se consumen en el hilo productor.
         uid (ObjectId): UID del cliente/proyecto.
         config: Configuración de MongoDB.
-        TARGET_URI: URI de conexión.
-        COLLECTION_NAME: Nombre de la colección.
+        depurar (bool): Si es True, lee los documentos antes y después de cada lote para
+            registrar en el log los proveedores que no cambiaron.
+        tamano_lote (int): Cantidad de operaciones por bulk_write.
+        escritores (int): Cantidad de hilos escritores.
+        profundidad_cola (int): Máximo de proveedores en espera por cola.
+        almacenamiento (str): "embebido" (transacciones dentro del proveedor) o "buckets"
+            (colección provider_transactions y solo un resumen en el proveedor).
     Returns:
         dict: Estadísticas de la operación (creados/actualizados).
     """
-    client = MongoClient(TARGET_URI)
-    db = client[config.db_name]
-    collection = db[COLLECTION_NAME]
-    existing_providers_cursor = collection.find({"UID": uid}, {"nit": 1, "_id": 1})
-    provider_nit_map = {p.get("nit"): p["_id"] for p in existing_providers_cursor if p.get("nit")}
+    db_manager = MongoDBManager(config)
     stats = {
         "proveedores_actualizados": 0,
         "proveedores_creados": 0
     }
+    fecha_actualizacion = datetime.datetime.now(datetime.timezone.utc)
+    colas = [queue.Queue(maxsize=profundidad_cola) for _ in range(escritores)]
+    candado = threading.Lock()
+    errores = []
+    contador_lotes = itertools.count(1)
 
-    for proveedor in proveedores:
-        nit = proveedor["nit"]
-        cuentas = proveedor["cuentas"]
-        descripcion = proveedor["descripcion"]
-        nombre = proveedor["name"]
-        tipo = proveedor["tipo"]
-        tipoid = proveedor["tipoid"]
-        saldo_acumulado = proveedor["saldo_acumulado"]
-        transacciones = proveedor["transacciones"]
-
-        proveedor_mongo_id = provider_nit_map.get(nit)
-        if proveedor_mongo_id:
-            update_data = {
-                "$set": {
-                    "descripcion": descripcion,
-                    "name": nombre,
-                    "UID": uid,
-                    "defaultPUC": {"code": cuentas[0] if cuentas else None},
-                    "personType": tipo,
-                    "idType": tipoid,
-                    "saldo_acumulado": saldo_acumulado,
-                    "ultima_actualizacion": datetime.datetime.now(datetime.timezone.utc)
-                },
-                "$addToSet": {
-                    "PUC": {"$each": cuentas}  # Agregar todos los códigos PUC
-                }
-            }
-            if transacciones:
-                update_data.setdefault("$push", {})["transacciones"] = {"$each": transacciones}
-            logger.debug(f"Intentando actualizar NIT {nit} con datos: {update_data}")
-            pre_update_doc = collection.find_one({"_id": proveedor_mongo_id})
-            logger.debug(f"Documento antes de la actualización NIT {nit}: {pre_update_doc}")
-            try:
-                result = collection.update_one({"_id": proveedor_mongo_id}, update_data)
-                if result.modified_count > 0:
-                    logger.info(f"Actualizado proveedor con NIT: {nit} (Cuentas asociadas: {cuentas})")
-                    stats["proveedores_actualizados"] += 1
-                else:
-                    logger.warning(f"No se modificó el proveedor con NIT: {nit}. Datos ya actualizados o error en la operación.")
-                    post_update_doc = collection.find_one({"_id": proveedor_mongo_id})
-                    logger.debug(f"Documento después de la actualización NIT {nit}: {post_update_doc}")
-                    if pre_update_doc == post_update_doc:
-                        logger.debug(f"Los datos en update_data son idénticos al documento existente para NIT {nit}.")
-                    else:
-                        logger.error(f"Actualización fallida para NIT {nit} sin cambios detectados. Posible problema de permisos o validador.")
-            except Exception as update_error:
-                logger.error(f"Error al actualizar NIT {nit}: {str(update_error)}")
-                stats["proveedores_actualizados"] -= 1
-        else:
-            nuevo_id_proveedor = generar_id_proveedor(proveedor["fecha_csv"], nit)
-            nuevo_proveedor_doc = {
-                "id": nit,
-                "UID": uid,
-                "descripcion": descripcion,
-                "name": nombre,
-                "PUC": cuentas,
-                "defaultPUC": {"code": cuentas[0] if cuentas else None},
-                "personType": tipo,
-                "idType": tipoid,
-                "saldo_acumulado": saldo_acumulado,
-                "ultima_actualizacion": datetime.datetime.now(datetime.timezone.utc)
-            }
-            if transacciones:
-                nuevo_proveedor_doc["transacciones"] = transacciones
-            try:
-                collection.insert_one(nuevo_proveedor_doc)
-                logger.info(f"Creado nuevo proveedor con NIT: {nit}, nuevo ID asignado: {nuevo_id_proveedor}")
-                provider_nit_map[nit] = nuevo_id_proveedor
-                stats["proveedores_creados"] += 1
-            except Exception as insert_error:
-                logger.error(f"Error al crear proveedor con NIT {nit}: {str(insert_error)}")
-                stats["proveedores_creados"] -= 1
-
-    client.close()
+    def producir():
+        try:
+            for proveedor in proveedores:
+                if errores:
+                    break
+                colas[zlib.crc32(proveedor["nit"].encode('utf-8')) % escritores].put(proveedor)
+        except BaseException as error:
+            errores.append(error)
+        finally:
+            for cola in colas:
+                cola.put(FIN_DE_COLA)
+
+    def escribir(cola):
+        lote = []
+        fallo = False
+        while True:
+            proveedor = cola.get()
+            fin = proveedor is FIN_DE_COLA
+            if not fin:
+                lote.append(proveedor)
+            if lote and (fin or len(lote) >= tamano_lote):
+                # Tras un error se sigue vaciando la cola para no bloquear al productor
+                if not fallo:
+                    try:
+                        creados, actualizados = _subir_lote(
+                            db_manager.collection, lote, uid, fecha_actualizacion, depurar, next(contador_lotes),
+                            coleccion_buckets
+                        )
+                        with candado:
+                            stats["proveedores_creados"] += creados
+                            stats["proveedores_actualizados"] += actualizados
+                    except BaseException as error:
+                        errores.append(error)
+                        fallo = True
+                lote = []
+            if fin:
+                return
+
+    try:
+        # Dentro del try: si falla la creación del índice de buckets también se cierra la conexión
+        coleccion_buckets = coleccion_transacciones(db_manager, almacenamiento)
+        hilos = [threading.Thread(target=producir, name="proveedores-lector")]
+        hilos += [threading.Thread(target=escribir, args=(cola,), name=f"proveedores-escritor-{i}") for i, cola in enumerate(colas)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    finally:
+        db_manager.close()
+    if errores:
+        raise errores[0]
     return stats
 
 def delete_existing_providers(uid, config):
     """
-    Elimina todos los proveedores existentes en la colección de MongoDB para el UID dado.
+    Elimina todos los proveedores existentes en la colección de MongoDB para el UID dado,
+    junto con sus buckets de transacciones.
     """
     db_manager = MongoDBManager(config)
-    deleted_count = db_manager.delete_all_providers(uid)
-    logger.info(f"Se eliminaron {deleted_count} proveedores existentes con UID: {uid}")
-    db_manager.close()
+    try:
+        deleted_count = db_manager.delete_all_providers(uid)
+        logger.info(f"Se eliminaron {deleted_count} proveedores existentes con UID: {uid}")
+        deleted_buckets = db_manager.db[COLECCION_TRANSACCIONES].delete_many({"UID": uid}).deleted_count
+        if deleted_buckets:
+            logger.info(f"Se eliminaron {deleted_buckets} buckets de transacciones con UID: {uid}")
+    finally:
+        db_manager.close()
 
 # =============================
 # MÉTODO PRINCIPAL DE SUBIDA
 # =============================
 
-def subir_main(uid, ambiente):
+def subir_main(uid, ambiente, motor=MOTOR_POR_DEFECTO, depurar=False, almacenamiento=ALMACENAMIENTO_POR_DEFECTO,
+               incremental=False, enriquecer_terceros=False, fusionar=True):
     """
     Orquesta el proceso completo de onboarding:
-    - Elimina proveedores existentes.
-    - Procesa los archivos CSV.
-    - Sube los proveedores a MongoDB.
+    - Elimina proveedores existentes (o, en modo incremental, lee sus marcas de agua).
+    - Procesa los archivos CSV y sube los proveedores a MongoDB con hilos escritores
+      (subir_proveedores_en_flujo).
     - Muestra un resumen del proceso.
     Args:
         uid (str): UID del cliente/proyecto.
         ambiente (str): Ambiente de ejecución.
+        motor (str): Motor de lectura de los CSV procesados, "pandas" o "polars".
+        depurar (bool): Registra en el log el detalle por NIT de la subida (lecturas adicionales).
+        almacenamiento (str): "embebido" o "buckets" (transacciones en provider_transactions).
+        incremental (bool): Conserva los proveedores y sube solo transacciones posteriores a la
+            marca de agua de cada NIT (FECHA + COMPROBANTE) y cuentas nuevas.
+        enriquecer_terceros (bool): Escribe los campos del modelo de terceros junto con cada
+            proveedor (reemplaza el paso de actualizar_proveedores_de_modelo_terceros). En modo
+            incremental solo se enriquecen los proveedores que se escriben.
+        fusionar (bool): Un solo upsert por NIT aunque aparezca en varios archivos. La subida
+            empieza cuando se termina de leer el último archivo (los proveedores de cada archivo
+            esperan en temporales en disco). Con False la lectura y la subida se solapan archivo
+            por archivo, a costa de un upsert por archivo para los NIT repetidos.
+    Raises:
+        ValueError: Si el UID no es válido, faltan variables de entorno o no se pudo cargar el
+            modelo de terceros. Se valida antes de eliminar los proveedores existentes.
     """
     # Configuración de conexión a MongoDB según ambiente
     config = MongoDBConfig(env_prefix=ambiente)
-    TARGET_URI = config.target_uri
-    COLLECTION_NAME = config.get_collection_name()
-    UID_FILTER = config.uid_filter
+    if depurar:
+        logger.setLevel(logging.DEBUG)
 
     if not isinstance(uid, ObjectId):
         try:
             uid = ObjectId(uid)
         except Exception:
             logger.error("El UID proporcionado no es válido. Debe ser un ObjectId de MongoDB.")
-            return
-    delete_existing_providers(uid, config)
-    logger.info("=" * 60)
-    logger.info("Iniciando proceso de onboarding de datos")
-    logger.info("=" * 60)
+            raise ValueError("El UID proporcionado no es válido. Debe ser un ObjectId de MongoDB.")
 
+    # Todo lo que puede cancelar el proceso se valida antes de borrar los proveedores del UID
     variables_requeridas_dev = [
         "DEV_AWS_ACCESS_KEY_ID", 
         "DEV_AWS_SECRET_ACCESS_KEY", 
@@ -432,10 +929,37 @@ def subir_main(uid, ambiente):
     if variables_faltantes:
         logger.error(f"Faltan variables de entorno: {', '.join(variables_faltantes)}")
         logger.error("Proceso cancelado. Asegúrese de que el archivo .env está configurado correctamente.")
-        return
+        raise ValueError(f"Faltan variables de entorno: {', '.join(variables_faltantes)}")
+
+    indice_terceros = None
+    if enriquecer_terceros:
+        from proveedores.actualizar_proveedores_de_modelo_terceros import cargar_indice_terceros
+        indice_terceros, error_terceros = cargar_indice_terceros()
+        if error_terceros:
+            logger.error(f"No se pudo cargar el modelo de terceros: {error_terceros}")
+            raise ValueError(f"No se pudo cargar el modelo de terceros: {error_terceros}")
+        logger.info(f"Modelo de terceros indexado: {len(indice_terceros)} NIT")
+
+    if not incremental:
+        delete_existing_providers(uid, config)
+    logger.info("=" * 60)
+    logger.info("Iniciando proceso de onboarding de datos")
+    logger.info("=" * 60)
 
-    proveedores, registros_fallidos, stats_csv = leer_y_procesar_csvs()
-    stats_mongo = subir_proveedores_a_mongodb(proveedores, uid, config, TARGET_URI, COLLECTION_NAME)
+    # Sin fusión, la lectura de los CSV y la subida a MongoDB se solapan (productor/consumidor);
+    # con fusión la subida espera a que se lea el último archivo
+    registros_fallidos = []
+    stats_csv = nuevas_estadisticas_csv()
+    proveedores = iterar_proveedores(registros_fallidos, stats_csv, motor, fusionar=fusionar)
+    if incremental:
+        marcas = cargar_marcas_de_agua(config, uid)
+        logger.info(f"Sincronización incremental: {len(marcas)} proveedores existentes con UID: {uid}")
+        proveedores = filtrar_incremental(proveedores, marcas, stats_csv)
+    if enriquecer_terceros:
+        proveedores = enriquecer_con_terceros(proveedores, indice_terceros, stats_csv)
+    stats_mongo = subir_proveedores_en_flujo(
+        proveedores, uid, config, depurar, almacenamiento=almacenamiento
+    )
 
     logger.info("=" * 60)
     logger.info("RESUMEN DEL PROCESO")
@@ -445,6 +969,12 @@ def subir_main(uid, ambiente):
     logger.info(f"Proveedores actualizados: {stats_mongo.get('proveedores_actualizados', 0)}")
     logger.info(f"Proveedores creados: {stats_mongo.get('proveedores_creados', 0)}")
     logger.info(f"Registros fallidos: {stats_csv.get('registros_fallidos', 0)}")
+    if enriquecer_terceros:
+        logger.info(f"Proveedores enriquecidos con el modelo de terceros: {stats_csv.get('proveedores_enriquecidos', 0)}")
+    if incremental:
+        logger.info(f"Proveedores sin cambios: {stats_csv.get('proveedores_sin_cambios', 0)}")
+        logger.info(f"Transacciones ya cargadas (omitidas): {stats_csv.get('transacciones_omitidas', 0)}")
+        logger.info(f"Transacciones sin fecha omitidas (no comparables con la marca de agua): {stats_csv.get('transacciones_sin_fecha', 0)}")
 
     if stats_csv.get('errores'):
         logger.info(f"Errores encontrados durante el proceso: {len(stats_csv['errores'])}")
@@ -462,7 +992,7 @@ def subir_main(uid, ambiente):
 if __name__ == "__main__":
     import sys
     if len(sys.argv) < 3:
-        print("Uso: python subir_proveedores_mongodb.py <UID_USER> <ambiente>")
+        print("Uso: python subir_proveedores_mongodb.py <UID_USER> <ambiente> [--depurar] [--incremental] [--sin-fusion]")
         sys.exit(1)
     try:
         uid = ObjectId(sys.argv[1])
@@ -470,4 +1000,5 @@ if __name__ == "__main__":
         print("El UID proporcionado no es válido. Debe ser un ObjectId de MongoDB.")
         sys.exit(1)
     ambiente = sys.argv[2]
-    subir_main(uid, ambiente)
+    subir_main(uid, ambiente, depurar="--depurar" in sys.argv[3:], incremental="--incremental" in sys.argv[3:],
+               fusionar="--sin-fusion" not in sys.argv[3:])
@@ -0,0 +1,139 @@
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+from typing import Dict, Iterable, Optional, Tuple
+
+"""
+Caché en disco de archivos derivados (p. ej. los *_Procesado.csv del Libro Auxiliar).
+
+Cada entrada se indexa por el hash del contenido del archivo de entrada y por la versión del
+código que lo genera (hash de sus archivos fuente), de modo que se invalida sola cuando cambia
+cualquiera de los dos.
+"""
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+TAMANO_BLOQUE = 1 << 20  # 1 MiB
+
+# =============================
+# HASHES
+# =============================
+def calcular_hash_archivo(ruta: str, tamano_bloque: int = TAMANO_BLOQUE) -> str:
+    """
+    Calcula el SHA-256 del contenido de un archivo leyéndolo por bloques.
+
+    Args:
+        ruta (str): Ruta del archivo
+        tamano_bloque (int): Tamaño de cada lectura en bytes
+
+    Returns:
+        str: Hash hexadecimal
+    """
+    resumen = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+            resumen.update(bloque)
+    return resumen.hexdigest()
+
+
+def calcular_version_codigo(rutas_fuente: Iterable[str]) -> str:
+    """
+    Calcula una versión del código a partir del contenido de sus archivos fuente.
+
+    Args:
+        rutas_fuente (Iterable[str]): Archivos .py que determinan el resultado
+
+    Returns:
+        str: Hash hexadecimal (cambia si cambia cualquiera de los archivos)
+    """
+    resumen = hashlib.sha256()
+    for ruta in sorted(set(os.path.abspath(r) for r in rutas_fuente)):
+        resumen.update(os.path.basename(ruta).encode('utf-8'))
+        with open(ruta, 'rb') as archivo:
+            resumen.update(archivo.read())
+    return resumen.hexdigest()
+
+
+def calcular_clave_cache(ruta_entrada: str, version_codigo: str) -> str:
+    """
+    Combina el hash del archivo de entrada con la versión del código.
+
+    Args:
+        ruta_entrada (str): Archivo de entrada
+        version_codigo (str): Resultado de calcular_version_codigo
+
+    Returns:
+        str: Clave de la entrada en la caché
+    """
+    return hashlib.sha256(f"{calcular_hash_archivo(ruta_entrada)}:{version_codigo}".encode('utf-8')).hexdigest()
+
+# =============================
+# LECTURA Y ESCRITURA
+# =============================
+def _rutas_entrada(directorio_cache: str, prefijo: str, clave: str, extension: str) -> Tuple[str, str]:
+    base = os.path.join(directorio_cache, f"{prefijo}-{clave[:32]}")
+    return f"{base}{extension}", f"{base}.json"
+
+
+def buscar_en_cache(directorio_cache: str, prefijo: str, clave: str, extension: str = '.csv') -> Optional[Tuple[str, Dict]]:
+    """
+    Busca una entrada en la caché.
+
+    Args:
+        directorio_cache (str): Carpeta de la caché
+        prefijo (str): Nombre lógico de la entrada (p. ej. el nombre del archivo de entrada sin extensión)
+        clave (str): Clave calculada con calcular_clave_cache
+        extension (str): Extensión del archivo guardado
+
+    Returns:
+        Optional[Tuple[str, Dict]]: Ruta del archivo en caché y sus metadatos, o None si no existe
+    """
+    ruta_archivo, ruta_metadatos = _rutas_entrada(directorio_cache, prefijo, clave, extension)
+    if not (os.path.exists(ruta_archivo) and os.path.exists(ruta_metadatos)):
+        return None
+    try:
+        with open(ruta_metadatos, encoding='utf-8') as archivo:
+            metadatos = json.load(archivo)
+    except (OSError, ValueError):
+        return None
+    if metadatos.get('clave') != clave:
+        return None
+    return ruta_archivo, metadatos
+
+
+def guardar_en_cache(directorio_cache: str, prefijo: str, clave: str, ruta_origen: str,
+                     metadatos: Optional[Dict] = None, extension: str = '.csv') -> str:
+    """
+    Copia un archivo generado a la caché junto con sus metadatos y elimina las entradas
+    anteriores del mismo prefijo (versiones viejas de la entrada o del código).
+
+    Args:
+        directorio_cache (str): Carpeta de la caché
+        prefijo (str): Nombre lógico de la entrada
+        clave (str): Clave calculada con calcular_clave_cache
+        ruta_origen (str): Archivo a guardar
+        metadatos (Optional[Dict]): Datos adicionales a conservar (p. ej. conteos)
+        extension (str): Extensión del archivo guardado
+
+    Returns:
+        str: Ruta del archivo en la caché
+    """
+    os.makedirs(directorio_cache, exist_ok=True)
+    ruta_archivo, ruta_metadatos = _rutas_entrada(directorio_cache, prefijo, clave, extension)
+
+    patron_entrada = re.compile(re.escape(prefijo) + r'-[0-9a-f]{32}\..+')
+    for ruta_vieja in glob.glob(os.path.join(glob.escape(directorio_cache), f"{glob.escape(prefijo)}-*")):
+        if patron_entrada.fullmatch(os.path.basename(ruta_vieja)) and ruta_vieja not in (ruta_archivo, ruta_metadatos):
+            os.remove(ruta_vieja)
+
+    # Escritura atómica: primero a un temporal y luego se reemplaza
+    shutil.copyfile(ruta_origen, ruta_archivo + '.tmp')
+    os.replace(ruta_archivo + '.tmp', ruta_archivo)
+    with open(ruta_metadatos + '.tmp', 'w', encoding='utf-8') as archivo:
+        json.dump({**(metadatos or {}), 'clave': clave}, archivo, ensure_ascii=False, indent=2)
+    os.replace(ruta_metadatos + '.tmp', ruta_metadatos)
+    return ruta_archivo
@@ -6,6 +6,7 @@ from typing import Callable
 from bson import ObjectId
 
 from utils.parse import parse_price
+from utils.encabezados import detectar_encabezado_archivo, PATRONES_PRODUCTOS
 
 class CSVManager:
     def __init__(
@@ -57,9 +58,12 @@ class CSVManager:
             print(f"❌ Archivo CSV no encontrado: {self.csv_path}")
             return
 
+        header_row, _, _ = detectar_encabezado_archivo(self.csv_path, PATRONES_PRODUCTOS, codificaciones=("utf-8",))
+        lines_to_skip = header_row + 1 if header_row is not None else 5
+
         with open(self.csv_path, newline="", encoding="utf-8") as f:
             reader = csv.reader(f)
-            for _ in range(5): 
+            for _ in range(lines_to_skip):
                 next(reader, None)
 
             for row in reader:
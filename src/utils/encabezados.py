@@ -0,0 +1,111 @@
+import csv
+import re
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+"""
+Detección de la fila de encabezados en exportaciones tipo Siigo (CSV con preámbulo variable).
+
+La detección se hace sobre las primeras líneas crudas del archivo, antes de que pandas
+intervenga, usando patrones precompilados para las palabras clave de cada formato.
+"""
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+CODIFICACIONES_POR_DEFECTO = ('latin1', 'utf-8', 'cp1252')
+MAX_LINEAS_POR_DEFECTO = 50
+
+# Palabras clave del Libro Auxiliar (mismas que usaba encontrar_fila_encabezado)
+PATRONES_LIBRO_AUXILIAR = re.compile(
+    r'cuenta|nit|saldo|fecha|descripcion|debito|credito|comprobante',
+    re.IGNORECASE
+)
+
+# Palabras clave de la lista de productos de Siigo
+PATRONES_PRODUCTOS = re.compile(
+    r'l[ií]nea|grupo|producto|descripci[oó]n|precio|referencia|unidad',
+    re.IGNORECASE
+)
+
+# =============================
+# FUNCIONES DE DETECCIÓN
+# =============================
+def leer_lineas_iniciales(ruta: str, max_lineas: int = MAX_LINEAS_POR_DEFECTO,
+                          codificaciones: Sequence[str] = CODIFICACIONES_POR_DEFECTO) -> Tuple[List[List[str]], str]:
+    """
+    Lee las primeras filas crudas de un CSV probando varias codificaciones.
+
+    Args:
+        ruta (str): Ruta del archivo CSV
+        max_lineas (int): Número máximo de filas a leer
+        codificaciones (Sequence[str]): Codificaciones a intentar, en orden
+
+    Returns:
+        Tuple[List[List[str]], str]: Filas leídas (ya separadas por el lector CSV) y la codificación usada
+
+    Raises:
+        ValueError: Si el archivo no se pudo leer con ninguna codificación
+    """
+    for codificacion in codificaciones:
+        try:
+            with open(ruta, newline='', encoding=codificacion) as archivo:
+                return list(islice(csv.reader(archivo), max_lineas)), codificacion
+        except (UnicodeDecodeError, csv.Error):
+            continue
+    raise ValueError(f"No se pudo leer {ruta} con ninguna de las codificaciones: {', '.join(codificaciones)}")
+
+
+def detectar_encabezado(filas: Iterable[Sequence[str]], patrones: re.Pattern = PATRONES_LIBRO_AUXILIAR,
+                        minimo_coincidencias: int = 3, umbral_sin_nombre: float = 0.5) -> Tuple[Optional[int], Dict[str, int]]:
+    """
+    Busca la primera fila que parece un encabezado y construye el mapa de columnas.
+
+    Una fila es encabezado si tiene al menos `minimo_coincidencias` celdas que contienen alguna
+    palabra clave y la proporción de celdas vacías no supera `umbral_sin_nombre`.
+
+    Args:
+        filas (Iterable[Sequence[str]]): Filas crudas (p. ej. las de leer_lineas_iniciales)
+        patrones (re.Pattern): Patrón precompilado con las palabras clave del formato
+        minimo_coincidencias (int): Celdas con palabra clave requeridas
+        umbral_sin_nombre (float): Proporción máxima de celdas vacías permitida
+
+    Returns:
+        Tuple[Optional[int], Dict[str, int]]: Índice de la fila de encabezado (None si no se encontró)
+            y mapa nombre de columna -> posición
+    """
+    for idx, fila in enumerate(filas):
+        if not fila:
+            continue
+        celdas = [celda.strip() for celda in fila]
+        sin_nombre = sum(1 for celda in celdas if not celda or celda.startswith('Unnamed:'))
+        coincidencias = sum(1 for celda in celdas if celda and patrones.search(celda))
+        if coincidencias >= minimo_coincidencias and sin_nombre / len(celdas) <= umbral_sin_nombre:
+            mapa_columnas = {}
+            for posicion, celda in enumerate(celdas):
+                if celda and celda not in mapa_columnas:
+                    mapa_columnas[celda] = posicion
+            return idx, mapa_columnas
+    return None, {}
+
+
+def detectar_encabezado_archivo(ruta: str, patrones: re.Pattern = PATRONES_LIBRO_AUXILIAR,
+                                max_lineas: int = MAX_LINEAS_POR_DEFECTO,
+                                codificaciones: Sequence[str] = CODIFICACIONES_POR_DEFECTO,
+                                **kwargs) -> Tuple[Optional[int], Dict[str, int], str]:
+    """
+    Detecta el encabezado de un archivo leyendo solo sus primeras `max_lineas` filas.
+
+    Args:
+        ruta (str): Ruta del archivo CSV
+        patrones (re.Pattern): Patrón precompilado con las palabras clave del formato
+        max_lineas (int): Número máximo de filas a inspeccionar
+        codificaciones (Sequence[str]): Codificaciones a intentar, en orden
+        **kwargs: Parámetros adicionales para detectar_encabezado
+
+    Returns:
+        Tuple[Optional[int], Dict[str, int], str]: Índice del encabezado, mapa de columnas y codificación
+    """
+    filas, codificacion = leer_lineas_iniciales(ruta, max_lineas, codificaciones)
+    indice, mapa_columnas = detectar_encabezado(filas, patrones, **kwargs)
+    return indice, mapa_columnas, codificacion
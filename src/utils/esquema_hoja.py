@@ -0,0 +1,148 @@
+from collections import namedtuple
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from utils.libro_excel import iterar_filas
+
+"""
+Esquemas de columnas con nombre para los cargadores de hojas de cálculo.
+
+Cada cargador declara las columnas que usa por su encabezado. El esquema las resuelve a
+posiciones una sola vez por hoja (no por fila), valida que estén todas antes de leer datos, con
+un error que dice qué falta y qué encabezados hay, y entrega cada fila como namedtuple con esos
+campos. Así un cambio de diseño de la plantilla falla al inicio en lugar de leer otra columna.
+"""
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+MAX_FILAS_ENCABEZADO = 50
+
+# =============================
+# UTILIDADES
+# =============================
+def normalizar_encabezado(valor) -> str:
+    """
+    Forma comparable de un encabezado: sin espacios repetidos ni en los extremos y en mayúsculas.
+    """
+    return " ".join(str(valor).split()).upper() if valor is not None else ""
+
+# =============================
+# ESQUEMA
+# =============================
+class EsquemaHoja:
+    """
+    Columnas con nombre de una hoja.
+
+    Ejemplo:
+        esquema = EsquemaHoja("modelo de causación", [("cuenta_contable", "CUENTA CONTABLE   (OBLIGATORIO)"), ("nit", "NIT")])
+        posiciones = esquema.resolver(encabezados, hoja="Hoja1")
+        for fila in esquema.filas(hoja, posiciones, min_row=6):
+            fila.cuenta_contable, fila.nit
+    """
+
+    def __init__(self, nombre: str, columnas: Sequence[Tuple[str, str]]):
+        """
+        Args:
+            nombre (str): Nombre del formato para los mensajes de error (p. ej. "modelo de causación")
+            columnas (Sequence[Tuple[str, str]]): Pares (campo de la namedtuple, encabezado en la hoja), en el orden de la tupla
+        """
+        self.nombre = nombre
+        self.campos = tuple(campo for campo, _ in columnas)
+        self.encabezados = tuple(encabezado for _, encabezado in columnas)
+        self.Fila = namedtuple("Fila", self.campos)
+
+    def faltantes(self, encabezados: Iterable) -> List[str]:
+        """
+        Encabezados del esquema que no están en la fila dada.
+        """
+        presentes = {normalizar_encabezado(encabezado) for encabezado in encabezados}
+        return [encabezado for encabezado in self.encabezados if normalizar_encabezado(encabezado) not in presentes]
+
+    def resolver(self, encabezados: Sequence, hoja: str = "") -> Tuple[int, ...]:
+        """
+        Posiciones (base 0) de las columnas del esquema en una fila de encabezados. Si un
+        encabezado se repite se usa su primera aparición.
+
+        Args:
+            encabezados (Sequence): Valores de la fila de encabezados
+            hoja (str): Nombre de la hoja, para el mensaje de error
+
+        Returns:
+            Tuple[int, ...]: Posición de cada campo, en el orden del esquema
+
+        Raises:
+            ValueError: Si falta alguna columna del esquema
+        """
+        posiciones = {}
+        for indice, encabezado in enumerate(encabezados):
+            posiciones.setdefault(normalizar_encabezado(encabezado), indice)
+        faltantes = self.faltantes(encabezados)
+        if faltantes:
+            encontrados = [str(e).strip() for e in encabezados if normalizar_encabezado(e)]
+            raise ValueError(
+                f"Faltan columnas del {self.nombre} en la hoja '{hoja}': {faltantes}. "
+                f"Encabezados encontrados: {encontrados}"
+            )
+        return tuple(posiciones[normalizar_encabezado(encabezado)] for encabezado in self.encabezados)
+
+    def localizar(self, hoja, max_filas: int = MAX_FILAS_ENCABEZADO) -> Tuple[int, Tuple[int, ...]]:
+        """
+        Busca la fila de encabezados en las primeras filas de la hoja (la primera que tenga
+        todas las columnas del esquema).
+
+        Args:
+            hoja: Hoja de openpyxl (o HojaEnCache)
+            max_filas (int): Filas a revisar desde el inicio
+
+        Returns:
+            Tuple[int, Tuple[int, ...]]: Número de la fila de encabezados (base 1) y posiciones
+
+        Raises:
+            ValueError: Si ninguna de esas filas tiene todas las columnas
+        """
+        mas_cercana = None
+        for numero, fila in enumerate(hoja.iter_rows(min_row=1, max_row=max_filas, values_only=True), start=1):
+            faltantes = self.faltantes(fila)
+            if not faltantes:
+                return numero, self.resolver(fila, hoja.title)
+            if len(faltantes) < len(self.encabezados) and (mas_cercana is None or len(faltantes) < len(mas_cercana[1])):
+                mas_cercana = (numero, faltantes)
+        detalle = f" La fila {mas_cercana[0]} parece el encabezado pero le faltan {mas_cercana[1]}." if mas_cercana else ""
+        raise ValueError(
+            f"No se encontró el encabezado del {self.nombre} en las primeras {max_filas} filas "
+            f"de la hoja '{hoja.title}'.{detalle}"
+        )
+
+    def localizar_en_libro(self, libro, max_filas: int = MAX_FILAS_ENCABEZADO) -> Tuple[object, int, Tuple[int, ...]]:
+        """
+        Busca la hoja del libro que tiene el encabezado del esquema: primero la hoja activa y
+        luego las demás en orden. La hoja activa depende de cómo se guardó el archivo, así que no
+        se asume que sea la correcta.
+
+        Args:
+            libro: Libro de openpyxl (o LibroEnCache)
+            max_filas (int): Filas a revisar desde el inicio de cada hoja
+
+        Returns:
+            Tuple[object, int, Tuple[int, ...]]: Hoja, número de la fila de encabezados (base 1) y posiciones
+
+        Raises:
+            ValueError: Si ninguna hoja tiene todas las columnas, con el detalle de cada una
+        """
+        activa = libro.active.title
+        errores = []
+        for nombre in [activa] + [nombre for nombre in libro.sheetnames if nombre != activa]:
+            hoja = libro[nombre]
+            try:
+                fila_encabezado, posiciones = self.localizar(hoja, max_filas)
+            except ValueError as e:
+                errores.append(str(e))
+                continue
+            return hoja, fila_encabezado, posiciones
+        raise ValueError(f"Ninguna hoja del libro tiene el encabezado del {self.nombre}. " + " ".join(errores))
+
+    def filas(self, hoja, posiciones: Sequence[int], min_row: int, max_row: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Recorre las filas de datos como namedtuples del esquema (solo se leen esas columnas).
+        """
+        return map(self.Fila._make, iterar_filas(hoja, posiciones, min_row=min_row, max_row=max_row))
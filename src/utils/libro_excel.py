@@ -0,0 +1,396 @@
+import datetime
+import json
+import logging
+import os
+import re
+from collections import OrderedDict
+from contextlib import contextmanager
+from itertools import islice
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import openpyxl
+
+from utils.cache_contenido import buscar_en_cache, calcular_clave_cache, calcular_version_codigo, guardar_en_cache
+
+"""
+Lectura en flujo de libros de Excel (modelo de causación y facturas).
+
+openpyxl.load_workbook(ruta, data_only=True) construye el modelo completo del libro (una celda
+con estilos por cada valor) antes de leer la primera fila. En modo read_only las hojas se leen
+directamente del XML fila a fila, y aquí además se devuelven solo las columnas que usa cada
+cargador, de modo que la memoria no depende del tamaño del libro.
+
+abrir_libro_en_cache evita incluso ese recorrido: lo que pide cada cargador (las primeras filas
+de una hoja para ubicar encabezados, o solo sus columnas) se lee del XML una sola vez y se guarda
+como instantánea JSON en results/cache/libros, indexada por el hash del archivo, de modo que los
+pasos y ejecuciones siguientes que abren el mismo libro no lo analizan. Nunca se guarda la hoja
+completa, y en memoria se conservan pocos libros (MAX_LIBROS_EN_PROCESO).
+"""
+
+logger = logging.getLogger(__name__)
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+DIRECTORIO_CACHE_LIBROS = os.path.join("results", "cache", "libros")
+EXTENSION_INSTANTANEA = ".libro.json"
+# Primeras filas de cada hoja que se guardan completas (preámbulo y encabezados)
+FILAS_CABECERA = 50
+# Libros que abrir_libro_en_cache conserva en memoria; al pasar el límite se descarta el menos reciente
+MAX_LIBROS_EN_PROCESO = 4
+# Caracteres del nombre del libro o de la hoja que se reemplazan en el nombre de la instantánea
+PATRON_NOMBRE_INSEGURO = re.compile(r"[^\w-]")
+
+# =============================
+# APERTURA DEL LIBRO
+# =============================
+def abrir_libro_solo_lectura(ruta: str):
+    """
+    Abre un libro en modo read_only con los valores calculados (data_only). El libro mantiene
+    el archivo abierto hasta llamar a libro.close().
+
+    Las dimensiones guardadas en el archivo no siempre son correctas (depende de la herramienta
+    que lo generó) y en modo read_only recortarían las filas; por eso se descartan y cada hoja
+    se lee hasta su última fila real.
+
+    Args:
+        ruta (str): Ruta del archivo .xlsx
+
+    Returns:
+        Workbook: Libro de openpyxl en modo solo lectura
+    """
+    libro = openpyxl.load_workbook(ruta, read_only=True, data_only=True)
+    for hoja in libro.worksheets:
+        hoja.reset_dimensions()
+    return libro
+
+
+@contextmanager
+def libro_solo_lectura(ruta: str):
+    """
+    Versión de abrir_libro_solo_lectura para usar con `with`; cierra el libro al salir.
+    """
+    libro = abrir_libro_solo_lectura(ruta)
+    try:
+        yield libro
+    finally:
+        libro.close()
+
+# =============================
+# LECTURA DE FILAS
+# =============================
+def iterar_filas(hoja, columnas: Optional[Sequence[int]] = None, min_row: int = 1,
+                 max_row: Optional[int] = None, ancho: Optional[int] = None) -> Iterator[tuple]:
+    """
+    Recorre las filas de una hoja como tuplas de valores.
+
+    Args:
+        hoja: Hoja de openpyxl
+        columnas (Optional[Sequence[int]]): Posiciones (base 0) a retornar, en ese orden.
+            Si es None se retorna la fila completa
+        min_row (int): Primera fila (base 1)
+        max_row (Optional[int]): Última fila (base 1), o None para leer hasta el final
+        ancho (Optional[int]): Número de columnas de cada fila cuando columnas es None; las
+            filas más cortas se completan con None
+
+    Yields:
+        tuple: Valores de la fila (None en las celdas vacías)
+    """
+    if columnas is None:
+        yield from hoja.iter_rows(min_row=min_row, max_row=max_row, max_col=ancho, values_only=True)
+        return
+    columnas = list(columnas)
+    if columnas and isinstance(hoja, HojaDeLibroEnCache):
+        # La caché guarda cada combinación de columnas por separado
+        yield from hoja.iterar_columnas(columnas, min_row=min_row, max_row=max_row)
+        return
+    if not columnas:
+        for _ in hoja.iter_rows(min_row=min_row, max_row=max_row, max_col=1, values_only=True):
+            yield ()
+        return
+    # Solo se materializan las celdas hasta la última columna pedida
+    seleccionar = itemgetter(*columnas)
+    filas = hoja.iter_rows(min_row=min_row, max_row=max_row, max_col=max(columnas) + 1, values_only=True)
+    if len(columnas) == 1:
+        for fila in filas:
+            yield (seleccionar(fila),)
+    else:
+        for fila in filas:
+            yield seleccionar(fila)
+
+# =============================
+# INSTANTÁNEAS EN CACHÉ
+# =============================
+_libros_en_proceso: "OrderedDict[Tuple, LibroEnCache]" = OrderedDict()
+_version_instantanea: Optional[str] = None
+
+
+def _version() -> str:
+    # Cambia si cambia este módulo o la versión de openpyxl que produjo los valores
+    global _version_instantanea
+    if _version_instantanea is None:
+        _version_instantanea = f"{calcular_version_codigo([__file__])}:{openpyxl.__version__}"
+    return _version_instantanea
+
+
+def _fila_compacta(fila: tuple) -> tuple:
+    # Sin las celdas vacías del final (iter_rows vuelve a completar hasta max_col)
+    fin = len(fila)
+    while fin and fila[fin - 1] is None:
+        fin -= 1
+    return tuple(fila[:fin])
+
+
+def _selector(columnas: Sequence[int]):
+    # itemgetter con una sola posición retorna el valor suelto y no una tupla
+    if len(columnas) == 1:
+        posicion = columnas[0]
+        return lambda fila: (fila[posicion],)
+    return itemgetter(*columnas)
+
+
+def _valor_a_json(valor):
+    # Fechas y horas de openpyxl; el resto de valores de celda ya son tipos de JSON
+    if isinstance(valor, datetime.datetime):
+        return {"$fecha_hora": valor.isoformat()}
+    if isinstance(valor, datetime.date):
+        return {"$fecha": valor.isoformat()}
+    if isinstance(valor, datetime.time):
+        return {"$hora": valor.isoformat()}
+    if isinstance(valor, datetime.timedelta):
+        return {"$duracion": valor.total_seconds()}
+    raise TypeError(f"Valor de celda no soportado en la instantánea: {type(valor).__name__}")
+
+
+_TIPOS_JSON = {
+    "$fecha_hora": datetime.datetime.fromisoformat,
+    "$fecha": datetime.date.fromisoformat,
+    "$hora": datetime.time.fromisoformat,
+    "$duracion": lambda segundos: datetime.timedelta(seconds=segundos),
+}
+
+
+def _valor_desde_json(objeto: Dict):
+    if len(objeto) == 1:
+        ((tipo, valor),) = objeto.items()
+        if tipo in _TIPOS_JSON:
+            return _TIPOS_JSON[tipo](valor)
+    return objeto
+
+
+class HojaEnCache:
+    """
+    Hoja ya leída (tuplas de valores por fila) con el mismo iter_rows(values_only=True) que las
+    hojas de openpyxl, para que iterar_filas y los cargadores la usen sin cambios.
+    """
+
+    def __init__(self, titulo: str, filas: List[tuple]):
+        self.title = titulo
+        self.filas = filas
+
+    @property
+    def max_row(self) -> int:
+        return len(self.filas)
+
+    def iter_rows(self, min_row: Optional[int] = None, max_row: Optional[int] = None,
+                  max_col: Optional[int] = None, values_only: bool = True) -> Iterator[tuple]:
+        if not values_only:
+            raise ValueError("HojaEnCache solo guarda valores (values_only=True)")
+        filas = self.filas[(min_row or 1) - 1:max_row]
+        if max_col is None:
+            yield from filas
+            return
+        for fila in filas:
+            yield fila[:max_col] if len(fila) >= max_col else fila + (None,) * (max_col - len(fila))
+
+
+class HojaDeLibroEnCache:
+    """
+    Hoja de un LibroEnCache. No guarda la hoja completa: cada lectura se resuelve con lo que pide
+    el cargador y solo eso queda en caché.
+    - iter_rows con max_row <= FILAS_CABECERA (búsqueda de encabezados): primeras filas completas.
+    - iter_rows con max_col, o iterar_filas con columnas: solo esas columnas de todas las filas.
+    - Cualquier otra lectura se hace del archivo, sin guardarla.
+    """
+
+    def __init__(self, libro: "LibroEnCache", titulo: str):
+        self.libro = libro
+        self.title = titulo
+
+    def iter_rows(self, min_row: Optional[int] = None, max_row: Optional[int] = None,
+                  max_col: Optional[int] = None, values_only: bool = True) -> Iterator[tuple]:
+        if not values_only:
+            raise ValueError("HojaDeLibroEnCache solo guarda valores (values_only=True)")
+        inicio = (min_row or 1) - 1
+        if max_col is not None:
+            yield from islice(self.libro.filas_de_columnas(self.title, range(max_col)), inicio, max_row)
+        elif max_row is not None and max_row <= FILAS_CABECERA:
+            yield from islice(self.libro.filas_iniciales(self.title), inicio, max_row)
+        else:
+            with libro_solo_lectura(self.libro.ruta) as libro:
+                for fila in libro[self.title].iter_rows(min_row=min_row, max_row=max_row, values_only=True):
+                    yield tuple(fila)
+
+    def iterar_columnas(self, columnas: Sequence[int], min_row: int = 1, max_row: Optional[int] = None) -> Iterator[tuple]:
+        """
+        Filas con solo esas columnas (en ese orden), desde la caché de esa proyección.
+        """
+        return islice(self.libro.filas_de_columnas(self.title, columnas), (min_row or 1) - 1, max_row)
+
+
+class LibroEnCache:
+    """
+    Libro con la interfaz de lectura de openpyxl (sheetnames, libro[hoja], active, close). De cada
+    hoja se guardan solo las primeras filas y las columnas que piden los cargadores, cada una en
+    su propia instantánea JSON, que se lee del disco solo cuando se pide.
+    """
+
+    def __init__(self, ruta: str, directorio_cache: Optional[str] = DIRECTORIO_CACHE_LIBROS):
+        """
+        Args:
+            ruta (str): Ruta del archivo .xlsx
+            directorio_cache (Optional[str]): Carpeta de las instantáneas, o None para no persistirlas
+        """
+        self.ruta = ruta
+        self.directorio_cache = directorio_cache
+        self.prefijo = "libro-" + PATRON_NOMBRE_INSEGURO.sub("_", os.path.splitext(os.path.basename(ruta))[0])
+        self.clave = calcular_clave_cache(ruta, _version()) if directorio_cache else None
+        self._cabeceras: Dict[str, List[tuple]] = {}
+        self._proyecciones: Dict[Tuple[str, Tuple[int, ...]], List[tuple]] = {}
+        self.indice = self._leer_instantanea(self.prefijo)
+        if self.indice is None:
+            with libro_solo_lectura(ruta) as libro:
+                activa = libro.active
+                self.indice = {
+                    "hojas": list(libro.sheetnames),
+                    "activa": libro.sheetnames.index(activa.title) if activa is not None else 0,
+                }
+            self._guardar_instantanea(self.prefijo, self.indice)
+
+    def _prefijo_hoja(self, nombre: str, parte: str) -> str:
+        return f"{self.prefijo}.{PATRON_NOMBRE_INSEGURO.sub('_', nombre)}.{parte}"
+
+    def _leer_instantanea(self, prefijo: str):
+        if not self.directorio_cache:
+            return None
+        encontrada = buscar_en_cache(self.directorio_cache, prefijo, self.clave, EXTENSION_INSTANTANEA)
+        if encontrada is None:
+            return None
+        try:
+            with open(encontrada[0], encoding="utf-8") as archivo:
+                contenido = json.load(archivo, object_hook=_valor_desde_json)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Instantánea {encontrada[0]} ilegible, se leerá el libro: {e}")
+            return None
+        logger.info(f"Instantánea de {os.path.basename(self.ruta)} encontrada en caché ({prefijo})")
+        return contenido
+
+    def _guardar_instantanea(self, prefijo: str, contenido, metadatos: Optional[Dict] = None):
+        if not self.directorio_cache:
+            return
+        os.makedirs(self.directorio_cache, exist_ok=True)
+        ruta_temporal = os.path.join(self.directorio_cache, f"{prefijo}.{os.getpid()}.tmp")
+        try:
+            with open(ruta_temporal, "w", encoding="utf-8") as archivo:
+                json.dump(contenido, archivo, default=_valor_a_json, ensure_ascii=False, separators=(",", ":"))
+            guardar_en_cache(self.directorio_cache, prefijo, self.clave, ruta_temporal,
+                             {"archivo": os.path.basename(self.ruta), **(metadatos or {})}, EXTENSION_INSTANTANEA)
+        except (OSError, TypeError, ValueError) as e:
+            logger.warning(f"No se pudo guardar la instantánea de {self.ruta} ({prefijo}): {e}")
+        finally:
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+
+    def filas_iniciales(self, nombre: str) -> List[tuple]:
+        """
+        Primeras FILAS_CABECERA filas completas de la hoja (donde se buscan los encabezados).
+        """
+        filas = self._cabeceras.get(nombre)
+        if filas is None:
+            prefijo = self._prefijo_hoja(nombre, "cabecera")
+            guardadas = self._leer_instantanea(prefijo)
+            if guardadas is not None:
+                filas = [tuple(fila) for fila in guardadas]
+            else:
+                with libro_solo_lectura(self.ruta) as libro:
+                    filas = [_fila_compacta(fila) for fila in libro[nombre].iter_rows(max_row=FILAS_CABECERA, values_only=True)]
+                self._guardar_instantanea(prefijo, filas, {"hoja": nombre, "filas": FILAS_CABECERA})
+            self._cabeceras[nombre] = filas
+        return filas
+
+    def filas_de_columnas(self, nombre: str, columnas: Sequence[int]) -> List[tuple]:
+        """
+        Valores de esas columnas (base 0, en ese orden) en todas las filas de la hoja, desde la fila 1.
+        """
+        columnas = tuple(columnas)
+        filas = self._proyecciones.get((nombre, columnas))
+        if filas is None:
+            prefijo = self._prefijo_hoja(nombre, "c" + "_".join(map(str, columnas)))
+            guardadas = self._leer_instantanea(prefijo)
+            if guardadas is not None:
+                filas = [tuple(fila) for fila in guardadas]
+            else:
+                seleccionar = _selector(columnas)
+                with libro_solo_lectura(self.ruta) as libro:
+                    hoja = libro[nombre]
+                    filas = [seleccionar(fila) for fila in hoja.iter_rows(max_col=max(columnas) + 1, values_only=True)]
+                self._guardar_instantanea(prefijo, filas, {"hoja": nombre, "columnas": list(columnas)})
+            self._proyecciones[(nombre, columnas)] = filas
+        return filas
+
+    @property
+    def sheetnames(self) -> List[str]:
+        return self.indice["hojas"]
+
+    @property
+    def worksheets(self) -> List[HojaDeLibroEnCache]:
+        return [self[nombre] for nombre in self.sheetnames]
+
+    @property
+    def active(self) -> HojaDeLibroEnCache:
+        return self[self.sheetnames[self.indice["activa"]]]
+
+    def __contains__(self, nombre: str) -> bool:
+        return nombre in self.sheetnames
+
+    def __getitem__(self, nombre: str) -> HojaDeLibroEnCache:
+        if nombre not in self.sheetnames:
+            raise KeyError(f"Worksheet {nombre} does not exist.")
+        return HojaDeLibroEnCache(self, nombre)
+
+    def close(self):
+        # No mantiene archivos abiertos; existe por compatibilidad con los libros de openpyxl
+        pass
+
+
+def abrir_libro_en_cache(ruta: str, directorio_cache: Optional[str] = DIRECTORIO_CACHE_LIBROS) -> LibroEnCache:
+    """
+    Abre un libro para lectura reutilizando lo ya leído en este proceso o guardado en las
+    instantáneas de disco. Mientras el archivo no cambie (misma ruta, tamaño y fecha de
+    modificación) se retorna el mismo objeto; se conservan en memoria los MAX_LIBROS_EN_PROCESO
+    libros usados más recientemente.
+
+    Args:
+        ruta (str): Ruta del archivo .xlsx
+        directorio_cache (Optional[str]): Carpeta de las instantáneas, o None para no persistirlas
+
+    Returns:
+        LibroEnCache: Libro de solo lectura (solo valores, como data_only=True)
+    """
+    estado = os.stat(ruta)
+    clave = (os.path.abspath(ruta), estado.st_mtime_ns, estado.st_size, directorio_cache)
+    libro = _libros_en_proceso.pop(clave, None)
+    if libro is None:
+        libro = LibroEnCache(ruta, directorio_cache)
+    _libros_en_proceso[clave] = libro
+    while len(_libros_en_proceso) > MAX_LIBROS_EN_PROCESO:
+        _libros_en_proceso.popitem(last=False)
+    return libro
+
+
+def limpiar_libros_en_proceso():
+    """
+    Descarta los libros guardados en memoria por abrir_libro_en_cache (las instantáneas en disco se conservan).
+    """
+    _libros_en_proceso.clear()
@@ -0,0 +1,168 @@
+import re
+from functools import lru_cache
+from typing import Any, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+"""
+Normalización de identificadores y valores comunes a todos los cargadores (NIT, campos de
+texto, precios e identificadores de factura).
+
+Cada función escalar tiene su versión para pd.Series con el mismo resultado, de modo que los
+cargadores que trabajan por columnas y los que trabajan fila a fila producen los mismos datos.
+Las versiones por columna aprovechan que los valores se repiten mucho (un NIT aparece en
+todas las filas de su proveedor) y calculan cada valor distinto una sola vez.
+"""
+
+# =============================
+# CONFIGURACIÓN Y CONSTANTES
+# =============================
+PATRON_NO_DIGITOS = re.compile(r'\D+')
+PATRON_TOKEN_CON_DIGITO = re.compile(r'\S*\d\S*')
+TAMANO_CACHE_NIT = 1 << 16
+
+# =============================
+# VERSIONES ESCALARES
+# =============================
+@lru_cache(maxsize=TAMANO_CACHE_NIT)
+def _solo_digitos(texto: str) -> str:
+    if texto.isdecimal():
+        return texto
+    return PATRON_NO_DIGITOS.sub('', texto)
+
+
+def limpiar_nit(nit: Any) -> Any:
+    """
+    Deja solo los dígitos de un NIT/cédula. Los NIT repetidos se resuelven desde una caché.
+
+    Args:
+        nit: Valor leído del archivo
+
+    Returns:
+        str: Solo dígitos si es texto; cualquier otro valor (None, NaN, números) se retorna igual
+    """
+    if isinstance(nit, str):
+        return _solo_digitos(nit)
+    return nit
+
+
+def limpiar_campo(valor: Any) -> Any:
+    """
+    Elimina los espacios al inicio y al final de un campo de texto.
+
+    Args:
+        valor: Valor leído del archivo
+
+    Returns:
+        str: Texto sin espacios si es texto; cualquier otro valor (None, NaN, números) se retorna igual
+    """
+    if isinstance(valor, str):
+        return valor.strip()
+    return valor
+
+
+def convertir_precio(cadena_valor: str) -> float:
+    """
+    Convierte una cadena con separadores de miles (coma) y punto decimal en un float.
+    Ejemplo: "25,000.00000" -> 25000.0
+
+    Args:
+        cadena_valor (str): Precio como texto
+
+    Returns:
+        float: Valor numérico, o 0.0 si no es convertible
+    """
+    try:
+        return float(cadena_valor.replace(',', ''))
+    except ValueError:
+        return 0.0
+
+
+def extraer_id_factura(descripcion_archivo: str) -> Optional[Union[str, int]]:
+    """
+    Extrae el identificador de factura de una descripción de archivo: la primera palabra
+    que contiene algún dígito.
+
+    Args:
+        descripcion_archivo (str): Descripción del archivo
+
+    Returns:
+        Optional[Union[str, int]]: La palabra encontrada, 0 si la descripción está vacía o None
+            si ninguna palabra tiene dígitos
+    """
+    descripcion_archivo = descripcion_archivo.strip()
+    if not descripcion_archivo:
+        return 0
+    coincidencia = PATRON_TOKEN_CON_DIGITO.search(descripcion_archivo)
+    return coincidencia.group(0) if coincidencia else None
+
+# =============================
+# VERSIONES PARA pd.Series
+# =============================
+def _por_valores_unicos(serie: pd.Series, funcion) -> pd.Series:
+    """
+    Aplica una función escalar una sola vez por valor distinto (factorize) y expande el
+    resultado a toda la columna. Los nulos se resuelven uno a uno para conservar None vs NaN.
+    """
+    serie = serie.astype(object)
+    codigos, unicos = pd.factorize(serie)
+    transformados = np.empty(len(unicos) + 1, dtype=object)
+    transformados[:-1] = [funcion(valor) for valor in unicos]
+    resultado = transformados[codigos]
+    nulos = codigos == -1
+    if nulos.any():
+        resultado[nulos] = [funcion(valor) for valor in serie.to_numpy()[nulos]]
+    return pd.Series(resultado, index=serie.index, dtype=object)
+
+
+def limpiar_nit_serie(serie: pd.Series) -> pd.Series:
+    """
+    Versión por columna de limpiar_nit.
+
+    Args:
+        serie (pd.Series): Columna con los NIT
+
+    Returns:
+        pd.Series: Columna object con el mismo resultado que limpiar_nit elemento a elemento
+    """
+    return _por_valores_unicos(serie, limpiar_nit)
+
+
+def limpiar_campo_serie(serie: pd.Series) -> pd.Series:
+    """
+    Versión por columna de limpiar_campo.
+
+    Args:
+        serie (pd.Series): Columna de texto
+
+    Returns:
+        pd.Series: Columna object con el mismo resultado que limpiar_campo elemento a elemento
+    """
+    return _por_valores_unicos(serie, limpiar_campo)
+
+
+def convertir_precio_serie(serie: pd.Series) -> pd.Series:
+    """
+    Versión por columna de convertir_precio.
+
+    Args:
+        serie (pd.Series): Columna de precios como texto
+
+    Returns:
+        pd.Series: Columna float
+    """
+    return _por_valores_unicos(serie, convertir_precio).astype(float)
+
+
+def extraer_id_factura_serie(serie: pd.Series) -> pd.Series:
+    """
+    Versión por columna de extraer_id_factura.
+
+    Args:
+        serie (pd.Series): Columna de descripciones
+
+    Returns:
+        pd.Series: Columna object con el mismo resultado que extraer_id_factura elemento a elemento
+    """
+    return _por_valores_unicos(serie, extraer_id_factura)
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# Los scripts de src se importan entre sí como utils.*, proveedores.* y causaciones.* (se ejecutan
+# con src en la ruta), así que los tests también ponen src en la ruta de importación
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
@@ -0,0 +1,67 @@
+import datetime
+
+from src.proveedores.libro_tipado import leer_libro_procesado
+from src.proveedores.subir_proveedores_mongodb import (
+    CAMPOS_TRANSACCION,
+    COLUMNAS_REQUERIDAS,
+    agrupar_proveedores,
+    nuevas_estadisticas_csv,
+)
+
+LIBRO_PROCESADO = """CUENTA,DESCRIPCION,NIT,NOMBRE,FECHA,DIG.VER.,CENTRO COSTO,SALDO ACUMULADO,COMPROBANTE,DEBITOS,CREDITOS,TELEFONO
+5135,Servicios,900123456,ACME SAS,01/02/2023,7,01,"1,000.50",10,"4,846,894.00",0.00,
+6135,Compras,900123456, ACME SAS ,02/02/2023,7,02,,11,,"2,000.00",3001234567
+5135,Servicios,900123456,ACME SAS,03/02/2023,7,01,,12,5.00,,
+5105,Honorarios,12345678,JUAN PEREZ,05/02/2023,,01,20.00,1,20.00,,
+5105,Sin nombre,12345678,,06/02/2023,,01,,2,1.00,,
+"""
+
+
+def agrupar(tmp_path):
+    ruta = tmp_path / "Libro_Procesado.csv"
+    ruta.write_text(LIBRO_PROCESADO, encoding="utf-8")
+    fallidos, estadisticas = [], nuevas_estadisticas_csv()
+    proveedores = agrupar_proveedores(
+        leer_libro_procesado(str(ruta)), ruta.name, COLUMNAS_REQUERIDAS, CAMPOS_TRANSACCION, fallidos, estadisticas
+    )
+    return proveedores, fallidos, estadisticas
+
+
+def test_agrupa_por_nit_en_orden_con_cuentas_unicas_y_primeros_valores(tmp_path):
+    proveedores, _, _ = agrupar(tmp_path)
+    assert [p["nit"] for p in proveedores] == ["12345678", "900123456"]
+    persona, empresa = proveedores
+    assert (persona["tipo"], persona["tipoid"]) == ("Person", "13")
+    assert (empresa["tipo"], empresa["tipoid"]) == ("Company", "31")
+    assert empresa["cuentas"] == ["5135", "6135"]
+    assert empresa["name"] == "ACME SAS"
+    assert empresa["descripcion"] == "Servicios"
+    assert empresa["saldo_acumulado"] == 1000.5
+    assert empresa["fecha_csv"] == datetime.datetime(2023, 2, 1)
+
+
+def test_campos_adicionales_toman_el_ultimo_valor_no_vacio(tmp_path):
+    proveedores, _, _ = agrupar(tmp_path)
+    empresa = proveedores[1]
+    assert empresa["campos_adicionales"]["telefono"] == "3001234567"
+    assert empresa["campos_adicionales"]["comprobante"] == "12"
+    assert "dig_ver_" not in empresa["campos_adicionales"]
+
+
+def test_transacciones_tipadas_y_sin_campos_vacios(tmp_path):
+    proveedores, _, _ = agrupar(tmp_path)
+    transacciones = proveedores[1]["transacciones"]
+    assert [t["comprobante"] for t in transacciones] == ["10", "11", "12"]
+    assert transacciones[0]["debitos"] == 4846894.0
+    assert transacciones[0]["fecha"] == datetime.datetime(2023, 2, 1)
+    assert "debitos" not in transacciones[1] and transacciones[1]["creditos"] == 2000.0
+
+
+def test_filas_sin_nombre_se_registran_como_fallidas(tmp_path):
+    proveedores, fallidos, estadisticas = agrupar(tmp_path)
+    assert len(proveedores[0]["transacciones"]) == 1
+    assert fallidos == [{
+        "archivo": "Libro_Procesado.csv", "fila": 6, "cuenta": "5105", "nit": "12345678", "nombre": None,
+        "error": "Campos indispensables (CUENTA, NIT, NOMBRE) faltantes",
+    }]
+    assert (estadisticas["registros_procesados"], estadisticas["registros_fallidos"]) == (5, 1)
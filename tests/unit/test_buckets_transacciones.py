@@ -0,0 +1,83 @@
+import datetime
+
+from bson import ObjectId
+from pymongo import UpdateOne
+
+from src.proveedores.subir_proveedores_mongodb import (
+    construir_buckets_transacciones,
+    construir_operacion_proveedor,
+    normalizar_comprobante,
+)
+
+UID = ObjectId()
+AHORA = datetime.datetime(2024, 1, 15)
+FEBRERO = datetime.datetime(2023, 2, 10)
+MARZO = datetime.datetime(2023, 3, 5)
+
+
+def proveedor(transacciones):
+    return {
+        "nit": "900", "cuentas": ["5135"], "descripcion": "Aseo", "name": "Flores SAS", "tipo": "Jurídica",
+        "tipoid": "NIT", "saldo_acumulado": 10.0, "transacciones": transacciones,
+    }
+
+
+def test_buckets_por_periodo_con_limite_de_transacciones():
+    transacciones = (
+        [{"fecha": MARZO, "comprobante": str(i)} for i in range(5)]
+        + [{"fecha": FEBRERO, "comprobante": "1"}]
+        + [{"comprobante": "sin"}]
+    )
+    buckets = construir_buckets_transacciones(proveedor(transacciones), UID, AHORA, tamano_bucket=2)
+    assert [(b["periodo"], b["cantidad"]) for b in buckets] == [
+        ("2023-02", 1), ("2023-03", 2), ("2023-03", 2), ("2023-03", 1), ("sin_fecha", 1),
+    ]
+    # El orden de las transacciones se conserva dentro de cada periodo
+    assert [t["comprobante"] for b in buckets if b["periodo"] == "2023-03" for t in b["transacciones"]] == ["0", "1", "2", "3", "4"]
+    assert all(b["UID"] == UID and b["nit"] == "900" and b["fecha_carga"] == AHORA for b in buckets)
+
+
+def test_operacion_con_buckets_acumula_el_resumen_en_el_proveedor():
+    transacciones = [
+        {"fecha": MARZO, "comprobante": "7", "debitos": 100.0, "creditos": None},
+        {"fecha": FEBRERO, "comprobante": "3", "debitos": 20.0, "creditos": 5.0},
+        {"comprobante": "9", "creditos": 1.5},
+    ]
+    operacion = construir_operacion_proveedor(proveedor(transacciones), UID, AHORA, almacenamiento="buckets")
+    assert operacion == UpdateOne({"UID": UID, "id": "900"}, {
+        "$set": {
+            "descripcion": "Aseo", "name": "Flores SAS", "defaultPUC": {"code": "5135"}, "personType": "Jurídica",
+            "idType": "NIT", "saldo_acumulado": 10.0, "ultima_actualizacion": AHORA,
+        },
+        "$addToSet": {
+            "PUC": {"$each": ["5135"]},
+            "resumen_transacciones.periodos": {"$each": ["2023-02", "2023-03", "sin_fecha"]},
+        },
+        "$max": {
+            "marca_sincronizacion": {"fecha": MARZO, "comprobante": normalizar_comprobante("7")},
+            "resumen_transacciones.ultima_fecha": MARZO,
+        },
+        "$inc": {
+            "resumen_transacciones.cantidad": 3,
+            "resumen_transacciones.total_debitos": 120.0,
+            "resumen_transacciones.total_creditos": 6.5,
+        },
+        "$min": {"resumen_transacciones.primera_fecha": FEBRERO},
+    }, upsert=True)
+
+
+def test_operacion_con_buckets_sin_transacciones_fechadas_no_toca_las_fechas():
+    transacciones = [{"comprobante": "1", "debitos": 4.0}]
+    operacion = construir_operacion_proveedor(proveedor(transacciones), UID, AHORA, almacenamiento="buckets")
+    assert operacion == UpdateOne({"UID": UID, "id": "900"}, {
+        "$set": {
+            "descripcion": "Aseo", "name": "Flores SAS", "defaultPUC": {"code": "5135"}, "personType": "Jurídica",
+            "idType": "NIT", "saldo_acumulado": 10.0, "ultima_actualizacion": AHORA,
+        },
+        "$addToSet": {"PUC": {"$each": ["5135"]}, "resumen_transacciones.periodos": {"$each": ["sin_fecha"]}},
+        "$inc": {
+            "resumen_transacciones.cantidad": 1,
+            "resumen_transacciones.total_debitos": 4.0,
+            "resumen_transacciones.total_creditos": 0.0,
+        },
+    }, upsert=True)
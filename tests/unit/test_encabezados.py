@@ -0,0 +1,44 @@
+from src.utils.encabezados import (
+    detectar_encabezado,
+    detectar_encabezado_archivo,
+    PATRONES_LIBRO_AUXILIAR,
+    PATRONES_PRODUCTOS,
+)
+
+ENCABEZADO_LIBRO = ["NIVEL", "CUENTA", "DESCRIPCION", "TERCERO", "IDENTIFICACION", "FECHA", "DEBITOS", "CREDITOS", "SALDO ACUMULADO"]
+
+
+def test_detecta_encabezado_con_preambulo_variable():
+    filas = [
+        ["SURTIFLORA SAS"] + [""] * 8,
+        ["LIBRO AUXILIAR POR TERCERO"] + [""] * 8,
+        [""] * 9,
+        ENCABEZADO_LIBRO,
+        ["6", "5135050000", "GASTO", "900123456 PROVEEDOR", "900,123,456", "01/01/2023", "100.00", "0.00", "100.00"],
+    ]
+    indice, mapa_columnas = detectar_encabezado(filas, PATRONES_LIBRO_AUXILIAR)
+    assert indice == 3
+    assert mapa_columnas["CUENTA"] == 1
+    assert mapa_columnas["SALDO ACUMULADO"] == 8
+
+
+def test_fila_con_demasiadas_celdas_vacias_no_es_encabezado():
+    filas = [["CUENTA", "NIT", "FECHA"] + [""] * 7]
+    assert detectar_encabezado(filas, PATRONES_LIBRO_AUXILIAR) == (None, {})
+
+
+def test_detecta_encabezado_de_productos_en_archivo(tmp_path):
+    ruta = tmp_path / "productos.csv"
+    ruta.write_text(
+        "EMPRESA,,,\n"
+        "MODELO PRODUCTOS,,,\n"
+        ",,,\n"
+        "0,1,2,3\n"
+        "LÍNEA (OBLIGATORIO),GRUPO  (OBLIGATORIO),PRODUCTO  (OBLIGATORIO),DESCRIPCIÓN\n"
+        "1,2,ROSA,ROSA ROJA\n",
+        encoding="utf-8",
+    )
+    indice, mapa_columnas, codificacion = detectar_encabezado_archivo(str(ruta), PATRONES_PRODUCTOS, codificaciones=("utf-8",))
+    assert indice == 4
+    assert codificacion == "utf-8"
+    assert mapa_columnas["DESCRIPCIÓN"] == 3
@@ -0,0 +1,43 @@
+import pytest
+
+from utils.esquema_hoja import EsquemaHoja
+from utils.libro_excel import HojaEnCache
+
+ESQUEMA = EsquemaHoja("modelo de prueba", [("cuenta", "CUENTA CONTABLE   (OBLIGATORIO)"), ("nit", "NIT")])
+
+
+def test_resuelve_posiciones_con_espacios_y_mayusculas_distintas():
+    encabezados = ["TIPO", " nit ", "Cuenta contable (obligatorio)", "NIT"]
+    assert ESQUEMA.resolver(encabezados) == (2, 1)
+
+
+def test_columna_faltante_da_error_con_el_detalle():
+    with pytest.raises(ValueError, match=r"Faltan columnas del modelo de prueba en la hoja 'Hoja1': \['NIT'\]"):
+        ESQUEMA.resolver(["CUENTA CONTABLE   (OBLIGATORIO)", "NIT TERCERO"], "Hoja1")
+
+
+def test_localiza_encabezado_y_entrega_filas_con_nombre():
+    hoja = HojaEnCache("Hoja1", [("EMPRESA",), (), ("NIT", None, "CUENTA CONTABLE   (OBLIGATORIO)"), (900123, "x", 5135)])
+    fila_encabezado, posiciones = ESQUEMA.localizar(hoja)
+    assert (fila_encabezado, posiciones) == (3, (2, 0))
+    filas = list(ESQUEMA.filas(hoja, posiciones, min_row=fila_encabezado + 1))
+    assert filas == [(5135, 900123)]
+    assert filas[0].cuenta == 5135 and filas[0].nit == 900123
+
+
+def test_localiza_la_hoja_del_encabezado_aunque_la_activa_sea_otra():
+    class Libro:
+        hojas = {"Hoja1": HojaEnCache("Hoja1", [("NIT", "CUENTA CONTABLE   (OBLIGATORIO)"), (900123, 5135)]),
+                 "Hoja5": HojaEnCache("Hoja5", [("CUENTA", "ITEM")])}
+        sheetnames = list(hojas)
+        active = hojas["Hoja5"]
+
+        def __getitem__(self, nombre):
+            return self.hojas[nombre]
+
+    hoja, fila_encabezado, posiciones = ESQUEMA.localizar_en_libro(Libro())
+    assert (hoja.title, fila_encabezado, posiciones) == ("Hoja1", 1, (1, 0))
+    Libro.hojas.pop("Hoja1")
+    Libro.sheetnames = ["Hoja5"]
+    with pytest.raises(ValueError, match="Ninguna hoja del libro tiene el encabezado del modelo de prueba"):
+        ESQUEMA.localizar_en_libro(Libro())
@@ -0,0 +1,39 @@
+from causaciones.indice_hoja5 import CODE_FIELD_POR_DEFECTO
+from causaciones.modelo_causacion import fusionar_modelos_causacion
+
+
+def cuenta(cuenta_contable, description="", code_field=("",), nit="900", centro="1", subcentro=""):
+    return {"cuenta_contable": cuenta_contable, "description": description, "code_field": list(code_field),
+            "nit": nit, "centro": centro, "subcentro": subcentro}
+
+
+def modelo(archivo, periodo, cuentas, filas_omitidas=0):
+    return {"archivo": archivo, "periodo": periodo, "cuentas": cuentas, "filas_omitidas": filas_omitidas}
+
+
+def test_el_modelo_mas_reciente_gana_sin_importar_el_orden_de_entrada():
+    abril = modelo("ModeloAbril2025.xlsx", (2025, 4), [cuenta("5135", "Aseo abril", ["aseo"], centro="2")], filas_omitidas=1)
+    marzo = modelo("ModeloMarzo2025.xlsx", (2025, 3), [cuenta("5135", "Aseo marzo", ["aseo_viejo"]), cuenta("6135", "Compras")], filas_omitidas=2)
+    fusion = fusionar_modelos_causacion([abril, marzo])
+    assert fusion["archivos"] == ["ModeloMarzo2025.xlsx", "ModeloAbril2025.xlsx"]
+    assert fusion["cuentas"]["5135"] == {"cuenta_contable": "5135", "description": "Aseo abril", "code_field": ["aseo"]}
+    assert fusion["cuentas"]["6135"]["description"] == "Compras"
+    # Omitidas: las de cada archivo más la cuenta repetida entre modelos
+    assert (fusion["filas_omitidas"], fusion["conflictos"]) == (4, 1)
+    # Los centros de costo de todos los modelos se conservan
+    assert fusion["centros_costo"] == [("900", "5135", "1", ""), ("900", "6135", "1", ""), ("900", "5135", "2", "")]
+
+
+def test_datos_vacios_del_modelo_reciente_no_borran_los_anteriores():
+    marzo = modelo("ModeloMarzo2025.xlsx", (2025, 3), [cuenta("5135", "Aseo", ["aseo"]), cuenta("6135", "Compras", ["compras"])])
+    abril = modelo("ModeloAbril2025.xlsx", (2025, 4), [cuenta("5135", "", [""]), cuenta("6135", "", [CODE_FIELD_POR_DEFECTO])])
+    fusion = fusionar_modelos_causacion([marzo, abril])
+    assert fusion["cuentas"]["5135"] == {"cuenta_contable": "5135", "description": "Aseo", "code_field": ["aseo"]}
+    assert fusion["cuentas"]["6135"]["code_field"] == ["compras"]
+    assert (fusion["filas_omitidas"], fusion["conflictos"]) == (2, 0)
+
+
+def test_mismo_periodo_se_ordena_por_nombre_de_archivo():
+    a = modelo("A_Abril2025.xlsx", (2025, 4), [cuenta("5135", "de A")])
+    b = modelo("B_Abril2025.xlsx", (2025, 4), [cuenta("5135", "de B")])
+    assert fusionar_modelos_causacion([b, a])["cuentas"]["5135"]["description"] == "de B"
@@ -0,0 +1,55 @@
+import pytest
+
+from src.proveedores.subir_proveedores_mongodb import fusionar_proveedores_por_nit
+
+
+def proveedor(nit, cuentas, transacciones, adicionales=None, fecha="01/01/2023", nombre=None):
+    return {
+        "nit": nit, "name": nombre or f"Proveedor {nit}", "cuentas": list(cuentas),
+        "transacciones": [{"comprobante": c} for c in transacciones],
+        "campos_adicionales": adicionales or {}, "fecha_csv": fecha,
+    }
+
+
+def archivos():
+    return [
+        [proveedor("900", ["5135"], ["1"], {"telefono": "1"}, "01/01/2023"), proveedor("100", ["5105"], ["7"])],
+        [proveedor("500", ["6135"], ["3"])],
+        [proveedor("900", ["6135", "5135"], ["2"], {"ciudad": "Cali"}, "01/02/2023", nombre="ACME")],
+    ]
+
+
+@pytest.mark.parametrize("en_disco", [False, True])
+def test_un_proveedor_por_nit_en_orden_de_nit(en_disco):
+    fusionados = list(fusionar_proveedores_por_nit(archivos(), en_disco=en_disco))
+    assert [p["nit"] for p in fusionados] == ["100", "500", "900"]
+    acme = fusionados[2]
+    assert acme["name"] == "ACME"
+    assert acme["cuentas"] == ["5135", "6135"]
+    assert acme["cuenta_por_defecto"] == "6135"
+    assert [t["comprobante"] for t in acme["transacciones"]] == ["1", "2"]
+    assert acme["campos_adicionales"] == {"telefono": "1", "ciudad": "Cali"}
+    assert acme["fecha_csv"] == "01/01/2023"
+
+
+def test_en_disco_y_en_memoria_dan_el_mismo_resultado():
+    assert list(fusionar_proveedores_por_nit(archivos(), en_disco=True)) == list(fusionar_proveedores_por_nit(archivos(), en_disco=False))
+
+
+def test_nit_en_un_solo_archivo_se_entrega_sin_cambios():
+    (unico,) = fusionar_proveedores_por_nit([[proveedor("100", ["5105"], ["7"])]])
+    assert unico == proveedor("100", ["5105"], ["7"])
+    assert "cuenta_por_defecto" not in unico
+
+
+def test_lee_cada_archivo_antes_de_entregar_el_primero():
+    leidos = []
+
+    def por_archivo():
+        for numero, proveedores in enumerate(archivos()):
+            leidos.append(numero)
+            yield proveedores
+
+    fusion = fusionar_proveedores_por_nit(por_archivo())
+    next(fusion)
+    assert leidos == [0, 1, 2]
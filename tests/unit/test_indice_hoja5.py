@@ -0,0 +1,60 @@
+import openpyxl
+import pytest
+
+from src.causaciones.indice_hoja5 import CODE_FIELD_POR_DEFECTO, IndiceHoja5
+
+ENCABEZADOS = ["", "PUC", "Descripción", "Item", "code_field"]
+FILAS = [
+    ("", 51350501, "Aseo", "ITEM-ASEO", "aseo\nvigilancia"),
+    ("", 513505, "Servicios", "ITEM-SERV", "servicios"),
+    ("", 51351001, "Energía", "ITEM-ENERGIA", "energia"),
+    ("", "  51350501 ", "Aseo repetido", "OTRO", "otro"),
+    ("", 61350101, "Compras", None, None),
+    ("", 52050101, "Sin code_field"),
+]
+
+
+def test_coincidencia_exacta_entrega_item_y_code_field_de_la_primera_fila():
+    indice = IndiceHoja5(FILAS, ENCABEZADOS)
+    assert indice.code_field(51350501) == ["aseo", "vigilancia"]
+    assert indice.item(" 51350501") == "ITEM-ASEO"
+    assert indice.code_field("61350101") == [CODE_FIELD_POR_DEFECTO]
+    assert indice.item(61350101) == ""
+
+
+def test_sin_coincidencia_exacta_usa_la_primera_fila_con_el_mismo_prefijo():
+    indice = IndiceHoja5(FILAS, ENCABEZADOS)
+    # 51351099 no está: la primera fila que empieza por 513510 es la de Energía
+    assert indice.code_field(51351099) == ["energia"]
+    # 51350599 coincide en prefijo con 51350501 (fila 1) antes que con 513505 (fila 2)
+    assert indice.code_field(51350599) == ["aseo", "vigilancia"]
+    # Cuentas cortas: cualquier código que empiece por ellas
+    assert indice.code_field(5135) == ["aseo", "vigilancia"]
+    # El prefijo no da Item: solo la coincidencia exacta
+    assert indice.item(51351099) == ""
+
+
+def test_cuenta_desconocida_y_fila_sin_code_field():
+    indice = IndiceHoja5(FILAS, ENCABEZADOS)
+    assert indice.code_field(11050501) == [""]
+    assert indice.item(11050501) == ""
+    assert indice.code_field(52050101) == [""]
+
+
+def test_libro_sin_hoja5():
+    indice = IndiceHoja5.desde_libro(openpyxl.Workbook())
+    assert indice.code_field(51350501) == [CODE_FIELD_POR_DEFECTO]
+    with pytest.raises(KeyError):
+        indice.item(51350501)
+
+
+def test_desde_libro_lee_encabezados_de_la_fila_4():
+    libro = openpyxl.Workbook()
+    hoja = libro.create_sheet("Hoja5")
+    for _ in range(3):
+        hoja.append(["MODELO"])
+    hoja.append(["", "PUC", "Item", "Descripción", "code_field"])
+    hoja.append(["", 51350501, "ITEM-COLUMNA-C", "Aseo", "aseo"])
+    indice = IndiceHoja5.desde_libro(libro)
+    assert indice.item(51350501) == "ITEM-COLUMNA-C"
+    assert indice.code_field(51350501) == ["aseo"]
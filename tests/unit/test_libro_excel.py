@@ -0,0 +1,43 @@
+import datetime
+import os
+
+import openpyxl
+
+from utils import libro_excel
+from utils.libro_excel import abrir_libro_en_cache, iterar_filas, limpiar_libros_en_proceso
+
+
+def _crear_libro(ruta):
+    libro = openpyxl.Workbook()
+    hoja = libro.active
+    hoja.title = "Facturas"
+    hoja.append(["FECHA", "VALOR", "DESCRIPCION"])
+    hoja.append([datetime.datetime(2025, 4, 3, 10, 5), 12.5, "x" * 1000])
+    hoja.append([None, 3, None])
+    libro.create_sheet("Hoja5")
+    libro.save(ruta)
+
+
+def test_instantanea_json_solo_con_las_columnas_pedidas(tmp_path):
+    ruta = str(tmp_path / "libro.xlsx")
+    directorio = str(tmp_path / "cache")
+    _crear_libro(ruta)
+    esperadas = [(12.5, datetime.datetime(2025, 4, 3, 10, 5)), (3, None)]
+    for _ in range(2):
+        limpiar_libros_en_proceso()
+        libro = abrir_libro_en_cache(ruta, directorio)
+        assert libro.sheetnames == ["Facturas", "Hoja5"] and libro.active.title == "Facturas"
+        assert list(iterar_filas(libro["Facturas"], [1, 0], min_row=2)) == esperadas
+    instantaneas = [nombre for nombre in os.listdir(directorio) if nombre.endswith(libro_excel.EXTENSION_INSTANTANEA)]
+    assert len(instantaneas) == 2
+    assert not any("x" * 1000 in (tmp_path / "cache" / nombre).read_text(encoding="utf-8") for nombre in instantaneas)
+
+
+def test_conserva_en_memoria_solo_los_libros_mas_recientes(tmp_path):
+    limpiar_libros_en_proceso()
+    for numero in range(libro_excel.MAX_LIBROS_EN_PROCESO + 2):
+        ruta = str(tmp_path / f"libro{numero}.xlsx")
+        _crear_libro(ruta)
+        abrir_libro_en_cache(ruta, None)
+    assert len(libro_excel._libros_en_proceso) == libro_excel.MAX_LIBROS_EN_PROCESO
+    limpiar_libros_en_proceso()
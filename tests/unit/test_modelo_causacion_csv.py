@@ -0,0 +1,93 @@
+import csv
+
+import openpyxl
+import pytest
+
+from causaciones.modelo_causacion import analizar_modelo_causacion, analizar_modelo_causacion_csv, convertir_celda_csv
+from utils.libro_excel import limpiar_libros_en_proceso
+
+ENCABEZADOS_HOJA1 = ["TIPO", "CUENTA CONTABLE   (OBLIGATORIO)", "CENTRO DE COSTO", "NIT", "SUBCENTRO DE COSTO"]
+FILAS_HOJA1 = [
+    ("Servicio", 51350501, 1, 900123456, 0),
+    ("Servicio", 51351099, 2, 800555111, 3),
+    ("Servicio", 51350501, 9, 999, 9),
+    ("Compra", 61350101, 1.5, "0123", None),
+]
+ENCABEZADOS_HOJA5 = ["", "PUC", "Descripción", "Item", "code_field"]
+FILAS_HOJA5 = [
+    ("", 51350501, "Aseo", "ITEM-ASEO", "aseo\nvigilancia"),
+    ("", 51351001, "Energía", 7, "energia"),
+    ("", 61350101, "Compras", 0.19, None),
+]
+
+
+def _crear_modelo(ruta):
+    libro = openpyxl.Workbook()
+    hoja1 = libro.active
+    hoja1.title = "Hoja1"
+    for fila in [("MODELO DE CAUSACIÓN",), (), (), (), ENCABEZADOS_HOJA1, *FILAS_HOJA1]:
+        hoja1.append(fila)
+    hoja5 = libro.create_sheet("Hoja5")
+    for fila in [(), (), (), ENCABEZADOS_HOJA5, *FILAS_HOJA5]:
+        hoja5.append(fila)
+    libro.save(ruta)
+
+
+def _exportar_csv(ruta_xlsx, hoja, ruta_csv, codificacion="utf-8-sig"):
+    # Los números enteros se escriben como "51350501.0", como los exporta pandas desde columnas float
+    libro = openpyxl.load_workbook(ruta_xlsx, read_only=True)
+    with open(ruta_csv, "w", newline="", encoding=codificacion) as archivo:
+        escritor = csv.writer(archivo)
+        for fila in libro[hoja].iter_rows(values_only=True):
+            escritor.writerow(["" if valor is None else float(valor) if isinstance(valor, int) else valor for valor in fila])
+    libro.close()
+
+
+@pytest.fixture
+def modelo(tmp_path, monkeypatch):
+    # La caché de libros se escribe en results/ relativo al directorio de trabajo
+    monkeypatch.chdir(tmp_path)
+    limpiar_libros_en_proceso()
+    ruta = tmp_path / "ModeloAbril2025.xlsx"
+    _crear_modelo(ruta)
+    yield ruta
+    limpiar_libros_en_proceso()
+
+
+def test_convierte_celdas_numericas_como_openpyxl():
+    assert [convertir_celda_csv(v) for v in ["5135", "5135.0", "5135.5", "-3", "1e3", "0.19"]] == [5135, 5135, 5135.5, -3, 1000, 0.19]
+    # Los ceros a la izquierda solo existen en celdas de texto
+    assert [convertir_celda_csv(v) for v in ["0123", "abc", " 5", None]] == ["0123", "abc", " 5", None]
+
+
+def test_csv_y_libro_dan_el_mismo_resultado(modelo, tmp_path):
+    _exportar_csv(modelo, "Hoja1", tmp_path / "ModeloAbril2025_Hoja1.csv")
+    _exportar_csv(modelo, "Hoja5", tmp_path / "ModeloAbril2025_Hoja5.csv")
+    desde_libro = analizar_modelo_causacion(str(modelo))
+    desde_csv = analizar_modelo_causacion(str(tmp_path / "ModeloAbril2025_Hoja1.csv"))
+    assert desde_csv["cuentas"] == desde_libro["cuentas"]
+    assert (desde_csv["periodo"], desde_csv["filas_omitidas"]) == (desde_libro["periodo"], desde_libro["filas_omitidas"]) == ((2025, 4), 1)
+    assert desde_csv["cuentas"][0] == {
+        "cuenta_contable": "51350501", "description": "ITEM-ASEO", "code_field": ["aseo", "vigilancia"],
+        "nit": "900123456", "centro": "1", "subcentro": "0",
+    }
+    assert desde_csv["cuentas"][2]["nit"] == "0123" and desde_csv["cuentas"][2]["description"] == "0.19"
+
+
+def test_csv_en_carpeta_por_modelo_toma_el_periodo_de_la_carpeta(modelo, tmp_path):
+    carpeta = tmp_path / "ModeloMarzo2025"
+    carpeta.mkdir()
+    _exportar_csv(modelo, "Hoja1", carpeta / "Hoja1.csv", "latin1")
+    _exportar_csv(modelo, "Hoja5", carpeta / "Hoja5.csv", "latin1")
+    resultado = analizar_modelo_causacion_csv(str(carpeta / "Hoja1.csv"))
+    assert resultado["archivo"] == "Hoja1.csv" and resultado["periodo"] == (2025, 3)
+    assert [cuenta["code_field"] for cuenta in resultado["cuentas"]] == [["aseo", "vigilancia"], ["energia"], ["default_code_field"]]
+
+
+def test_csv_sin_hoja5_o_sin_encabezado_da_error(modelo, tmp_path):
+    _exportar_csv(modelo, "Hoja1", tmp_path / "ModeloAbril2025_Hoja1.csv")
+    with pytest.raises(KeyError, match="Hoja5"):
+        analizar_modelo_causacion_csv(str(tmp_path / "ModeloAbril2025_Hoja1.csv"))
+    (tmp_path / "mal.csv").write_text("A,B\n1,2\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="No se encontró el encabezado del modelo de causación"):
+        analizar_modelo_causacion_csv(str(tmp_path / "mal.csv"))
@@ -0,0 +1,19 @@
+from proveedores.actualizar_proveedores_de_modelo_terceros import procesar_csv_terceros, procesar_csv_terceros_por_columnas
+
+CSV_TERCEROS = (
+    "IDENTIFICACIÓN  (OBLIGATORIO),RAZÓN SOCIAL,CÓDIGO CIUDAD,RESPONSABILIDAD FISCAL,CODIGO ACTIVIDAD,SUCURSAL\n"
+    "900.123.456, Flores SAS ,11001,,4620,\n"
+    ",Sin NIT,05001,R-99-PN,0111,1\n"
+    "800555111,,,O-13,,2\n"
+)
+
+
+def test_celdas_vacias_quedan_como_cadena_vacia_en_ambas_lecturas(tmp_path):
+    ruta = tmp_path / "terceros.csv"
+    ruta.write_text(CSV_TERCEROS, encoding="utf-8")
+    por_filas, error = procesar_csv_terceros(str(ruta))
+    assert error is None
+    por_columnas, _ = procesar_csv_terceros_por_columnas(str(ruta))
+    assert por_filas == por_columnas
+    assert [registro["nit"] for registro in por_filas] == ["900123456", "800555111"]
+    assert por_filas[0]["fiscalResponsability"] == "" and por_filas[1]["city"] == "" and por_filas[1]["activity"] == ""
@@ -0,0 +1,53 @@
+import math
+
+import pandas as pd
+
+from utils.normalizacion import (
+    convertir_precio,
+    convertir_precio_serie,
+    extraer_id_factura,
+    extraer_id_factura_serie,
+    limpiar_campo,
+    limpiar_campo_serie,
+    limpiar_nit,
+    limpiar_nit_serie,
+)
+
+
+def test_limpiar_nit_deja_solo_digitos():
+    assert limpiar_nit("900.123.456-7") == "9001234567"
+    assert limpiar_nit(" CC 1,234,567 ") == "1234567"
+    assert limpiar_nit("") == ""
+    assert limpiar_nit(None) is None
+    assert math.isnan(limpiar_nit(float("nan")))
+
+
+def test_limpiar_campo_y_precio():
+    assert limpiar_campo("  R-99-PN ") == "R-99-PN"
+    assert limpiar_campo(None) is None
+    assert convertir_precio("25,000.00000") == 25000.0
+    assert convertir_precio("N/A") == 0.0
+    assert convertir_precio("") == 0.0
+
+
+def test_extraer_id_factura():
+    assert extraer_id_factura("FACTURA FE-1234 ARRIENDO") == "FE-1234"
+    assert extraer_id_factura("   ") == 0
+    assert extraer_id_factura("FACTURA ARRIENDO") is None
+
+
+def test_versiones_por_columna_coinciden_con_las_escalares():
+    nits = ["900.123.456-7", None, "CC 1,234", "900.123.456-7", float("nan"), ""]
+    campos = ["  a ", None, "", "b", "  a "]
+    precios = ["25,000.00", "", "N/A", "1.5", "25,000.00"]
+    facturas = ["FACTURA FE-1 X", "", "SIN NUMERO", "A 22", "FACTURA FE-1 X"]
+    for valores, escalar, serie in (
+        (nits, limpiar_nit, limpiar_nit_serie),
+        (campos, limpiar_campo, limpiar_campo_serie),
+        (precios, convertir_precio, convertir_precio_serie),
+        (facturas, extraer_id_factura, extraer_id_factura_serie),
+    ):
+        esperado = [escalar(valor) for valor in valores]
+        obtenido = serie(pd.Series(valores, dtype=object)).tolist()
+        for a, b in zip(esperado, obtenido):
+            assert a == b or (isinstance(a, float) and math.isnan(a) and math.isnan(b))
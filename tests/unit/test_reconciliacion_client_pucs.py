@@ -0,0 +1,87 @@
+from datetime import datetime
+
+from bson import ObjectId
+from pymongo import InsertOne, UpdateOne
+
+from src.causaciones.onboarding_causacion import operaciones_reconciliacion, reconciliar_client_pucs
+
+UID = "000000000000000000000001"
+FECHA = datetime(2025, 4, 30)
+
+
+def documento(cuenta, descripcion="Gasto", code_field=("campo",), unico=False):
+    doc = {"UID": ObjectId(UID), "cuenta_contable": cuenta, "description": descripcion, "code_field": list(code_field)}
+    if unico:
+        doc["uniquePuc"] = True
+    return doc
+
+
+def existente(doc):
+    return {campo: doc[campo] for campo in ("cuenta_contable", "description", "code_field", "uniquePuc") if campo in doc}
+
+
+class ResultadoFalso:
+    def __init__(self, operaciones):
+        self.bulk_api_result = {
+            "nInserted": sum(isinstance(op, InsertOne) for op in operaciones),
+            "nModified": sum(isinstance(op, UpdateOne) for op in operaciones),
+        }
+
+
+class ColeccionFalsa:
+    def __init__(self, documentos):
+        self.documentos = documentos
+        self.lotes = []
+        self.eliminadas = []
+
+    def find(self, filtro, proyeccion):
+        return [existente(doc) for doc in self.documentos]
+
+    def bulk_write(self, operaciones, ordered):
+        self.lotes.append(list(operaciones))
+        return ResultadoFalso(operaciones)
+
+    def delete_many(self, filtro):
+        self.eliminadas.extend(filtro["cuenta_contable"]["$in"])
+        return type("Resultado", (), {"deleted_count": len(filtro["cuenta_contable"]["$in"])})()
+
+
+class GestorFalso:
+    def __init__(self, documentos):
+        self.collection = ColeccionFalsa(documentos)
+
+
+def test_solo_genera_escrituras_para_cuentas_nuevas_o_modificadas():
+    guardadas = [documento("51350501"), documento("51351001", code_field=("viejo",)), documento("52050101", unico=True)]
+    modelo = [
+        documento("51350501"),
+        documento("51351001", code_field=("nuevo",)),
+        documento("52050101"),
+        documento("61350101", unico=True),
+    ]
+    operaciones, sin_cambios = operaciones_reconciliacion(modelo, {d["cuenta_contable"]: existente(d) for d in guardadas}, FECHA)
+    assert sin_cambios == 1
+    assert operaciones == [
+        UpdateOne({"UID": ObjectId(UID), "cuenta_contable": "51351001"}, {"$set": {"code_field": ["nuevo"], "updatedAt": FECHA}}),
+        UpdateOne({"UID": ObjectId(UID), "cuenta_contable": "52050101"}, {"$unset": {"uniquePuc": ""}, "$set": {"updatedAt": FECHA}}),
+        InsertOne(modelo[3]),
+    ]
+
+
+def test_cuenta_que_pierde_el_embedding_se_marca_como_unica():
+    operaciones, _ = operaciones_reconciliacion([documento("51350501", unico=True)], {"51350501": existente(documento("51350501"))}, FECHA)
+    assert operaciones == [
+        UpdateOne({"UID": ObjectId(UID), "cuenta_contable": "51350501"}, {"$set": {"uniquePuc": True, "updatedAt": FECHA}})
+    ]
+
+
+def test_reconciliar_escribe_en_lotes_y_elimina_obsoletas_solo_si_se_pide():
+    gestor = GestorFalso([documento("51350501"), documento("11050501")])
+    modelo = [documento("51350501"), documento("61350101"), documento("61350102"), documento("61350103")]
+    estadisticas = reconciliar_client_pucs(gestor, UID, modelo, FECHA, tamano_lote=2)
+    assert estadisticas == {"creados": 3, "actualizados": 0, "sin_cambios": 1, "eliminados": 0}
+    assert [len(lote) for lote in gestor.collection.lotes] == [2, 1]
+    assert gestor.collection.eliminadas == []
+
+    estadisticas = reconciliar_client_pucs(GestorFalso([documento("11050501")]), UID, [], FECHA, eliminar_obsoletas=True)
+    assert estadisticas["eliminados"] == 1
@@ -0,0 +1,67 @@
+import datetime
+
+from src.proveedores.subir_proveedores_mongodb import (
+    calcular_marca_de_agua,
+    clave_transaccion,
+    filtrar_incremental,
+    normalizar_comprobante,
+)
+
+FEBRERO = datetime.datetime(2023, 2, 1)
+MARZO = datetime.datetime(2023, 3, 1)
+
+
+def proveedor(nit, transacciones, cuentas=("5135",)):
+    return {"nit": nit, "cuentas": list(cuentas), "transacciones": transacciones}
+
+
+def test_comprobante_se_ordena_por_su_valor_numerico():
+    assert clave_transaccion({"fecha": FEBRERO, "comprobante": "10"}) > clave_transaccion({"fecha": FEBRERO, "comprobante": "9"})
+    assert normalizar_comprobante("FV-10") > normalizar_comprobante("FV-9")
+    assert normalizar_comprobante(normalizar_comprobante("FV-9")) == normalizar_comprobante("FV-9")
+    assert clave_transaccion({"comprobante": "1"}) is None
+
+
+def test_marca_de_agua_es_la_mayor_fecha_y_comprobante():
+    marca = calcular_marca_de_agua([
+        {"fecha": FEBRERO, "comprobante": "10"},
+        {"fecha": FEBRERO, "comprobante": "9"},
+        {"comprobante": "99"},
+    ])
+    assert marca == {"fecha": FEBRERO, "comprobante": normalizar_comprobante("10")}
+    assert calcular_marca_de_agua([{"comprobante": "1"}]) is None
+
+
+def test_filtra_lo_anterior_a_la_marca_y_cuenta_aparte_las_sin_fecha():
+    marcas = {"900": {"marca": (FEBRERO, normalizar_comprobante("9")), "cuentas": {"5135"}}}
+    transacciones = [
+        {"fecha": FEBRERO, "comprobante": "8"},
+        {"fecha": FEBRERO, "comprobante": "9"},
+        {"fecha": FEBRERO, "comprobante": "10"},
+        {"fecha": MARZO, "comprobante": "1"},
+        {"comprobante": "11"},
+    ]
+    estadisticas = {}
+    (nuevo,) = filtrar_incremental([proveedor("900", transacciones, ["5135", "6135"])], marcas, estadisticas)
+    assert [t["comprobante"] for t in nuevo["transacciones"]] == ["10", "1"]
+    assert nuevo["cuentas"] == ["6135"] and nuevo["existente"] is True
+    assert estadisticas == {"proveedores_sin_cambios": 0, "transacciones_omitidas": 2, "transacciones_sin_fecha": 1}
+
+
+def test_proveedores_nuevos_pasan_completos_y_sin_cambios_se_omiten():
+    marcas = {
+        "900": {"marca": (MARZO, normalizar_comprobante("1")), "cuentas": {"5135"}},
+        "800": {"marca": None, "cuentas": set()},
+    }
+    proveedores = [
+        proveedor("100", [{"comprobante": "1"}]),
+        proveedor("900", [{"fecha": FEBRERO, "comprobante": "5"}]),
+        proveedor("800", [{"comprobante": "1"}]),
+    ]
+    estadisticas = {}
+    resultado = list(filtrar_incremental(proveedores, marcas, estadisticas))
+    assert [p["nit"] for p in resultado] == ["100", "800"]
+    assert resultado[0] is proveedores[0]
+    assert resultado[1]["transacciones"] == [{"comprobante": "1"}]
+    assert estadisticas["proveedores_sin_cambios"] == 1
+    assert estadisticas["transacciones_omitidas"] == 1
@@ -0,0 +1,34 @@
+import pytest
+from bson import ObjectId
+
+from src.proveedores import subir_proveedores_mongodb as subida
+import proveedores.actualizar_proveedores_de_modelo_terceros as terceros
+
+UID = ObjectId()
+VARIABLES_DEV = ["DEV_AWS_ACCESS_KEY_ID", "DEV_AWS_SECRET_ACCESS_KEY", "DEV_CLUSTER_URL", "DEV_DB", "DEV_APP_NAME"]
+
+
+@pytest.fixture
+def borrados(monkeypatch):
+    llamadas = []
+    # La configuración real se lee de src/conf/conf.yaml, que no se versiona
+    monkeypatch.setattr(subida, "MongoDBConfig", lambda env_prefix: env_prefix)
+    monkeypatch.setattr(subida, "delete_existing_providers", lambda uid, config: llamadas.append(uid))
+    monkeypatch.setattr(subida, "iterar_proveedores", lambda *args, **kwargs: pytest.fail("no debe leer los CSV"))
+    for variable in VARIABLES_DEV:
+        monkeypatch.setenv(variable, "x")
+    return llamadas
+
+
+def test_modelo_de_terceros_ilegible_falla_sin_borrar_proveedores(monkeypatch, borrados):
+    monkeypatch.setattr(terceros, "cargar_indice_terceros", lambda: (None, "Archivo no encontrado"))
+    with pytest.raises(ValueError, match="No se pudo cargar el modelo de terceros: Archivo no encontrado"):
+        subida.subir_main(UID, "DEV", enriquecer_terceros=True)
+    assert borrados == []
+
+
+def test_variables_de_entorno_faltantes_fallan_sin_borrar_proveedores(monkeypatch, borrados):
+    monkeypatch.delenv("DEV_DB")
+    with pytest.raises(ValueError, match="Faltan variables de entorno: DEV_DB"):
+        subida.subir_main(UID, "DEV")
+    assert borrados == []